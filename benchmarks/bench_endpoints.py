@@ -0,0 +1,220 @@
+"""Throughput and latency of every device endpoint against emulated switches.
+
+Usage, from the repository root:
+
+    python benchmarks/bench_endpoints.py [--devices 10] [--concurrency 8] [--duration 10]
+        [--workloads restconf,ssh-fallback,mixed] [--endpoints vlan_list,tag_interface] [--json results.json]
+
+For every workload the switch emulator of ``benchmarks/switch_emulator.py`` and the
+service (``python -m swagger_server`` in production mode) are started in fresh
+processes, the emulated devices are posted as inventory, then every endpoint is driven
+by ``--concurrency`` client threads for ``--duration`` seconds after ``--warmup``
+seconds of unrecorded requests. Requests are spread over the devices round robin.
+
+Workloads:
+- restconf: every device answers RESTCONF
+- ssh-fallback: RESTCONF fails on every device, so the service falls back on ssh and
+  then keeps using ssh first
+- mixed: RESTCONF fails on half of the devices
+
+Reads are sent with ``Cache-Control: no-cache`` unless ``--use-cache`` is given, so
+every request reaches the devices. Errors are HTTP statuses of 400 and above.
+"""
+import argparse
+import itertools
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from switch_emulator import device_ips  # noqa: E402
+
+WORKLOADS = {"restconf": 0.0, "ssh-fallback": 1.0, "mixed": 0.5}
+TRUNK_INTERFACE = "Gi1%2F0%2F1"
+ACCESS_INTERFACE = "Gi1%2F0%2F2"
+
+
+def endpoint_requests(no_cache):
+    """Request of every endpoint for a device, as (method, path, keyword arguments of requests)."""
+    headers = {"Cache-Control": "no-cache"} if no_cache else {}
+    return {
+        "inventory": lambda ip, ips: ("GET", "/inventory", {}),
+        "hardware_info": lambda ip, ips: ("GET", "/switch/hardware/info", {"params": {"ip": ip}, "headers": headers}),
+        "bulk_hardware_info": lambda ip, ips: ("POST", "/switch/hardware/info/bulk", {"json": {"ips": ips}}),
+        "interfaces_switchport": lambda ip, ips: ("GET", "/switch/interfaces/switchport-conf", {"params": {"ip": ip}}),
+        "interface_switchport": lambda ip, ips: ("GET", f"/switch/interfaces/{TRUNK_INTERFACE}/switchport-conf",
+                                                 {"params": {"ip": ip}}),
+        "vlan_list": lambda ip, ips: ("GET", "/switch/vlan", {"params": {"ip": ip}, "headers": headers}),
+        "switchport_mode": lambda ip, ips: ("PATCH", f"/switch/interfaces/{ACCESS_INTERFACE}/switchport-mode",
+                                            {"params": {"ip": ip, "mode": "access"}}),
+        "tag_interface": lambda ip, ips: ("POST", f"/switch/interfaces/{TRUNK_INTERFACE}/vlan-tag",
+                                          {"json": {"ip": ip, "vlan_ids": "700", "append": True}}),
+        "tag_interfaces": lambda ip, ips: ("POST", "/switch/interfaces/vlan-tag", {"json": {"ip": ip, "operations": [
+            {"interface_name": "Gi1/0/1", "action": "tag", "vlan_ids": "700", "append": True},
+            {"interface_name": "Gi1/0/1", "action": "untag", "vlan_ids": "12"}]}}),
+        "untag_interface": lambda ip, ips: ("DELETE", f"/switch/interfaces/{TRUNK_INTERFACE}/vlan-tag",
+                                            {"params": {"ip": ip, "vlan_id": "600"}}),
+    }
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_emulator(args, restconf_failing):
+    emulator = subprocess.Popen([sys.executable, os.path.join(ROOT, "benchmarks", "switch_emulator.py"),
+                                 "--devices", str(args.devices), "--latency", str(args.latency),
+                                 "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+                                 "--restconf-failing", str(restconf_failing),
+                                 "--fields-rejecting", str(args.fields_rejecting),
+                                 "--stack-members", str(args.stack_members),
+                                 "--restconf-port", str(args.restconf_port), "--ssh-port", str(args.ssh_port)],
+                                stdout=subprocess.PIPE, text=True)
+    if emulator.stdout.readline().strip() != "ready":
+        emulator.kill()
+        raise RuntimeError("The switch emulator did not start")
+    return emulator
+
+
+def start_service(args, port, timeout=60):
+    # The background prewarm would compete for the CPU with the first measured requests,
+    # the warmup requests load what the endpoints need instead
+    env = dict(os.environ, PORT=str(port), MODE="production", LOG_LEVEL="CRITICAL", PREWARM="false",
+               RESTCONF_PORT=str(args.restconf_port), SSH_PORT=str(args.ssh_port))
+    service = subprocess.Popen([sys.executable, "-m", "swagger_server"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/inventory", timeout=1).ok:
+                return service
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    service.kill()
+    raise TimeoutError(f"No answer from the service within {timeout}s")
+
+
+def drive(base_url, build_request, ips, concurrency, duration):
+    """Send requests from ``concurrency`` threads for ``duration`` seconds.
+
+    :return: Latency in seconds and success of every request.
+    :rtype: List[Tuple[float, bool]]
+    """
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    devices = itertools.cycle(ips)
+
+    def worker():
+        session = requests.Session()
+        local = []
+        while time.monotonic() < deadline:
+            with lock:
+                ip = next(devices)
+            method, path, kwargs = build_request(ip, ips)
+            started = time.perf_counter()
+            try:
+                with session.request(method, base_url + path, timeout=120, stream=True, **kwargs) as response:
+                    for _ in response.iter_content(65536):
+                        pass
+                    ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            local.append((time.perf_counter() - started, ok))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(samples, duration):
+    latencies = sorted(latency for latency, _ in samples)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "throughput": len(samples) / duration,
+        "p50_ms": percentiles[49] * 1000 if percentiles else None,
+        "p95_ms": percentiles[94] * 1000 if percentiles else None,
+        "p99_ms": percentiles[98] * 1000 if percentiles else None,
+    }
+
+
+def run_workload(args, workload, endpoints):
+    emulator = start_emulator(args, WORKLOADS[workload])
+    port = free_port()
+    service = None
+    try:
+        service = start_service(args, port)
+        base_url = f"http://127.0.0.1:{port}"
+        ips = device_ips(args.devices)
+        requests.post(f"{base_url}/inventory", timeout=30,
+                      json=[{"ip": ip, "username": "bench", "password": "bench"} for ip in ips]).raise_for_status()
+        results = {}
+        for name, build_request in endpoints.items():
+            drive(base_url, build_request, ips, args.concurrency, args.warmup)
+            results[name] = summarize(drive(base_url, build_request, ips, args.concurrency, args.duration),
+                                      args.duration)
+            row = results[name]
+            print(f"{workload:<13} {name:<22} {row['requests']:>8} {row['errors']:>7} {row['throughput']:>9.1f} "
+                  f"{row['p50_ms'] or 0:>9.1f} {row['p95_ms'] or 0:>9.1f} {row['p99_ms'] or 0:>9.1f}", flush=True)
+        return results
+    finally:
+        for process in (service, emulator):
+            if process is not None:
+                # SIGINT lets the service shut its parser processes down
+                process.send_signal(signal.SIGINT)
+                process.wait()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--devices", type=int, default=10)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--duration", type=float, default=10, help="recorded seconds per endpoint")
+    arg_parser.add_argument("--warmup", type=float, default=2, help="unrecorded seconds per endpoint")
+    arg_parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    arg_parser.add_argument("--endpoints", default=None, help="comma separated endpoints, all by default")
+    arg_parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every device answer")
+    arg_parser.add_argument("--jitter", type=float, default=0.0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="share of RESTCONF requests failing with 500")
+    arg_parser.add_argument("--fields-rejecting", type=float, default=0.0,
+                            help="share of devices rejecting RESTCONF requests with a fields query parameter")
+    arg_parser.add_argument("--stack-members", type=int, default=4, help="switches of each emulated stack")
+    arg_parser.add_argument("--restconf-port", type=int, default=8443)
+    arg_parser.add_argument("--ssh-port", type=int, default=8022)
+    arg_parser.add_argument("--use-cache", action="store_true", help="let reads be served by the read cache")
+    arg_parser.add_argument("--json", help="also write the results to this file")
+    args = arg_parser.parse_args()
+
+    endpoints = endpoint_requests(no_cache=not args.use_cache)
+    if args.endpoints:
+        endpoints = {name: endpoints[name] for name in args.endpoints.split(",")}
+
+    print(f"{'workload':<13} {'endpoint':<22} {'requests':>8} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    results = {workload: run_workload(args, workload, endpoints) for workload in args.workloads.split(",")}
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump({"arguments": vars(args), "results": results}, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
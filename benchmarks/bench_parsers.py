@@ -0,0 +1,67 @@
+"""Parse time of the built-in ssh output parsers against genie, on captured outputs.
+
+Usage, from the repository root:
+
+    python benchmarks/bench_parsers.py [--iterations 200]
+
+For every captured output the mean parse time of both parsers is reported, along
+with whether the built-in parser returns the same values as genie for the keys it
+produces. The first genie call, which imports the parser library, is reported apart.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from scrapli.helper import genie_parse  # noqa: E402
+
+from swagger_server.driver.cli_parsers import parse_show_interfaces_switchport, parse_show_version, \
+    parse_show_vlan  # noqa: E402
+from swagger_server.driver.parser_pool import GENIE_PLATFORM  # noqa: E402
+
+OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
+CASES = [
+    ("sh version", "show_version.txt", parse_show_version),
+    ("sh vlan", "show_vlan.txt", parse_show_vlan),
+    ("show interfaces switchport", "show_interfaces_switchport.txt", parse_show_interfaces_switchport),
+]
+
+
+def project(parsed, reference):
+    """Values of ``reference`` at the keys present in ``parsed``."""
+    if isinstance(parsed, dict):
+        return {key: project(value, reference.get(key) if isinstance(reference, dict) else None)
+                for key, value in parsed.items()}
+    return reference
+
+
+def mean_time(parser, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parser()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    genie_parse(GENIE_PLATFORM, CASES[0][0], open(os.path.join(OUTPUTS_DIR, CASES[0][1])).read())
+    print(f"first genie call (imports included): {(time.perf_counter() - started) * 1000:.0f} ms\n")
+
+    print(f"{'command':<28} {'built-in ms':>12} {'genie ms':>10} {'speedup':>8}  same output")
+    for command, file_name, parser in CASES:
+        output = open(os.path.join(OUTPUTS_DIR, file_name)).read()
+        fast = mean_time(lambda: parser(output), args.iterations)
+        genie = mean_time(lambda: genie_parse(GENIE_PLATFORM, command, output), max(1, args.iterations // 10))
+        parsed = parser(output)
+        same = parsed == project(parsed, genie_parse(GENIE_PLATFORM, command, output))
+        print(f"{command:<28} {fast * 1000:>12.3f} {genie * 1000:>10.3f} {genie / fast:>7.0f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
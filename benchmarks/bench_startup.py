@@ -0,0 +1,98 @@
+"""Startup time of the service: import time, app creation time and time to first request.
+
+Usage, from the repository root:
+
+    python benchmarks/bench_startup.py [--runs 5]
+
+Every measure runs in a fresh interpreter and the median of the runs is reported,
+with and without the cached OpenAPI specification. Time to first request is measured
+from process start to the first successful GET /admin/protocols of a server started
+with ``python -m swagger_server`` in production mode.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from swagger_server.utils.spec_cache import OPENAPI_CACHE_PATH  # noqa: E402
+
+IMPORT_PROBE = """
+import json, time
+started = time.perf_counter()
+import swagger_server.__main__ as main
+imported = time.perf_counter()
+main.create_app()
+print(json.dumps({"import": imported - started, "create_app": time.perf_counter() - imported}))
+"""
+
+
+def drop_spec_cache():
+    try:
+        os.remove(OPENAPI_CACHE_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def measure_imports():
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure_first_request(timeout=60):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), MODE="production", LOG_LEVEL="WARNING")
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "swagger_server"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/admin/protocols", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No answer from the server within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'spec cache':<12} {'import ms':>10} {'create_app ms':>14} {'first request ms':>17}")
+    for cached in (False, True):
+        imports, first_requests = [], []
+        for _ in range(args.runs):
+            if not cached:
+                drop_spec_cache()
+            imports.append(measure_imports())
+            if not cached:
+                drop_spec_cache()
+            first_requests.append(measure_first_request())
+        print(f"{'warm' if cached else 'cold':<12} "
+              f"{statistics.median(run['import'] for run in imports) * 1000:>10.0f} "
+              f"{statistics.median(run['create_app'] for run in imports) * 1000:>14.0f} "
+              f"{statistics.median(first_requests) * 1000:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""Local stand-ins for Cisco IOS XE switches: a RESTCONF HTTPS server and an ssh CLI.
+
+Usage, from the repository root:
+
+    python benchmarks/switch_emulator.py [--devices 10] [--latency 0.02] [--restconf-failing 0.5]
+
+Every emulated device listens on its own loopback address (127.0.0.1, 127.0.0.2, ...)
+on the RESTCONF and ssh ports. Both interfaces serve the captured outputs of
+``benchmarks/outputs/``: the ssh server replays them as is, the RESTCONF server serves
+the same data as the Cisco-IOS-XE-native, device-hardware-oper and vlan-list payloads
+the RESTCONF driver expects. Like on real switches, hardware data lists every stack
+member, power supply, fan and transceiver and interfaces carry more configuration than
+their switchport, and the RESTCONF ``fields`` query parameter trims the payloads.
+Configuration changes are acknowledged but not applied, so every run does the same
+work. ``ready`` is printed once every server listens.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import re
+import ssl
+import sys
+import tempfile
+import urllib.parse
+
+import asyncssh
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from swagger_server.driver.cli_parsers import parse_show_interfaces_switchport, parse_show_version, \
+    parse_show_vlan  # noqa: E402
+
+OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
+NATIVE = "Cisco-IOS-XE-native:native"
+HOSTNAME_PATH = f"{NATIVE}/hostname"
+HARDWARE_PATH = "Cisco-IOS-XE-device-hardware-oper:device-hardware-data/device-hardware"
+VLAN_LIST_PATH = f"{NATIVE}/vlan/Cisco-IOS-XE-vlan:vlan-list"
+INTERFACES_PATH = f"{NATIVE}/interface"
+INTERFACE_PATH = re.compile(rf"^{NATIVE}/interface/(?P<type>[A-Za-z]+)=(?P<number>[^/]+)(?P<leaf>/.*)?$")
+INTERFACE_COMMAND = re.compile(r"^show interfaces (?P<name>\S+) switchport$")
+FIELDS_NAME = re.compile(r"[^;()/]+")
+RESERVED_VLANS = range(1002, 1006)
+
+
+def device_ips(count):
+    return [f"127.0.{index // 250}.{index % 250 + 1}" for index in range(count)]
+
+
+def parse_fields(expression, position=0):
+    """RFC 8040 ``fields`` expression as a tree of node identifiers, None selecting a whole node.
+
+    :return: The tree and the position where parsing stopped, at a closing parenthesis or the end.
+    """
+    tree = {}
+    while position < len(expression):
+        names = []
+        while True:
+            match = FIELDS_NAME.match(expression, position)
+            if match is None:
+                raise ValueError(f"Invalid fields expression at {position}: {expression}")
+            names.append(match.group())
+            position = match.end()
+            if position < len(expression) and expression[position] == "/":
+                position += 1
+                continue
+            break
+        subtree = None
+        if position < len(expression) and expression[position] == "(":
+            subtree, position = parse_fields(expression, position + 1)
+            position += 1
+        for name in reversed(names[1:]):
+            subtree = {name: subtree}
+        tree[names[0]] = merge_fields(tree[names[0]], subtree) if names[0] in tree else subtree
+        if position < len(expression) and expression[position] == ")":
+            break
+        position += 1
+    return tree, position
+
+
+def merge_fields(tree, other):
+    """Union of two ``parse_fields`` trees, so sibling paths such as "a/b;a/c" both stay selected."""
+    if tree is None or other is None:
+        return None
+    merged = dict(tree)
+    for name, subtree in other.items():
+        merged[name] = merge_fields(merged[name], subtree) if name in merged else subtree
+    return merged
+
+
+def project(value, tree):
+    """Nodes of ``value`` selected by a ``parse_fields`` tree, matching names with or without module prefix."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    selected = {}
+    for key, item in value.items():
+        for name, subtree in tree.items():
+            if name.split(":")[-1] == key.split(":")[-1]:
+                selected[key] = project(item, subtree)
+                break
+    return selected
+
+
+def read_output(name):
+    with open(os.path.join(OUTPUTS_DIR, name)) as stream:
+        return stream.read()
+
+
+class CapturedSwitch:
+    """Captured ``show`` outputs of a switch and the RESTCONF payloads holding the same data."""
+
+    def __init__(self, stack_members):
+        self.show_version = read_output("show_version.txt")
+        self.show_vlan = read_output("show_vlan.txt")
+        self.show_interfaces_switchport = read_output("show_interfaces_switchport.txt")
+        # "Name: Gi1/0/1" blocks of show interfaces switchport, keyed by short name
+        self.interface_outputs = {block.split("\n", 1)[0]: "Name: " + block.rstrip() + "\n"
+                                  for block in ("\n" + self.show_interfaces_switchport).split("\nName: ")[1:]}
+
+        version = parse_show_version(self.show_version)["version"]
+        self.hardware = {"Cisco-IOS-XE-device-hardware-oper:device-hardware": {
+            "device-inventory": [{"hw-type": "hw-type-chassis", "hw-dev-index": 0, "version": "V02",
+                                  "part-number": version["chassis"], "serial-number": version["chassis_sn"],
+                                  "hw-description": f"{version['chassis']} chassis", "dev-name": "Switch 1",
+                                  "field-replaceable": True, "hw-class": "hw-class-chassis"}]
+                                + self.stack_inventory(stack_members),
+            "device-system-data": {"current-time": "2024-05-02T10:00:00+00:00",
+                                   "boot-time": "2024-04-01T10:00:00+00:00",
+                                   "software-version": f"Cisco IOS Software [Bengaluru], {version['platform']} "
+                                                       f"Software ({version['image_id']}), Version {version['version']}, "
+                                                       f"RELEASE SOFTWARE (fc1)",
+                                   "rommon-version": "17.8.1r[FC1]", "last-reboot-reason": "Reload command",
+                                   "mcu-version": "4.128"},
+            "device-alarm": [{"alarm-id": index, "alarm-instance": 0, "alarm-category": 1,
+                              "status": "Transceiver Rx power low threshold", "time-created": "2024-04-20T10:00:00+00:00",
+                              "alarm-description": f"Te{index % stack_members + 1}/1/{index % 8 + 1}"}
+                             for index in range(4 * stack_members)]
+        }}
+        self.vlan_list = {"Cisco-IOS-XE-vlan:vlan-list": [
+            {"id": int(vlan_id), "name": vlan["name"]}
+            for vlan_id, vlan in parse_show_vlan(self.show_vlan)["vlans"].items()
+            if int(vlan_id) != 1 and int(vlan_id) not in RESERVED_VLANS
+        ]}
+        self.switchports = {}
+        for name, interface in parse_show_interfaces_switchport(self.show_interfaces_switchport).items():
+            if not interface.get("switchport_enable"):
+                continue
+            interface_type, number = re.match(r"^([^\d]+)(\d.*)$", name).groups()
+            if interface["switchport_mode"] == "trunk":
+                switchport = {"Cisco-IOS-XE-switch:mode": {"trunk": {}}}
+                if interface["trunk_vlans"] != "all":
+                    switchport["Cisco-IOS-XE-switch:trunk"] = {"allowed": {"vlan": {"vlans": interface["trunk_vlans"]}}}
+            else:
+                switchport = {"Cisco-IOS-XE-switch:mode": {"access": {}},
+                              "Cisco-IOS-XE-switch:access": {"vlan": {"vlan": int(interface["access_vlan"])}}}
+            self.switchports[(interface_type, number)] = switchport
+        self.interfaces = {"Cisco-IOS-XE-native:interface": {}}
+        for (interface_type, number), switchport in self.switchports.items():
+            self.interfaces["Cisco-IOS-XE-native:interface"].setdefault(interface_type, []).append({
+                "name": number,
+                "description": f"Access port {number}",
+                "switchport-config": {"switchport": switchport},
+                "logging": {"event": {"link-status": [None]}},
+                "Cisco-IOS-XE-spanning-tree:spanning-tree": {"portfast": {}, "bpduguard": {"enable": [None]}},
+                "Cisco-IOS-XE-ethernet:negotiation": {"auto": True},
+                "Cisco-IOS-XE-cdp:cdp": {"enable": True},
+                "load-interval": 30,
+                "storm-control": {"broadcast": {"level": {"bps": {"bps-min-rate": "10m"}}}},
+            })
+
+    @staticmethod
+    def stack_inventory(stack_members):
+        """Inventory entries other than the chassis: supervisor, power supplies, fans and transceivers of every member."""
+        entries = []
+        for member in range(1, stack_members + 1):
+            for hw_type, hw_class, count, part_number in (("hw-type-pm", "hw-class-psu", 2, "PWR-C1-715WAC-P"),
+                                                          ("hw-type-fan", "hw-class-fan", 3, "FAN-T4-R"),
+                                                          ("hw-type-transceiver", "hw-class-port", 8, "SFP-10G-SR-S")):
+                for index in range(count):
+                    entries.append({"hw-type": hw_type, "hw-dev-index": member * 100 + index, "version": "V01",
+                                    "part-number": part_number, "serial-number": f"FOC{member:02d}{index:03d}X1AB",
+                                    "hw-description": f"{part_number} {hw_class[9:]} {index + 1} of switch {member}",
+                                    "dev-name": f"Switch {member} - {hw_class[9:]} {index + 1}",
+                                    "field-replaceable": True, "hw-class": hw_class})
+        return entries
+
+
+class Behaviour:
+    """Latency and failures of the emulated devices."""
+
+    def __init__(self, latency, jitter, error_rate, failing_ips, fields_rejecting_ips):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.failing_ips = failing_ips
+        self.fields_rejecting_ips = fields_rejecting_ips
+
+    async def delay(self):
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def fails(self):
+        return self.error_rate and random.random() < self.error_rate
+
+
+def restconf_app(switch, behaviour):
+    # Serialized answers by device, path and fields: the emulator spends the same little CPU time
+    # on every answer, whatever its size, so benchmarks measure the service side only
+    bodies = {}
+
+    def body(device_ip, path, fields):
+        hostname = f"sw-bench-{device_ip.replace('.', '-')}"
+        payloads = {HOSTNAME_PATH: {"Cisco-IOS-XE-native:hostname": hostname},
+                    HARDWARE_PATH: switch.hardware,
+                    VLAN_LIST_PATH: switch.vlan_list,
+                    INTERFACES_PATH: switch.interfaces}
+        payload = payloads.get(path)
+        match = INTERFACE_PATH.match(path)
+        if payload is None and match and match["leaf"] in ("/switchport-config/switchport", "/switchport"):
+            switchport = switch.switchports.get((match["type"], urllib.parse.unquote_plus(match["number"])))
+            if switchport is not None:
+                payload = {"Cisco-IOS-XE-native:switchport": switchport}
+        if payload is None:
+            return None
+        if fields is not None:
+            tree = parse_fields(fields)[0]
+            payload = {key: project(value, tree) for key, value in payload.items()}
+        return json.dumps(payload).encode()
+
+    async def handle(request):
+        device_ip = request.transport.get_extra_info("sockname")[0]
+        await behaviour.delay()
+        if device_ip in behaviour.failing_ips:
+            return web.Response(status=503, text="RESTCONF is not enabled")
+        if behaviour.fails():
+            return web.Response(status=500, text="Emulated failure")
+        path = request.raw_path.split("/restconf/data/", 1)[1].split("?", 1)[0]
+        if request.method == "PATCH":
+            await request.read()
+            return web.Response(status=204)
+        fields = request.query.get("fields")
+        if fields is not None and device_ip in behaviour.fields_rejecting_ips:
+            return web.Response(status=400, text="Query parameter fields is not supported")
+        key = (device_ip, path, fields)
+        if key not in bodies:
+            bodies[key] = body(device_ip, path, fields)
+        if bodies[key] is None:
+            return web.Response(status=404)
+        return web.Response(body=bodies[key], content_type="application/yang-data+json")
+
+    app = web.Application()
+    app.router.add_route("*", "/restconf/data/{path:.*}", handle)
+    return app
+
+
+def self_signed_context():
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "switch-emulator")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256())
+    directory = tempfile.mkdtemp(prefix="switch-emulator-")
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as stream:
+        stream.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as stream:
+        stream.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                       serialization.NoEncryption()))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class AnyPasswordServer(asyncssh.SSHServer):
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return True
+
+
+def cli_session(switch, behaviour):
+    """IOS XE like CLI: privileged exec and configuration prompts, captured outputs for show commands."""
+
+    async def run(process):
+        device_ip = process.get_extra_info("sockname")[0]
+        hostname = f"sw-bench-{device_ip.replace('.', '-')}"
+        outputs = {"show version": switch.show_version, "sh version": switch.show_version,
+                   "show vlan": switch.show_vlan, "sh vlan": switch.show_vlan,
+                   "show interfaces switchport": switch.show_interfaces_switchport}
+        mode = ""
+        process.stdout.write(f"\n{hostname}#")
+        try:
+            while True:
+                line = await process.stdin.readline()
+                if not line:
+                    break
+                command = line.strip()
+                output = ""
+                if command in ("exit", "logout") and not mode:
+                    break
+                if command in outputs:
+                    await behaviour.delay()
+                    output = outputs[command]
+                elif INTERFACE_COMMAND.match(command):
+                    await behaviour.delay()
+                    name = INTERFACE_COMMAND.match(command)["name"]
+                    output = next((block for short, block in switch.interface_outputs.items()
+                                   if name in (short, short.replace("Gi", "GigabitEthernet", 1))), "")
+                elif command in ("configure terminal", "conf t"):
+                    output, mode = "Enter configuration commands, one per line.  End with CNTL/Z.\n", "(config)"
+                elif command == "end":
+                    mode = ""
+                elif command == "exit":
+                    mode = "(config)" if mode == "(config-if)" else ""
+                elif mode and command.startswith("interface "):
+                    mode = "(config-if)"
+                elif mode:
+                    await behaviour.delay()
+                process.stdout.write(output.replace("\n", "\r\n") + f"{hostname}{mode}#")
+        except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged, ConnectionError):
+            pass
+        process.exit(0)
+
+    return run
+
+
+async def serve(args):
+    ips = device_ips(args.devices)
+    switch = CapturedSwitch(args.stack_members)
+    failing_ips = set(ips[:round(len(ips) * args.restconf_failing)])
+    fields_rejecting_ips = set(ips[len(ips) - round(len(ips) * args.fields_rejecting):])
+    behaviour = Behaviour(args.latency, args.jitter, args.error_rate, failing_ips, fields_rejecting_ips)
+
+    runner = web.AppRunner(restconf_app(switch, behaviour), access_log=None)
+    await runner.setup()
+    context = self_signed_context()
+    host_key = asyncssh.generate_private_key("ssh-ed25519")
+    for device_ip in ips:
+        await web.TCPSite(runner, device_ip, args.restconf_port, ssl_context=context).start()
+        await asyncssh.create_server(AnyPasswordServer, device_ip, args.ssh_port, server_host_keys=[host_key],
+                                     process_factory=cli_session(switch, behaviour))
+    print("ready", flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--devices", type=int, default=10)
+    arg_parser.add_argument("--restconf-port", type=int, default=int(os.getenv("RESTCONF_PORT") or 8443))
+    arg_parser.add_argument("--ssh-port", type=int, default=int(os.getenv("SSH_PORT") or 8022))
+    arg_parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every device answer")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="random seconds added on top of the latency")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="share of RESTCONF requests failing with 500")
+    arg_parser.add_argument("--restconf-failing", type=float, default=0.0,
+                            help="share of devices answering 503 to every RESTCONF request, so ssh is used instead")
+    arg_parser.add_argument("--fields-rejecting", type=float, default=0.0,
+                            help="share of devices answering 400 to RESTCONF requests with a fields query parameter")
+    arg_parser.add_argument("--stack-members", type=int, default=4, help="switches of each emulated stack")
+    args = arg_parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
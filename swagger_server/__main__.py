@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
+import logging
 import pathlib
+import threading
+import time
 import connexion
 import os
 
@@ -10,34 +13,99 @@ import requests
 from swagger_server import encoder
 from dotenv import load_dotenv
 from connexion.resolver import RelativeResolver
-from swagger_server.controllers.exception_controller import handle_device_not_handled, handle_device_timeout
-from scrapli.exceptions import ScrapliConnectionNotOpened
-from swagger_server.models.exceptions import DeviceNotHandled
+from flask import g
+from swagger_server.controllers.exception_controller import handle_device_already_handled, handle_device_circuit_open, \
+    handle_device_not_handled, handle_device_session_unavailable
+from swagger_server.models.exceptions import DeviceAlreadyHandled, DeviceCircuitOpen, DeviceNotHandled, \
+    DeviceSessionUnavailable
+from swagger_server.controllers.default_controller import start_fleet_poller, stream_device_inventory
+from swagger_server.utils.credentials_handler import get_inventory_version
+from swagger_server.utils.inventory_stream import INVENTORY_PATH, load_inventory_file
+from swagger_server.utils.metrics import get_metrics, observe_request, start_request_timer
+from swagger_server.utils.tracing import add_server_timing_header, end_request_trace, start_request_trace
+from swagger_server.utils.spec_cache import load_specification
 from logging.config import dictConfig
 
 load_dotenv()
 
 LOGGER_CONFIGURATION_PATH = os.path.join(pathlib.Path(__file__).parents[1], 'logging.conf')
 PORT = os.getenv('PORT') or 8080
+THREADS = int(os.getenv('THREADS') or 4)
 MODE = os.getenv('MODE') or 'development'
 LOG_LEVEL = os.getenv('LOG_LEVEL') or 'DEBUG'
 POSSIBLE_LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+PREWARM = (os.getenv('PREWARM') or 'true').lower() == 'true'
+INVENTORY_VERSION_HEADER = 'X-Inventory-Version'
+DATA_AGE_HEADER = 'X-Data-Age'
 
-def main():
-    from waitress import serve
-    from paste.translogger import TransLogger
+def create_app():
     import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     app = connexion.App(__name__, specification_dir='./swagger/')
     app.app.json_encoder = encoder.JSONEncoder
-    app.add_api('openapi.yaml', arguments={'title': 'Switches connector API'}, 
+    app.add_api(load_specification(), arguments={'title': 'Switches connector API'}, 
                 pythonic_params=True,
                 strict_validation=True,
                 validate_responses=True,
                 resolver=RelativeResolver('swagger_server.controllers.default_controller'))
     app.add_error_handler(DeviceNotHandled, handle_device_not_handled)
-    app.add_error_handler(ScrapliConnectionNotOpened, handle_device_timeout)
-    serve(TransLogger(app, setup_console_handler=False), host="0.0.0.0", port=PORT) if MODE=='production' else app.run(port=PORT)
+    app.add_error_handler(DeviceSessionUnavailable, handle_device_session_unavailable)
+    app.add_error_handler(DeviceAlreadyHandled, handle_device_already_handled)
+    app.add_error_handler(DeviceCircuitOpen, handle_device_circuit_open)
+    app.app.add_url_rule('/inventory/stream', view_func=stream_device_inventory, methods=['POST'])
+    app.app.add_url_rule('/metrics', view_func=get_metrics, methods=['GET'])
+    app.app.before_request(start_request_timer)
+    app.app.before_request(record_inventory_version)
+    app.app.before_request(start_request_trace)
+    app.app.after_request(add_inventory_version_header)
+    app.app.after_request(add_data_age_header)
+    app.app.after_request(observe_request)
+    app.app.after_request(add_server_timing_header)
+    app.app.teardown_request(end_request_trace)
+    return app
+
+def record_inventory_version():
+    g.inventory_version = get_inventory_version()
+
+def add_inventory_version_header(response):
+    """Tell which inventory version served the request, the new one for inventory changes."""
+    if 'inventory_version' in g:
+        response.headers[INVENTORY_VERSION_HEADER] = str(g.inventory_version)
+    return response
+
+def add_data_age_header(response):
+    """Tell how many seconds ago the device data served from a snapshot was read."""
+    if 'data_age' in g:
+        response.headers[DATA_AGE_HEADER] = str(int(g.data_age))
+    return response
+
+def prewarm():
+    """Load what the first ssh request needs, scrapli and the genie parser processes, once the server is listening."""
+    from swagger_server.driver.parser_pool import parser_pool
+    started = time.monotonic()
+    import scrapli.driver.core  # noqa: F401
+    parser_pool.start()
+    logging.info(f"Prewarm completed in {time.monotonic() - started:.1f}s")
+
+def start_prewarm():
+    if PREWARM:
+        threading.Thread(target=prewarm, name="prewarm", daemon=True).start()
+
+def main():
+    from waitress import create_server
+    from paste.translogger import TransLogger
+    app = create_app()
+    if INVENTORY_PATH:
+        load_inventory_file(INVENTORY_PATH)
+    if MODE == 'production':
+        server = create_server(TransLogger(app, setup_console_handler=False), host="0.0.0.0", port=PORT, threads=THREADS)
+        start_prewarm()
+        start_fleet_poller()
+        server.run()
+    else:
+        start_prewarm()
+        start_fleet_poller()
+        app.run(port=PORT)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,123 @@
+from swagger_server.driver.cli_parsers import cli_parser
+from swagger_server.driver.driver_registry import driver_registry
+from swagger_server.driver.parser_pool import parser_pool
+from swagger_server.driver.restconf_projection import restconf_projection
+from swagger_server.driver.restconf_session_pool import restconf_session_pool
+from swagger_server.driver.ssh_session_pool import ssh_session_pool
+from swagger_server.utils.circuit_breaker import circuit_breaker
+from swagger_server.utils.fleet_poller import fleet_poller
+from swagger_server.utils.protocol_registry import protocol_registry
+from swagger_server.utils.read_cache import read_cache
+from swagger_server.utils.single_flight import single_flight
+from swagger_server.utils.snapshot_store import snapshot_store
+from swagger_server.utils.write_queue import write_queue
+
+
+def get_protocol_table():
+    """get the management protocol learned for each device.
+
+    :rtype: List[Dict]
+    """
+    return protocol_registry.table()
+
+
+def get_cache_stats():
+    """get read cache statistics.
+
+    :rtype: Dict
+    """
+    return read_cache.stats()
+
+
+def clear_cache(ip=None):
+    """drop the cached reads of a device, or of every device.
+
+    :param ip: Ipv4 of the switch
+    :type ip: str
+    :rtype: None
+    """
+    read_cache.invalidate(device_ip=ip)
+    return None, 204
+
+
+def get_coalescing_stats():
+    """get how many device reads were shared with concurrent identical reads.
+
+    :rtype: Dict
+    """
+    return single_flight.stats()
+
+
+def get_snapshot_stats():
+    """get the background poller progress and the device snapshots it keeps.
+
+    :rtype: Dict
+    """
+    return {"poller": fleet_poller.stats(), "snapshots": snapshot_store.stats()}
+
+
+def get_write_queue_stats():
+    """get how many queued vlan operations were merged into each configuration request.
+
+    :rtype: Dict
+    """
+    return write_queue.stats()
+
+
+def get_session_pool_stats():
+    """get how often pooled RESTCONF and ssh sessions were reused, opened and evicted.
+
+    :rtype: Dict
+    """
+    return {"restconf": restconf_session_pool.stats(), "ssh": ssh_session_pool.stats()}
+
+
+def get_parser_stats():
+    """get how many ssh outputs were parsed by the built-in parsers and by genie.
+
+    :rtype: Dict
+    """
+    return cli_parser.stats()
+
+
+def get_parser_pool_stats():
+    """get queue depth and latency of the genie parser processes.
+
+    :rtype: Dict
+    """
+    return parser_pool.stats()
+
+
+def get_driver_stats():
+    """get how many device drivers are kept and how often they are reused.
+
+    :rtype: Dict
+    """
+    return driver_registry.stats()
+
+
+def get_projection_stats():
+    """get how many RESTCONF reads were projected on the leaves they need.
+
+    :rtype: Dict
+    """
+    return restconf_projection.stats()
+
+
+def get_circuit_breakers():
+    """get the circuit breaker state of devices that failed to answer.
+
+    :rtype: List[Dict]
+    """
+    return circuit_breaker.table()
+
+
+def reset_circuit_breakers(ip=None):
+    """close the circuit breaker of a device, or of every device.
+
+    :param ip: Ipv4 of the switch
+    :type ip: str
+    :rtype: None
+    """
+    circuit_breaker.reset(device_ip=ip)
+    return None, 204
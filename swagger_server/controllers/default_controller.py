@@ -1,12 +1,45 @@
+import asyncio
+import io
+import json
 import logging
+import os
+import queue
+import time
+import aiohttp
 import connexion
-from scrapli.exceptions import ScrapliAuthenticationFailed, ScrapliConnectionError
-from swagger_server.utils.credentials_handler import update_credentials
+import requests
+from flask import Response, g, request
+from swagger_server.models.exceptions import DeviceCircuitOpen, DeviceNotHandled
+from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
+from swagger_server.utils.inventory_stream import ingest_ndjson
+from swagger_server.utils.credentials_handler import add_device, apply_inventory_diff, get_credentials, get_device_ips, \
+    get_snapshot, remove_device, update_credentials, update_device
+from swagger_server.utils.circuit_breaker import circuit_breaker
+from swagger_server.utils.fleet_poller import fleet_poller
+from swagger_server.utils.metrics import observe_device_call, record_circuit_opening, record_circuit_rejection, \
+    record_device_not_handled, record_device_timeout, record_fallback
+from swagger_server.utils.protocol_registry import protocol_registry, RESTCONF, SSH
+from swagger_server.utils.tracing import span
+from swagger_server.utils.read_cache import read_cache, HARDWARE_INFO, VLAN_LIST
+from swagger_server.utils.single_flight import single_flight
+from swagger_server.utils.snapshot_store import snapshot_store, INTERFACES_SWITCHPORT
+from swagger_server.utils.vlan_operations import TAG, UNTAG
+from swagger_server.utils.vlan_set import LIST_FORMAT
+from swagger_server.utils.write_queue import write_queue
 from swagger_server.driver.cisco_ios_xe_restconf import CiscoIosXeREST
 from swagger_server.driver.cisco_ios_xe_ssh import CiscoIosXeSsh
+from swagger_server.driver.async_cisco_ios_xe_restconf import AsyncCiscoIosXeREST
+from swagger_server.driver.async_cisco_ios_xe_ssh import AsyncCiscoIosXeSsh
+from swagger_server.driver.async_runtime import async_runtime
+from CiscoInterfaceNameConverter import converter
 
-RESTCONF_EXCEPTION_TEXT = "An error occurred in RESTCONF with {device_ip} device. Details: {error_detail}"
+PROTOCOL_EXCEPTION_TEXT = "An error occurred in {protocol} with {device_ip} device. Details: {error_detail}"
 NOT_A_JSON_EXCEPTION_TEXT = "Received a request with mime-type different from application/json"
+DEVICE_TIMEOUT_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                             aiohttp.ClientConnectionError, asyncio.TimeoutError)
+BULK_DEFAULT_CONCURRENCY = int(os.getenv('BULK_DEFAULT_CONCURRENCY') or 50)
+BULK_DEFAULT_TIMEOUT = float(os.getenv('BULK_DEFAULT_TIMEOUT') or 30)
+NDJSON_MIMETYPE = 'application/x-ndjson'
 
 async def update_device_inventory():  # noqa: E501
     global inventory
@@ -17,47 +50,391 @@ async def update_device_inventory():  # noqa: E501
     """
     if connexion.request.is_json:
         inventory = connexion.request.get_json()
-        update_credentials(inventory)
+        g.inventory_version = update_credentials(inventory)
         return 'Inventory updated successfully', 200
     return 'Internal server error', 500
-        
-def get_hardware_info(ip):
+
+def stream_device_inventory():
+    """replace the inventory with an NDJSON stream of devices, one device per line.
+
+    Routed outside of connexion, which would load and validate the whole body at once.
+    :rtype: Dict
+    """
+    if request.mimetype != NDJSON_MIMETYPE:
+        status_code = 415
+        return {
+            "detail": f"Expected a {NDJSON_MIMETYPE} body",
+            "status": status_code,
+            "title": "Unsupported Media Type",
+        }, status_code
+    # The WSGI input stream is unbuffered, reading it line by line would read it byte by byte
+    lines = io.BufferedReader(request.stream, buffer_size=65536)
+    report = ingest_ndjson(lines, allow_errors=request.args.get("allow_errors", "false").lower() == "true")
+    if not report["published"]:
+        return report, 422
+    g.inventory_version = report["version"]
+    return report, 200
+
+def get_device_inventory():
+    """get the inventory version and how many devices it holds.
+
+    :rtype: Dict
+    """
+    inventory = get_snapshot()
+    g.inventory_version = inventory.version
+    return {"version": inventory.version, "devices": len(inventory.credentials)}
+
+def update_device_inventory_diff():
+    """add, update and remove many devices as a single inventory version.
+
+    :rtype: Dict
+    """
+    if not connexion.request.is_json:
+        logging.error(NOT_A_JSON_EXCEPTION_TEXT)
+        raise TypeError(NOT_A_JSON_EXCEPTION_TEXT)
+    body = connexion.request.get_json()
+    changes = apply_inventory_diff(upsert=body.get("upsert", []), remove=body.get("remove", []))
+    g.inventory_version = changes["version"]
+    return changes
+
+def add_inventory_device():
+    """add a device to the inventory.
+
+    :rtype: Dict
+    """
+    if not connexion.request.is_json:
+        logging.error(NOT_A_JSON_EXCEPTION_TEXT)
+        raise TypeError(NOT_A_JSON_EXCEPTION_TEXT)
+    g.inventory_version = add_device(connexion.request.get_json())
+    return {"version": g.inventory_version}, 201
+
+def update_inventory_device(ip):
+    """change the credentials of a device of the inventory.
+
+    :param ip: Ipv4 of the switch
+    :type ip: str
+    :rtype: Dict
+    """
+    if not connexion.request.is_json:
+        logging.error(NOT_A_JSON_EXCEPTION_TEXT)
+        raise TypeError(NOT_A_JSON_EXCEPTION_TEXT)
+    g.inventory_version = update_device(dict(connexion.request.get_json(), ip=ip))
+    return {"version": g.inventory_version}
+
+def remove_inventory_device(ip):
+    """remove a device from the inventory.
+
+    :param ip: Ipv4 of the switch
+    :type ip: str
+    :rtype: None
+    """
+    g.inventory_version = remove_device(ip)
+    return None, 204
+
+def device_timeout_exceptions():
+    """Exceptions meaning that the device did not answer, scrapli ones included.
+
+    scrapli is imported on first use instead of at startup.
+    """
+    from scrapli.exceptions import ScrapliAuthenticationFailed, ScrapliConnectionError, ScrapliConnectionNotOpened
+    return DEVICE_TIMEOUT_EXCEPTIONS + (ScrapliAuthenticationFailed, ScrapliConnectionError, ScrapliConnectionNotOpened)
+
+def execute_on_device(ip, action, restconf_call, ssh_call, operation):
+    """Run an operation on a device, starting with the protocol that last worked on it
+    and falling back on the other one.
+
+    Operations are rejected with DeviceCircuitOpen while the circuit breaker of the device
+    is open, instead of waiting for both protocols to time out again.
+
+    :param ip: Ipv4 of the switch
+    :type ip: str
+    :param action: Description of the operation, used in log messages
+    :type action: str
+    :param restconf_call: Performs the operation with restconf
+    :type restconf_call: Callable
+    :param ssh_call: Performs the operation with ssh
+    :type ssh_call: Callable
+    :param operation: Name of the operation in metrics
+    :type operation: str
+    """
+    try:
+        with circuit_breaker.guard(ip):
+            return execute_with_fallback(ip, action, restconf_call, ssh_call, operation)
+    except DeviceCircuitOpen:
+        record_circuit_rejection(operation, ip)
+        raise
+
+def execute_with_fallback(ip, action, restconf_call, ssh_call, operation):
+    attempts = [(RESTCONF, restconf_call), (SSH, ssh_call)]
+    if protocol_registry.preferred(ip) == SSH:
+        attempts.reverse()
+        protocol_registry.reprobe(ip, lambda: CiscoIosXeREST(ip).get_hostname())
+    (first_protocol, first_call), (second_protocol, second_call) = attempts
+
+    try:
+        logging.debug(f"Try to {action} for: {ip} with {first_protocol}")
+        with observe_device_call(operation, first_protocol, ip), span(first_protocol.lower(), operation):
+            result = first_call()
+        record_device_answer(ip, first_protocol)
+        return result
+    except DeviceNotHandled:
+        record_device_not_handled(ip)
+        raise
+    except Exception as e:
+        logging.error(PROTOCOL_EXCEPTION_TEXT.format(protocol=first_protocol, device_ip=ip, error_detail=str(e)))
+
+    record_fallback(operation, first_protocol, second_protocol, ip)
+    try:
+        logging.debug(f"Try to {action} for: {ip} with {second_protocol}")
+        with observe_device_call(operation, second_protocol, ip), span(f"fallback.{second_protocol.lower()}", operation):
+            result = second_call()
+        record_device_answer(ip, second_protocol)
+        return result
+    except device_timeout_exceptions() as e:
+        logging.error(PROTOCOL_EXCEPTION_TEXT.format(protocol=second_protocol, device_ip=ip, error_detail=str(e)))
+        logging.debug(f"Timeout on: {ip} with {second_protocol}")
+        record_device_timeout(operation, second_protocol, ip)
+        record_device_unreachable(ip, e)
+        return None, 504
+    except Exception as e:
+        logging.error(PROTOCOL_EXCEPTION_TEXT.format(protocol=second_protocol, device_ip=ip, error_detail=str(e)))
+        logging.debug(f"There was an error on: {ip} with {second_protocol}")
+        raise e
+
+def record_device_answer(ip, protocol):
+    protocol_registry.record_success(ip, protocol)
+    circuit_breaker.record_reachable(ip)
+
+def record_device_unreachable(ip, error):
+    """Count an operation where neither protocol reached the device towards opening its circuit.
+
+    A device refusing the ssh credentials answered: the failure does not count.
+    """
+    from scrapli.exceptions import ScrapliAuthenticationFailed
+    if isinstance(error, ScrapliAuthenticationFailed):
+        return
+    if circuit_breaker.record_unreachable(ip):
+        record_circuit_opening(ip)
+
+def execute_write_on_device(ip, action, restconf_call, ssh_call, operation):
+    """execute_on_device for operations changing the device configuration.
+
+    Writes can create vlans, so the cached vlan list of the device is dropped once
+    the operation succeeded. Reads in flight on the device are not shared with later
+    requests, nor recorded as snapshots, whatever the outcome.
+    """
+    try:
+        result = execute_on_device(ip, action, restconf_call, ssh_call, operation)
+    finally:
+        single_flight.invalidate(ip)
+        snapshot_store.invalidate(ip, (VLAN_LIST, INTERFACES_SWITCHPORT))
+    if not (isinstance(result, tuple) and result[-1] >= 400):
+        read_cache.invalidate(ip, VLAN_LIST)
+    return result
+
+def no_cache_requested():
+    """Whether the client asked to skip cached reads with a ``Cache-Control: no-cache`` header."""
+    return 'no-cache' in connexion.request.headers.get('Cache-Control', '').lower()
+
+def read_snapshot(kind, ip, max_age, select=lambda value: value):
+    """Serve the ``kind`` snapshot of a device recorded at most ``max_age`` seconds ago, if any.
+
+    Its age is returned in the X-Data-Age header. Snapshots are not served to requests
+    with a ``Cache-Control: no-cache`` header, nor for devices no longer in the inventory.
+
+    :param max_age: Maximum age in seconds, any age when None
+    :type max_age: int
+    :param select: Picks the served part of the snapshot, None when it is missing
+    :type select: Callable
+    :return: The snapshot, or None when the device must be read
+    """
+    if not snapshot_store.enabled or no_cache_requested() or get_credentials(ip) is None:
+        return None
+    snapshot = snapshot_store.get(kind, ip, max_age)
+    value = select(snapshot[0]) if snapshot is not None else None
+    if value is not None:
+        g.data_age = snapshot[1]
+    return value
+
+def record_snapshot(kind, ip, read):
+    """Read a device with ``read`` and record the result as the ``kind`` snapshot of the device."""
+    generation = snapshot_store.generation(ip)
+    return snapshot_store.record(kind, ip, read(), generation)
+
+def start_fleet_poller():
+    """Refresh the snapshots of every device in background, when POLL_INTERVAL is set."""
+    fleet_poller.start({HARDWARE_INFO: fetch_hardware_info,
+                        VLAN_LIST: fetch_vlan_list,
+                        INTERFACES_SWITCHPORT: fetch_interfaces_configuration_information})
+
+async def execute_on_device_async(ip, action, restconf_call, ssh_call, operation):
+    """Coroutine counterpart of execute_on_device, for the async drivers.
+
+    :param restconf_call: Returns a coroutine performing the operation with restconf
+    :type restconf_call: Callable
+    :param ssh_call: Returns a coroutine performing the operation with ssh
+    :type ssh_call: Callable
+    :return: The operation result and the protocol that produced it
+    :rtype: Tuple
+    """
+    try:
+        with circuit_breaker.guard(ip):
+            return await execute_with_fallback_async(ip, action, restconf_call, ssh_call, operation)
+    except DeviceCircuitOpen:
+        record_circuit_rejection(operation, ip)
+        raise
+
+async def execute_with_fallback_async(ip, action, restconf_call, ssh_call, operation):
+    attempts = [(RESTCONF, restconf_call), (SSH, ssh_call)]
+    if protocol_registry.preferred(ip) == SSH:
+        attempts.reverse()
+        protocol_registry.reprobe(ip, lambda: CiscoIosXeREST(ip).get_hostname())
+    (first_protocol, first_call), (second_protocol, second_call) = attempts
+
+    try:
+        logging.debug(f"Try to {action} for: {ip} with {first_protocol}")
+        with observe_device_call(operation, first_protocol, ip):
+            result = await first_call()
+        record_device_answer(ip, first_protocol)
+        return result, first_protocol
+    except DeviceNotHandled:
+        record_device_not_handled(ip)
+        raise
+    except Exception as e:
+        logging.error(PROTOCOL_EXCEPTION_TEXT.format(protocol=first_protocol, device_ip=ip, error_detail=str(e)))
+
+    record_fallback(operation, first_protocol, second_protocol, ip)
+    logging.debug(f"Try to {action} for: {ip} with {second_protocol}")
+    try:
+        with observe_device_call(operation, second_protocol, ip):
+            result = await second_call()
+    except device_timeout_exceptions() as e:
+        record_device_unreachable(ip, e)
+        raise
+    record_device_answer(ip, second_protocol)
+    return result, second_protocol
+
+def get_hardware_info(ip, max_age=None):
     """get hardware info of the switch.
 
     Retrieve base serial number and model number for the specified switch.  
 
     :param ip: Ipv4 of the switch to query
     :type ip: dict | bytes
+    :param max_age: Maximum age in seconds of hardware info served from a snapshot or the cache
+    :type max_age: int
 
     :rtype: Object
     """
-    try:
-        logging.debug(f"Try to fetch hardware info for: {ip} with restconf")
+    hardware_info = read_snapshot(HARDWARE_INFO, ip, max_age)
+    if hardware_info is not None:
+        return hardware_info
+    return read_cache.get_or_load(HARDWARE_INFO, ip, lambda: fetch_hardware_info(ip),
+                                  bypass=no_cache_requested() or max_age is not None)
+
+
+def fetch_hardware_info(ip):
+    def restconf_call():
         hostname = CiscoIosXeREST(ip).get_hostname()
         hardware_data = CiscoIosXeREST(ip).get_hardware_data()
         hardware_data.update(hostname)
-        hardware_data['management_protocol'] = "RESTCONF"
+        hardware_data['management_protocol'] = RESTCONF
+        return hardware_data
+
+    def ssh_call():
+        res = CiscoIosXeSsh(ip).get_version_info()
+        res['management_protocol'] = SSH
+        return res
+
+    return record_snapshot(HARDWARE_INFO, ip, lambda: single_flight.do(("get_hardware_info", ip), lambda: execute_on_device(
+        ip, "fetch hardware info", restconf_call, ssh_call, operation="get_hardware_info")))
+
+
+def get_bulk_hardware_info():
+    """get hardware info of many switches.
+
+    Fetch hardware info of the requested switches concurrently and stream one NDJSON
+    line per switch as soon as it completes.
+
+    :rtype: Response
+    """
+    body = connexion.request.get_json()
+    ips = get_device_ips() if body.get("all") else list(dict.fromkeys(body.get("ips", [])))
+    concurrency = body.get("concurrency", BULK_DEFAULT_CONCURRENCY)
+    timeout = body.get("timeout", BULK_DEFAULT_TIMEOUT)
+    results = queue.Queue()
+
+    async def restconf_call(ip):
+        hostname = await AsyncCiscoIosXeREST(ip).get_hostname()
+        hardware_data = await AsyncCiscoIosXeREST(ip).get_hardware_data()
+        hardware_data.update(hostname)
         return hardware_data
-    except Exception as e:
-        logging.error(RESTCONF_EXCEPTION_TEXT.format(
-            device_ip=ip, error_detail=str(e)))
-        logging.debug(f"Try to fetch hardware info for: {ip} with ssh")
 
+    async def fetch(ip, semaphore):
+        async with semaphore:
+            started = time.monotonic()
+            line = {"ip": ip}
+            try:
+                hardware_data, protocol = await asyncio.wait_for(
+                    execute_on_device_async(ip, "fetch hardware info",
+                                            lambda: restconf_call(ip),
+                                            lambda: AsyncCiscoIosXeSsh(ip).get_version_info(),
+                                            operation="get_bulk_hardware_info"),
+                    timeout)
+                if hardware_data is None:
+                    raise ValueError("Unable to parse hardware info")
+                line.update(status="ok", management_protocol=protocol, hardware=dict(hardware_data, management_protocol=protocol))
+            except asyncio.TimeoutError:
+                line.update(status="timeout", detail=f"No answer within {timeout}s")
+            except DeviceNotHandled as e:
+                line.update(status="not_handled", detail=str(e))
+            except DeviceCircuitOpen as e:
+                line.update(status="circuit_open", detail=str(e), retry_after=e.retry_after)
+            except Exception as e:
+                logging.error(PROTOCOL_EXCEPTION_TEXT.format(protocol="bulk", device_ip=ip, error_detail=str(e)))
+                line.update(status="error", detail=str(e))
+            line["elapsed"] = round(time.monotonic() - started, 3)
+            results.put(line)
+
+    async def fan_out():
+        semaphore = asyncio.Semaphore(concurrency)
         try:
-            res = CiscoIosXeSsh(ip).get_version_info()
-            res['management_protocol'] = "SSH"
-            return res
-        except (ScrapliAuthenticationFailed, ScrapliConnectionError) as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"Timout gathering info from: {ip} with ssh")
-            return None, 504
-        except Exception as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"There was an error gathering info to: {ip} with ssh")
-            raise e
-
-
-def get_interface_configuration_information(ip, interface_name):
+            await asyncio.gather(*(fetch(ip, semaphore) for ip in ips))
+        finally:
+            results.put(None)
+
+    logging.info(f"Fetching hardware info of {len(ips)} devices with concurrency {concurrency}")
+    fan_out_future = async_runtime.submit(fan_out())
+
+    def stream():
+        try:
+            while True:
+                line = results.get()
+                if line is None:
+                    return
+                # Passed through to the WSGI server as is, which only accepts bytes
+                yield (json.dumps(line) + "\n").encode()
+        finally:
+            fan_out_future.cancel()
+
+    response = Response(stream(), mimetype=NDJSON_MIMETYPE)
+    response.direct_passthrough = True
+    return response
+
+
+def format_switchport_vlans(result, vlan_format):
+    """Render the vlans of one or many switchport configurations in ``vlan_format``.
+
+    The default list format is left to the JSON encoder, error responses are returned as they are.
+    """
+    if vlan_format == LIST_FORMAT or isinstance(result, tuple):
+        return result
+    if isinstance(result, InterfaceSwitchportConfigurationInformation):
+        return {"mode": result.mode, "vlans": result.vlans.formatted(vlan_format)}
+    return {interface_name: format_switchport_vlans(interface_info, vlan_format) for interface_name, interface_info in result.items()}
+
+
+def get_interface_configuration_information(ip, interface_name, vlan_format=LIST_FORMAT, max_age=None):
     """get all configuration information associated with a switch interface.
 
     Retrieve interface configuration information for the specified switch.          
@@ -66,70 +443,99 @@ def get_interface_configuration_information(ip, interface_name):
     :type ip: dict | bytes
     :param interface_name: Full name of the desired interface
     :type interface_name: str
+    :param vlan_format: list, ranges or structured
+    :type vlan_format: str
+    :param max_age: Maximum age in seconds of the switchport configuration served from a snapshot
+    :type max_age: int
 
     :rtype: InterfacesConfigurationInformation
     """      
-    try:
-        logging.debug(f"Try to fetch interface {interface_name} configuration for: {ip} with restconf")
-        return CiscoIosXeREST(ip).get_interface_configuration_information(interface_name=interface_name)
-    except Exception as e:
-        logging.error(RESTCONF_EXCEPTION_TEXT.format(
-            device_ip=ip, error_detail=str(e)))
-        logging.debug(f"Try to fetch interface {interface_name} configuration for: {ip} with ssh")
+    interface_info = read_snapshot(INTERFACES_SWITCHPORT, ip, max_age, lambda interfaces: interfaces.get(
+        converter.convert_interface(interface_name=interface_name, return_long=True)))
+    if interface_info is None:
+        interface_info = single_flight.do(
+            ("get_interface_configuration_information", ip, interface_name),
+            lambda: execute_on_device(ip, f"fetch interface {interface_name} configuration",
+                                      lambda: CiscoIosXeREST(ip).get_interface_configuration_information(interface_name=interface_name),
+                                      lambda: CiscoIosXeSsh(ip).get_interface_configuration_information(interface_name=interface_name),
+                                      operation="get_interface_configuration_information"))
+    return format_switchport_vlans(interface_info, vlan_format)
 
-        try:
-            res = CiscoIosXeSsh(ip).get_interface_configuration_information(interface_name=interface_name)
-            return res
-        except (ScrapliAuthenticationFailed, ScrapliConnectionError) as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"Timout gathering info from: {ip} with ssh")
-            return None, 504
-        except Exception as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"There was an error gathering info to: {ip} with ssh")
-            raise e
-
-
-def get_vlan_list(ip):
-    try:
-        logging.debug(f"Try to fetch vlan list for: {ip} with restconf")
-        return CiscoIosXeREST(ip).get_vlan_list()
-    except Exception as e:
-        logging.error(RESTCONF_EXCEPTION_TEXT.format(
-            device_ip=ip, error_detail=str(e)))
-        logging.debug(f"Try to fetch vlan list for: {ip} with ssh")
 
-        try:
-            res = CiscoIosXeSsh(ip).get_vlan_list()
-            return res
-        except (ScrapliAuthenticationFailed, ScrapliConnectionError) as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"Timout gathering info from: {ip} with ssh")
-            return None, 504
-        except Exception as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"There was an error gathering info to: {ip} with ssh")
-            raise e
+def get_interfaces_configuration_information(ip, vlan_format=LIST_FORMAT, max_age=None):
+    """get switchport configuration of every interface of a switch.
+
+    :param ip: Ipv4 of the switch to query
+    :type ip: str
+    :param vlan_format: list, ranges or structured
+    :type vlan_format: str
+    :param max_age: Maximum age in seconds of the switchport configuration served from a snapshot
+    :type max_age: int
+
+    :rtype: Dict[str, InterfaceSwitchportConfigurationInformation]
+    """
+    interfaces = read_snapshot(INTERFACES_SWITCHPORT, ip, max_age)
+    if interfaces is None:
+        interfaces = fetch_interfaces_configuration_information(ip)
+    return format_switchport_vlans(interfaces, vlan_format)
+
+
+def fetch_interfaces_configuration_information(ip):
+    return record_snapshot(INTERFACES_SWITCHPORT, ip, lambda: single_flight.do(
+        ("get_interfaces_configuration_information", ip),
+        lambda: execute_on_device(ip, "fetch all interfaces configuration",
+                                  lambda: CiscoIosXeREST(ip).get_interfaces_configuration_information(),
+                                  lambda: CiscoIosXeSsh(ip).get_interfaces_configuration_information(),
+                                  operation="get_interfaces_configuration_information")))
+
+
+def get_vlan_list(ip, max_age=None):
+    vlan_list = read_snapshot(VLAN_LIST, ip, max_age)
+    if vlan_list is not None:
+        return vlan_list
+    return read_cache.get_or_load(VLAN_LIST, ip, lambda: fetch_vlan_list(ip),
+                                  bypass=no_cache_requested() or max_age is not None)
+
+
+def fetch_vlan_list(ip):
+    return record_snapshot(VLAN_LIST, ip, lambda: single_flight.do(("get_vlan_list", ip), lambda: execute_on_device(
+        ip, "fetch vlan list",
+        lambda: CiscoIosXeREST(ip).get_vlan_list(),
+        lambda: CiscoIosXeSsh(ip).get_vlan_list(),
+        operation="get_vlan_list")))
 
 
 def switch_port_mode(ip, mode, interface_name):
-    try:
-        logging.debug(f"Try to change switch port mode for: {ip} on {interface_name} with restconf")
-        return CiscoIosXeREST(ip).interface_mode(mode, interface_name)
-    except Exception as e:
-        logging.error(RESTCONF_EXCEPTION_TEXT.format(
-            device_ip=ip, error_detail=str(e)))
-        logging.debug(f"Try to change switch port mode for: {ip} on {interface_name} with ssh")
-        try:
-            return CiscoIosXeSsh(ip).interface_mode(mode, interface_name)
-        except (ScrapliAuthenticationFailed, ScrapliConnectionError) as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"Timout on: {ip} with ssh")
-            return None, 504
-        except Exception as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"There was an error on: {ip} with ssh")
-            raise e
+    return write_queue.run(ip, lambda: execute_write_on_device(
+        ip, f"change switch port mode on {interface_name}",
+        lambda: CiscoIosXeREST(ip).interface_mode(mode, interface_name),
+        lambda: CiscoIosXeSsh(ip).interface_mode(mode, interface_name),
+        operation="switch_port_mode"))
+
+
+def queue_vlan_operations(ip, operations):
+    """Apply vlan operations through the write queue of the device.
+
+    Operations queued by concurrent requests on the same device are merged with these ones
+    into a single read of the switchport configuration and a single configuration request.
+
+    :return: One result per operation, or the error response of the device call.
+    :rtype: Union[List[Dict], Tuple]
+    """
+    return write_queue.apply_vlan_operations(ip, operations, lambda batch: execute_write_on_device(
+        ip, f"apply {len(batch)} vlan operations",
+        lambda: CiscoIosXeREST(ip).apply_vlan_operations(batch),
+        lambda: CiscoIosXeSsh(ip).apply_vlan_operations(batch),
+        operation="apply_vlan_operations"))
+
+
+def vlan_operation_error(result):
+    status_code = 502
+    return {
+        "detail": result["detail"],
+        "status": status_code,
+        "title": "Bad Gateway",
+    }, status_code
 
 
 def tag_interface(interface_name):
@@ -139,40 +545,33 @@ def tag_interface(interface_name):
     body = connexion.request.get_json()
     ip = body.get("ip")
     vlan_ids = body.get("vlan_ids")
-    append = body.get("append", None)
-    try:
-        logging.debug(f"Try to tag switch interface for: {ip} on {interface_name} with restconf")
-        return CiscoIosXeREST(ip).tag_interface(interface_name, vlan_ids, append)
-    except Exception as e:
-        logging.error(RESTCONF_EXCEPTION_TEXT.format(
-            device_ip=ip, error_detail=str(e)))
-        try:
-            logging.debug(f"Try to tag switch interface for: {ip} on {interface_name} with SSH")
-            return CiscoIosXeSsh(ip).tag_interface(interface_name, vlan_ids, append)
-        except (ScrapliAuthenticationFailed, ScrapliConnectionError) as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"Timout on: {ip} with ssh")
-            return None, 504
-        except Exception as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"There was on: {ip} with ssh")
-            raise e
+    append = body.get("append", False)
+    results = queue_vlan_operations(ip, [{"interface_name": interface_name, "action": TAG, "vlan_ids": vlan_ids,
+                                          "append": append}])
+    if isinstance(results, tuple):
+        return results
+    if results[0]["status"] != "ok":
+        return vlan_operation_error(results[0])
+    return {"mode": results[0]["mode"], "vlans": results[0]["vlans"]}, 200
+
+def tag_interfaces():
+    """tag and untag vlans on many interfaces of a switch in a single device transaction.
+
+    :rtype: Dict
+    """
+    if not connexion.request.is_json:
+        logging.error(NOT_A_JSON_EXCEPTION_TEXT)
+        raise TypeError(NOT_A_JSON_EXCEPTION_TEXT)
+    body = connexion.request.get_json()
+    results = queue_vlan_operations(body.get("ip"), body.get("operations"))
+    if isinstance(results, tuple):
+        return results
+    return {"results": results}
 
 def untag_interface(ip, interface_name, vlan_id):
-    try:
-        logging.debug(f"Try to untag vlan {vlan_id} for {ip} on {interface_name} with restconf")
-        return CiscoIosXeREST(ip).untag_interface(interface_name, vlan_id)
-    except Exception as e:
-        logging.error(RESTCONF_EXCEPTION_TEXT.format(
-            device_ip=ip, error_detail=str(e)))
-        try:
-            logging.debug(f"Try to untag vlan {vlan_id} for {ip} on {interface_name} with with SSH")
-            return CiscoIosXeSsh(ip).untag_interface(interface_name, vlan_id)
-        except (ScrapliAuthenticationFailed, ScrapliConnectionError) as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"Timout on: {ip} with ssh")
-            return None, 504
-        except Exception as e:
-            logging.error(RESTCONF_EXCEPTION_TEXT.format(device_ip=ip, error_detail=str(e)))
-            logging.debug(f"There was an error on: {ip} with ssh")
-            raise e
\ No newline at end of file
+    results = queue_vlan_operations(ip, [{"interface_name": interface_name, "action": UNTAG, "vlan_ids": str(vlan_id)}])
+    if isinstance(results, tuple):
+        return results
+    if results[0]["status"] != "ok":
+        return vlan_operation_error(results[0])
+    return {"result": f"Vlan {vlan_id} removed from interface {interface_name} on device {ip}"}, 200
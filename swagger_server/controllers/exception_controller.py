@@ -12,11 +12,29 @@ def handle_device_not_handled(exception):
         "title": "Not Found",
     }, status_code   
 
-def handle_device_timeout(exception):
-    status_code = 504
+def handle_device_session_unavailable(exception):
+    status_code = 503
     logging.error(EXCEPTION_TEXT.format(error_detail=str(exception)))
     return {
         "detail": str(exception),
         "status": status_code,
-        "title": "Gateway Timeout",
-    }, status_code
\ No newline at end of file
+        "title": "Service Unavailable",
+    }, status_code
+
+def handle_device_already_handled(exception):
+    status_code = 409
+    logging.error(EXCEPTION_TEXT.format(error_detail=str(exception)))
+    return {
+        "detail": str(exception),
+        "status": status_code,
+        "title": "Conflict",
+    }, status_code
+
+def handle_device_circuit_open(exception):
+    status_code = 503
+    logging.warning(EXCEPTION_TEXT.format(error_detail=str(exception)))
+    return {
+        "detail": str(exception),
+        "status": status_code,
+        "title": "Service Unavailable",
+    }, status_code, {"Retry-After": str(exception.retry_after)}
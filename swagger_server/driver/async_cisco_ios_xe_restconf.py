@@ -0,0 +1,84 @@
+import logging
+
+import aiohttp
+
+from swagger_server.driver.async_runtime import async_runtime
+from swagger_server.driver.cisco_ios_xe_restconf import DEFAULT_TIMEOUT, HARDWARE_PATH, HOSTNAME_PATH, \
+    parse_hardware_data, parse_hostname, restconf_url
+from swagger_server.driver.restconf_projection import HARDWARE_FIELDS, restconf_projection
+from swagger_server.driver.restconf_session_pool import ACCEPT_HEADER
+from swagger_server.driver.driver_registry import RegisteredDriver
+from swagger_server.driver.switchport_path_cache import switchport_path_cache
+from swagger_server.models.exceptions import DeviceNotHandled
+from swagger_server.utils.credentials_handler import get_credentials
+
+
+class AsyncCiscoIosXeREST(metaclass=RegisteredDriver):
+    """Driver that extracts data from a Cisco IOS XE switch using restconf, asynchronously.
+
+    ``AsyncCiscoIosXeREST(device_ip)`` returns the driver of the device kept in :data:`driver_registry`,
+    rebuilt when the inventory entry of the device changes.
+
+    Coroutines must run on the shared loop of :data:`async_runtime`.
+
+    :param device_ip: The IP address of the switch to be controlled.
+    :type device_ip: str
+    """
+
+    def __init__(self, device_ip):
+        """Constructor method
+
+        :raises DeviceNotHandled: If the credentials associated with the controlled
+        device are not present in the credential manager.
+        """
+        logging.debug(f"Create async restconf driver for device {device_ip}")
+        try:
+            credentials = get_credentials(device_ip=device_ip)
+            self.__device_ip = device_ip
+            self.__auth = aiohttp.BasicAuth(credentials.get('username'), credentials.get('password'))
+        except:
+            del self
+            raise DeviceNotHandled(f"The service does not handle the specified device. Crediantal for device {device_ip} not available")
+
+    async def __get(self, path, fields=None):
+        """GET a RESTCONF resource, projected on ``fields`` unless the device rejects that projection, and return its decoded body.
+
+        A projected read answered with 400 is sent again without projection. The projection
+        is recorded as rejected only when that read succeeds, the 400 came from the path otherwise.
+
+        :raises aiohttp.ClientResponseError: On an error status.
+        """
+        projection = restconf_projection.fields(self.__device_ip, fields) if fields else None
+        async with async_runtime.device_slot(self.__device_ip):
+            if projection:
+                async with self.__get_projected(path, projection) as response:
+                    if response.status != 400:
+                        return await self.__read(response)
+            async with self.__get_projected(path, None) as response:
+                body = await self.__read(response)
+        if projection and response.ok:
+            restconf_projection.record_rejected(self.__device_ip, projection, path)
+        return body
+
+    def __get_projected(self, path, projection):
+        return async_runtime.http_session().get(restconf_url(self.__device_ip, path, projection),
+                                                headers={'Accept': ACCEPT_HEADER}, auth=self.__auth,
+                                                timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT))
+
+    @staticmethod
+    async def __read(response):
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+    async def get_hostname(self):
+        logging.debug(f"Fetching hostname for: {self.__device_ip}")
+        return parse_hostname(await self.__get(HOSTNAME_PATH))
+
+    async def get_hardware_data(self):
+        logging.debug(f"Fetching hardware info for: {self.__device_ip}")
+        hardware_data = parse_hardware_data(await self.__get(HARDWARE_PATH, fields=HARDWARE_FIELDS))
+        if hardware_data:
+            switchport_path_cache.observe_version(self.__device_ip, hardware_data['version'])
+            restconf_projection.observe_version(self.__device_ip, hardware_data['version'])
+        return hardware_data
+
@@ -0,0 +1,39 @@
+import logging
+
+from swagger_server.driver.async_runtime import async_runtime
+from swagger_server.driver.cisco_ios_xe_ssh import CiscoIosXeSsh
+from swagger_server.driver.driver_registry import RegisteredDriver
+
+
+class AsyncCiscoIosXeSsh(metaclass=RegisteredDriver):
+    """Driver that extracts data from a Cisco IOS XE switch using ssh, asynchronously.
+
+    ``AsyncCiscoIosXeSsh(device_ip)`` returns the driver of the device kept in :data:`driver_registry`,
+    rebuilt when the inventory entry of the device changes.
+
+    Coroutines must run on the shared loop of :data:`async_runtime`. Commands go through
+    the sessions of :data:`ssh_session_pool`, shared with :class:`CiscoIosXeSsh`, so the
+    sync driver runs on the blocking thread pool of the runtime: opening a session costs
+    the key exchange and authentication, and sessions are bounded per device.
+
+    :param device_ip: The IP address of the switch to be controlled.
+    :type device_ip: str
+    """
+
+    def __init__(self, device_ip):
+        """Constructor method
+
+        :raises DeviceNotHandled: If the credentials associated with the controlled
+        device are not present in the credential manager.
+        """
+        logging.debug(f"Create async ssh driver for device {device_ip}")
+        self.__device_ip = device_ip
+        self.__driver = CiscoIosXeSsh(device_ip)
+
+    async def __call(self, method, *args):
+        async with async_runtime.device_slot(self.__device_ip):
+            return await async_runtime.run_blocking(method, *args)
+
+    async def get_version_info(self):
+        return await self.__call(self.__driver.get_version_info)
+
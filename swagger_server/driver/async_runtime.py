@@ -0,0 +1,98 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from swagger_server.driver.restconf_session_pool import RESTCONF_POOL_CONNECTIONS, RESTCONF_POOL_IDLE_TIMEOUT
+from swagger_server.driver.ssh_session_pool import SSH_POOL_MAX_SESSIONS
+
+ASYNC_DEVICE_CONCURRENCY = int(os.getenv('ASYNC_DEVICE_CONCURRENCY') or 4)
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS') or 1000)
+ASYNC_RUNTIME_CLOSE_TIMEOUT = 5
+
+
+class AsyncRuntime:
+    """Event loop running in a background thread, shared by the async drivers.
+
+    Any thread can hand coroutines to the loop with :meth:`submit` or :meth:`run`, so
+    many device operations are multiplexed on a single thread. Coroutines talking to a
+    device should hold :meth:`device_slot` so no more than ``device_concurrency``
+    operations run against the same switch at once. Blocking calls, such as the pooled
+    ssh driver, run on a thread pool with :meth:`run_blocking`.
+
+    :param device_concurrency: Maximum number of concurrent operations per device.
+    :type device_concurrency: int
+    """
+
+    def __init__(self, device_concurrency):
+        self.device_concurrency = device_concurrency
+        self._lock = threading.Lock()
+        self._loop = None
+        self._http_session = None
+        # More threads than pooled ssh sessions would only wait for a free session
+        self._blocking_executor = ThreadPoolExecutor(max_workers=SSH_POOL_MAX_SESSIONS, thread_name_prefix="async-blocking")
+        self._device_slots = weakref.WeakValueDictionary()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="async-driver-loop", daemon=True).start()
+            return self._loop
+
+    def submit(self, coroutine):
+        """Schedule ``coroutine`` on the shared loop.
+
+        :rtype: concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """Run ``coroutine`` on the shared loop and wait for its result."""
+        return self.submit(coroutine).result(timeout)
+
+    def device_slot(self, device_ip):
+        """Semaphore limiting concurrent operations on ``device_ip``. Must be used from the shared loop."""
+        slot = self._device_slots.get(device_ip)
+        if slot is None:
+            slot = asyncio.Semaphore(self.device_concurrency)
+            self._device_slots[device_ip] = slot
+        return slot
+
+    async def run_blocking(self, function, *args):
+        """Run the blocking ``function`` on the thread pool and wait for its result. Must be used from the shared loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._blocking_executor, function, *args)
+
+    def http_session(self):
+        """Keep-alive HTTP client shared by the async RESTCONF driver. Must be used from the shared loop."""
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(ssl=False,
+                                             limit=ASYNC_HTTP_MAX_CONNECTIONS,
+                                             limit_per_host=RESTCONF_POOL_CONNECTIONS,
+                                             keepalive_timeout=RESTCONF_POOL_IDLE_TIMEOUT)
+            self._http_session = aiohttp.ClientSession(connector=connector)
+        return self._http_session
+
+    def close(self):
+        """Close the shared HTTP session and stop the loop, if it was started."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._http_session is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._http_session.close(), loop).result(ASYNC_RUNTIME_CLOSE_TIMEOUT)
+            except Exception as e:
+                logging.warning(f"Unable to close the async HTTP session: {e}")
+            self._http_session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+async_runtime = AsyncRuntime(device_concurrency=ASYNC_DEVICE_CONCURRENCY)
+atexit.register(async_runtime.close)
@@ -1,24 +1,151 @@
 import json
 import logging
+import os
 import urllib.parse
-import requests
-from swagger_server.driver.singleton_driver import SingletonArgs
+from swagger_server.driver.driver_registry import RegisteredDriver
+from swagger_server.driver.restconf_projection import HARDWARE_FIELDS, SWITCHPORT_FIELDS, VLAN_LIST_FIELDS, \
+    interfaces_switchport_fields, restconf_projection
+from swagger_server.driver.restconf_session_pool import restconf_session_pool
+from swagger_server.driver.switchport_path_cache import switchport_path_cache
 from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
 from swagger_server.utils.mac_conversion import *
 
 from swagger_server.models.exceptions import DeviceNotHandled
 from swagger_server.utils.credentials_handler import get_credentials
+from swagger_server.utils.tracing import span
 from CiscoInterfaceNameConverter import converter
-from swagger_server.utils.vlan_syntax_converter import adjust_vlan_set, remove_vlan_from_set, unroll_vlans
+from swagger_server.utils.vlan_operations import plan_vlan_operations
 
-ACCEPT_HEADER = 'application/yang-data+json'
 CONTENT_TYPE_HEADER = 'application/yang-data+json'
 DEFAULT_TIMEOUT = 5
+RESTCONF_PORT = int(os.getenv('RESTCONF_PORT') or 443)
 
+HOSTNAME_PATH = 'Cisco-IOS-XE-native:native/hostname'
+HARDWARE_PATH = 'Cisco-IOS-XE-device-hardware-oper:device-hardware-data/device-hardware'
+VLAN_LIST_PATH = 'Cisco-IOS-XE-native:native/vlan/Cisco-IOS-XE-vlan:vlan-list'
+INTERFACES_PATH = 'Cisco-IOS-XE-native:native/interface'
 
-class CiscoIosXeREST(metaclass=SingletonArgs):
-    """Singleton class that extract data from a Cisco IOS XE switch using restconf.
+
+def restconf_url(device_ip, path, fields=None):
+    url = f"https://{device_ip}:{RESTCONF_PORT}/restconf/data/{path}"
+    if fields:
+        url += "?fields=" + urllib.parse.quote(fields, safe="/:;()-")
+    return url
+
+def interfaces_fields(device_ip):
+    """Projection of the interfaces on their switchport configuration, under the switchport path known for the device."""
+    known_path = switchport_path_cache.known(device_ip)
+    return interfaces_switchport_fields((known_path,) if known_path else switchport_path_cache.candidates(device_ip))
+
+def split_interface_name(interface_name):
+    """Split an interface name in its long type and number (e.g. GigabitEthernet and 1/0/1)."""
+    long_interface = converter.convert_interface(interface_name=interface_name, return_long=True)
+    regex = r'^([^\d]+)(\d+.*)$'
+    splitted_interface = re.search(regex, long_interface)
+    return splitted_interface[1], splitted_interface[2]
+
+def native_interface_path(interface_name):
+    interface_type, interface_number = split_interface_name(interface_name)
+    url_encoded_interface_number = urllib.parse.quote_plus(interface_number)
+    return f"Cisco-IOS-XE-native:native/interface/{interface_type}={url_encoded_interface_number}"
+
+def switchport_body(interface_info):
+    if interface_info.mode == "trunk":
+        return {
+            "Cisco-IOS-XE-switch:trunk": {
+                "allowed": {
+                    # The vlans leaf does not accept an empty range, an empty allowed list is the none leaf
+                    "vlan": {"vlans": str(interface_info.vlans)} if interface_info.vlans else {"none": [None]}
+                }
+            }
+        }
+    return {
+        "Cisco-IOS-XE-switch:access": {
+            "vlan": {
+                "vlan": str(interface_info.vlans)
+            }
+        }
+    }
+
+def interfaces_switchport_body(interfaces, switchport_path):
+    """Body of a PATCH on the native interface list setting the switchport configuration of many interfaces."""
+    interface_lists = {}
+    for interface_name, interface_info in interfaces.items():
+        interface_type, interface_number = split_interface_name(interface_name)
+        entry = switchport_body(interface_info)
+        for container in reversed(switchport_path.split("/")):
+            entry = {container: entry}
+        interface_lists.setdefault(interface_type, []).append(dict(entry, name=interface_number))
+    return {"Cisco-IOS-XE-native:interface": interface_lists}
+
+def parse_hostname(response):
+    return {
+        'hostname': response['Cisco-IOS-XE-native:hostname']
+    }
+
+def parse_hardware_data(response):
+    res = response['Cisco-IOS-XE-device-hardware-oper:device-hardware']
+    device_inventory = res['device-inventory'][0]
+    software_version = res['device-system-data']['software-version']
     
+    try:
+        match = re.split(r',\s*', software_version)
+        platform = re.split(r'\sSoftware\s*', match[1])[0]
+        image_id = re.split(r'\sSoftware\s*', match[1])[1][1:-1]
+        version = re.split(r'Version\s*', match[2])[1]
+        
+        return {
+            'chassis': device_inventory['part-number'],
+            'chassis_sn': device_inventory['serial-number'],
+            'platform': platform,
+            'image_id': image_id,
+            'version': version
+        }
+    except Exception:
+        return None
+
+def parse_switchport(response):
+    return parse_switchport_parameters(response['Cisco-IOS-XE-native:switchport'])
+
+def parse_switchport_parameters(switchport_parameters):
+    mode = list(switchport_parameters['Cisco-IOS-XE-switch:mode'].keys())[0]
+    vlans = "1" if mode == 'access' and 'Cisco-IOS-XE-switch:access' not in switchport_parameters else \
+    str(switchport_parameters['Cisco-IOS-XE-switch:access']['vlan']['vlan']) if mode == 'access' and 'Cisco-IOS-XE-switch:access' in switchport_parameters else \
+    "1-4094" if mode == 'trunk' and "Cisco-IOS-XE-switch:trunk" not in switchport_parameters else \
+    parse_trunk_allowed_vlans(switchport_parameters['Cisco-IOS-XE-switch:trunk'])
+    return InterfaceSwitchportConfigurationInformation(mode=mode, vlans=vlans)
+
+def parse_trunk_allowed_vlans(trunk):
+    allowed_vlan = trunk.get('allowed', {}).get('vlan', {})
+    if 'none' in allowed_vlan:
+        return "none"
+    return str(allowed_vlan.get('vlans', "1-4094"))
+
+def parse_interfaces_switchport(response):
+    """Switchport configuration of every interface with an explicit switchport mode, keyed by long interface name."""
+    interfaces = {}
+    for interface_type, entries in response['Cisco-IOS-XE-native:interface'].items():
+        for entry in entries:
+            for switchport_parameters in (entry.get('switchport-config', {}).get('switchport'), entry.get('switchport')):
+                if isinstance(switchport_parameters, dict) and 'Cisco-IOS-XE-switch:mode' in switchport_parameters:
+                    interfaces[f"{interface_type}{entry['name']}"] = parse_switchport_parameters(switchport_parameters)
+                    break
+    return interfaces
+
+def parse_vlan_list(response):
+    vlan_list = response["Cisco-IOS-XE-vlan:vlan-list"]
+    return [{
+        "id": vlan['id'],
+        "name": vlan.get('name', f"VLAN{vlan['id']:04d}")
+    } for vlan in vlan_list] + [{"id": 1, "name": "default"}]
+
+
+class CiscoIosXeREST(metaclass=RegisteredDriver):
+    """Driver that extracts data from a Cisco IOS XE switch using restconf.
+
+    ``CiscoIosXeREST(device_ip)`` returns the driver of the device kept in :data:`driver_registry`,
+    rebuilt when the inventory entry of the device changes.
+
     :param device_ip: The IP address of the switch to be controlled.
     :type device_ip: str
     """
@@ -38,98 +165,131 @@ class CiscoIosXeREST(metaclass=SingletonArgs):
         except:
             del self
             raise DeviceNotHandled(f"The service does not handle the specified device. Crediantal for device {device_ip} not available")
-    
+
+    def __session(self):
+        return restconf_session_pool.session(self.__device_ip, self.__username, self.__device_password)
+
+    # verify is passed with each request: requests lets REQUESTS_CA_BUNDLE and CURL_CA_BUNDLE override the session setting
+    def __get(self, path, fields=None):
+        """GET a RESTCONF resource, projected on ``fields`` unless the device rejects that projection.
+
+        A projected read answered with 400 is sent again without projection. The projection
+        is recorded as rejected only when that read succeeds, the 400 came from the path otherwise.
+        """
+        projection = restconf_projection.fields(self.__device_ip, fields) if fields else None
+        response = self.__get_projected(path, projection)
+        if projection and response.status_code == 400:
+            response = self.__get_projected(path, None)
+            if response.ok:
+                restconf_projection.record_rejected(self.__device_ip, projection, path)
+        return response
+
+    def __get_projected(self, path, projection):
+        with span("restconf.http", f"GET {path}"), self.__session() as session:
+            return session.get(restconf_url(self.__device_ip, path, projection), verify=False, timeout=DEFAULT_TIMEOUT)
+
+    def __patch(self, path, body):
+        with span("restconf.http", f"PATCH {path}"), self.__session() as session:
+            return session.patch(restconf_url(self.__device_ip, path), headers={'Content-type': CONTENT_TYPE_HEADER},
+                                 data=body, verify=False, timeout=DEFAULT_TIMEOUT)
+
+    def __get_switchport(self, interface_path):
+        for switchport_path in switchport_path_cache.candidates(self.__device_ip):
+            response = self.__get(f"{interface_path}/{switchport_path}", SWITCHPORT_FIELDS)
+            if response.ok:
+                switchport_path_cache.record(self.__device_ip, switchport_path)
+                return response
+            if response.status_code != 404:
+                break
+        response.raise_for_status()
 
     def get_hostname(self):
         logging.debug(f"Fetching hostname for: {self.__device_ip}")
-        response = requests.get(url='https://%s/restconf/data/Cisco-IOS-XE-native:native/hostname' % self.__device_ip, headers={'Accept': ACCEPT_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                verify=False, timeout=DEFAULT_TIMEOUT)
+        response = self.__get(HOSTNAME_PATH)
 
         if not response.ok:
             logging.error(f"An error occurred while gathering hostname for device {self.__device_ip}.")
             response.raise_for_status()
 
-        res = response.json()
-        return {
-            'hostname': res['Cisco-IOS-XE-native:hostname']
-        }
+        return parse_hostname(response.json())
 
     def get_hardware_data(self):
         logging.debug(f"Fetching hardware info for: {self.__device_ip}")
-        response = requests.get(url='https://%s/restconf/data/Cisco-IOS-XE-device-hardware-oper:device-hardware-data/device-hardware' % self.__device_ip, headers={'Accept': ACCEPT_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                verify=False, timeout=DEFAULT_TIMEOUT)
+        response = self.__get(HARDWARE_PATH, HARDWARE_FIELDS)
 
         if not response.ok:
             logging.error(f"An error occurred while gathering hardware data for device {self.__device_ip}.")
             response.raise_for_status()
 
-        res = response.json()['Cisco-IOS-XE-device-hardware-oper:device-hardware']
-        device_inventory = res['device-inventory'][0]
-        software_version = res['device-system-data']['software-version']
-        
-        try:
-            match = re.split(r',\s*', software_version)
-            platform = re.split(r'\sSoftware\s*', match[1])[0]
-            image_id = re.split(r'\sSoftware\s*', match[1])[1][1:-1]
-            version = re.split(r'Version\s*', match[2])[1]
-            
-            return {
-                'chassis': device_inventory['part-number'],
-                'chassis_sn': device_inventory['serial-number'],
-                'platform': platform,
-                'image_id': image_id,
-                'version': version
-            }
-        except Exception:
-            return None
+        hardware_data = parse_hardware_data(response.json())
+        if hardware_data:
+            switchport_path_cache.observe_version(self.__device_ip, hardware_data['version'])
+            restconf_projection.observe_version(self.__device_ip, hardware_data['version'])
+        return hardware_data
 
 
     def get_interface_configuration_information(self, interface_name):
-        long_interface = converter.convert_interface(interface_name=interface_name, return_long=True)
-        regex = r'^([^\d]+)(\d+.*)$'
-        splitted_interface = re.search(regex, long_interface)
-        url_encoded_interface_number = urllib.parse.quote_plus(splitted_interface[2])
-        response = requests.get(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport-config/switchport", 
-                        headers={'Accept': ACCEPT_HEADER}, 
-                        auth=(self.__username, self.__device_password),
-                        verify=False, timeout=DEFAULT_TIMEOUT)
-        if not response.ok: 
-            if response.status_code == 404:
-                response = requests.get(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport", 
-                                headers={'Accept': ACCEPT_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                verify=False)
-            response.raise_for_status()
+        response = self.__get_switchport(native_interface_path(interface_name))
         try:
-            response = response.json()
-            switchport_parameters = response['Cisco-IOS-XE-native:switchport']
-            mode = list(switchport_parameters['Cisco-IOS-XE-switch:mode'].keys())[0]
-            vlans = "1" if mode == 'access' and 'Cisco-IOS-XE-switch:access' not in switchport_parameters else \
-            str(switchport_parameters['Cisco-IOS-XE-switch:access']['vlan']['vlan']) if mode == 'access' and 'Cisco-IOS-XE-switch:access' in switchport_parameters else \
-            "1-4094" if mode == 'trunk' and "Cisco-IOS-XE-switch:trunk" not in switchport_parameters else \
-            str(switchport_parameters['Cisco-IOS-XE-switch:trunk']['allowed']['vlan']['vlans'])
-            return InterfaceSwitchportConfigurationInformation(mode=mode, vlans=unroll_vlans(vlans))
+            return parse_switchport(response.json())
         except Exception as e:
             logging.error(f"An error occurred while retrieving configuration information for interface {interface_name} on device {self.__device_ip}.")
             raise e
 
     
+    def get_interfaces_configuration_information(self):
+        response = self.__get(INTERFACES_PATH, interfaces_fields(self.__device_ip))
+        if not response.ok:
+            logging.error(f"An error occurred while retrieving interfaces configuration information on device {self.__device_ip}.")
+            response.raise_for_status()
+        return parse_interfaces_switchport(response.json())
+
+    def __switchports(self, operations):
+        """Switchport configuration of the interfaces of ``operations``, reading a single interface when they all target the same one.
+
+        Interfaces missing from the interface list (no explicit switchport mode) are read on their own, as
+        single-interface reads do: a failure there lets the operations fall back on ssh.
+        """
+        interface_names = {converter.convert_interface(interface_name=operation["interface_name"], return_long=True)
+                           for operation in operations}
+        if len(interface_names) == 1:
+            interface_name = interface_names.pop()
+            return {interface_name: self.get_interface_configuration_information(interface_name)}
+        switchports = self.get_interfaces_configuration_information()
+        for interface_name in interface_names - switchports.keys():
+            switchports[interface_name] = self.get_interface_configuration_information(interface_name)
+        return switchports
+
+    def apply_vlan_operations(self, operations):
+        """Tag and untag vlans on many interfaces with a single configuration request.
+
+        :param operations: Operations with keys interface_name, action (tag or untag), vlan_ids and append.
+        :type operations: List[Dict]
+        :return: One result per operation, in the same order.
+        :rtype: List[Dict]
+        """
+        results, changed = plan_vlan_operations(self.__switchports(operations), operations)
+        if not changed:
+            return results
+        logging.info(f"Attempting to configure vlans on {len(changed)} interfaces on device {self.__device_ip}")
+        for attempt, switchport_path in enumerate(switchport_path_cache.candidates(self.__device_ip)):
+            if attempt:
+                logging.info(f"Proceding with fallback procedure...")
+            response = self.__patch(INTERFACES_PATH, json.dumps(interfaces_switchport_body(changed, switchport_path)))
+            if response.ok:
+                switchport_path_cache.record(self.__device_ip, switchport_path)
+                logging.info(f"Successfully configured vlans on {len(changed)} interfaces on device {self.__device_ip}")
+                return results
+            logging.error(f"An error occured configuring vlans on {len(changed)} interfaces on device {self.__device_ip}" if not attempt else f"Fallback failed.")
+        response.raise_for_status()
+
     def get_vlan_list(self):
-        response = requests.get(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/vlan/Cisco-IOS-XE-vlan:vlan-list", 
-                        headers={'Accept': ACCEPT_HEADER}, 
-                        auth=(self.__username, self.__device_password),
-                        verify=False, timeout=DEFAULT_TIMEOUT)
+        response = self.__get(VLAN_LIST_PATH, VLAN_LIST_FIELDS)
         if not response.ok:
             logging.error(f"An error occured while retrieving vlan DB list from device {self.__device_ip}")
             response.raise_for_status()
         else:
-            vlan_list = response.json()["Cisco-IOS-XE-vlan:vlan-list"]
-            return [{
-                "id": vlan['id'],
-                "name": vlan.get('name', f"VLAN{vlan['id']:04d}")
-            } for vlan in vlan_list] + [{"id": 1, "name": "default"}]
+            return parse_vlan_list(response.json())
             
     def interface_mode(self, switchport_mode, interface_name):
         if switchport_mode in ['trunk', 'access']:
@@ -138,15 +298,7 @@ class CiscoIosXeREST(metaclass=SingletonArgs):
                             switchport_mode: {}
                         }
                     })
-            long_interface = converter.convert_interface(interface_name=interface_name, return_long=True)
-            regex = r'^([^\d]+)(\d+.*)$'
-            splitted_interface = re.search(regex, long_interface)
-            url_encoded_interface_number = urllib.parse.quote_plus(splitted_interface[2])
-            response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport/mode",
-                            headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER},
-                            auth=(self.__username, self.__device_password),
-                            data=body,
-                            verify=False, timeout=DEFAULT_TIMEOUT)
+            response = self.__patch(f"{native_interface_path(interface_name)}/switchport/mode", body)
             if not response.ok:
                 logging.error(f"An error occured while changing interface mode to {switchport_mode} on interface {interface_name} on device {self.__device_ip}")
                 response.raise_for_status()
@@ -155,119 +307,3 @@ class CiscoIosXeREST(metaclass=SingletonArgs):
                 return {"result" : f"Interface mode changed successfully to {switchport_mode} on {interface_name} on device {self.__device_ip}"}, 200
         else:
             return {"result:" : f"Interface switchport mode [{switchport_mode}] invalid. Must be trunk or access."}, 400
-
-
-    def tag_interface(self, interface_name, vlan_id, append):
-        interface_info = self.get_interface_configuration_information(interface_name)
-        long_interface = converter.convert_interface(interface_name=interface_name, return_long=True)
-        regex = r'^([^\d]+)(\d+.*)$'
-        splitted_interface = re.search(regex, long_interface)
-        url_encoded_interface_number = urllib.parse.quote_plus(splitted_interface[2])
-        logging.info(f"Attempting tagging interface {interface_name} with vlan [{vlan_id}] on device DEVICE {self.__device_ip}")
-        if interface_info.mode == "trunk":
-            vlans = adjust_vlan_set(vlan_id + "," + interface_info.vlans if append else vlan_id)
-            body = json.dumps({
-                        "Cisco-IOS-XE-switch:trunk": {
-                            "allowed": {
-                                "vlan": {
-                                    "vlans": vlans
-                                }
-                            }
-                        }
-                    })
-            response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport-config/switchport/trunk",
-                                headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                data=body,
-                                verify=False, timeout=DEFAULT_TIMEOUT)
-            if not response.ok:
-                #Fallback on switchport (no switchport-config) for Catalyst 3850
-                logging.error(f"An error occured in tagging interface {interface_name} mode {interface_info.mode} with vlans [{vlans}] on device {self.__device_ip}")
-                logging.info(f"Proceding with fallback procedure...")
-                response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport/trunk",
-                                headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                data=body,
-                                verify=False, timeout=DEFAULT_TIMEOUT)
-            
-                if response and not response.ok:
-                    logging.error(f"Fallback failed.")
-                    response.raise_for_status()
-            
-            logging.info(f"Successfully tagged interface {interface_name} with vlans [{vlans}] on device {self.__device_ip}")
-            return {"mode": "trunk", "vlans": vlans}, 200
-        
-        elif interface_info.mode == "access":
-            body = json.dumps({
-                        "Cisco-IOS-XE-switch:access": {
-                            "vlan": {
-                                "vlan": vlan_id
-                            }
-                        }
-                    })
-            response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport-config/switchport/access",
-                                headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER},
-                                auth=(self.__username, self.__device_password),
-                                data=body,
-                                verify=False, timeout=DEFAULT_TIMEOUT)
-            if not response.ok:
-                #Fallback on switchport (no switchport-config) for Catalyst 3850
-                logging.error(f"An error occured in tagging interface {interface_name} mode {interface_info.mode} with vlan [{vlan_id}] on device {self.__device_ip}")
-                logging.info(f"Proceding with fallback procedure...")
-                response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport/access",
-                                headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER},
-                                auth=(self.__username, self.__device_password),
-                                data=body,
-                                verify=False, timeout=DEFAULT_TIMEOUT)
-                if not response.ok:
-                    logging.error(f"Fallback failed.")
-                    response.raise_for_status()
-            
-            logging.info(f"Successfully tagged interface {interface_name} mode {interface_info.mode} with vlan [{vlan_id}] on device DEVICE {self.__device_ip}")
-            return {"mode": "access", "vlans": vlan_id}, 200
-        
-        return {"status:":"Unexpected error"}, 502
-
-    def untag_interface(self, interface_name, vlan_id):
-        interface_info = self.get_interface_configuration_information(interface_name)
-        long_interface = converter.convert_interface(interface_name=interface_name, return_long=True)
-        regex = r'^([^\d]+)(\d+.*)$'
-        splitted_interface = re.search(regex, long_interface)
-        url_encoded_interface_number = urllib.parse.quote_plus(splitted_interface[2])
-        logging.info(f"Attempting UNTagging interface {interface_name} ofs {vlan_id} on device DEVICE {self.__device_ip}")
-        if interface_info.mode == "trunk":
-            logging.debug(f"Untag {self.__device_ip} | {interface_name} | present vlans: {interface_info.vlans} removing: {vlan_id}")
-            adjusted_vlans = remove_vlan_from_set(interface_info.vlans, int(vlan_id))
-            body = json.dumps({
-                        "Cisco-IOS-XE-switch:trunk": {
-                            "allowed": {
-                                "vlan": {
-                                    "vlans": adjusted_vlans
-                                }
-                            }
-                        }
-                    })
-            response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport-config/switchport/trunk",
-                                headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                data=body,
-                                verify=False, timeout=DEFAULT_TIMEOUT)
-            if not response.ok:
-                #Fallback on switchport (no switchport-config) for Catalyst 3850
-                logging.error(f"An error occured in UNTagging interface {interface_name} mode {interface_info.mode} of vlan [{vlan_id}] on device {self.__device_ip}")
-                logging.info(f"Proceding with fallback procedure...")
-                response = requests.patch(f"https://{self.__device_ip}/restconf/data/Cisco-IOS-XE-native:native/interface/{splitted_interface[1]}={url_encoded_interface_number}/switchport/trunk",
-                                headers={'Accept': ACCEPT_HEADER, 'Content-type': CONTENT_TYPE_HEADER}, 
-                                auth=(self.__username, self.__device_password),
-                                data=body,
-                                verify=False, timeout=DEFAULT_TIMEOUT)
-                if not response.ok:
-                    logging.error(f"Fallback failed.")
-                    response.raise_for_status()
-            
-            logging.info(f"Successfully UNTagged interface {interface_name} of vlan [{vlan_id}] on device {self.__device_ip}")
-            return {
-                    "result": f'Vlan {vlan_id} removed from interface {interface_name} on device {self.__device_ip}'
-                }, 200
-        else:
-            return {"status:": f"Interface {interface_name} on device {self.__device_ip} not in trunk mode."}, 502
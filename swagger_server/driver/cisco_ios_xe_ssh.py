@@ -1,21 +1,67 @@
 import logging
+import os
 
 from swagger_server.utils.mac_conversion import format_mac
-from scrapli.helper import genie_parse
-from swagger_server.driver.singleton_driver import SingletonArgs
+from swagger_server.driver.driver_registry import RegisteredDriver
 from swagger_server.models.exceptions import DeviceNotHandled
 from swagger_server.utils.credentials_handler import get_credentials
+from swagger_server.utils.tracing import span
 from CiscoInterfaceNameConverter import converter
 from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
-from scrapli.driver.core import IOSXEDriver
+from swagger_server.driver.cli_parsers import cli_parser
+from swagger_server.driver.ssh_session_pool import ssh_session_pool
+from swagger_server.driver.switchport_path_cache import switchport_path_cache
 
-from swagger_server.utils.vlan_syntax_converter import adjust_vlan_set, range_unroller, unroll_vlans
+from swagger_server.utils.vlan_operations import plan_vlan_operations
 
 PLATFORM = "cisco_iosxe"
+SSH_TIMEOUT = 5
+SSH_PORT = int(os.getenv('SSH_PORT') or 22)
+
+
+def send_command(device_connection, command):
+    with span("ssh.command", command):
+        return device_connection.send_command(command)
+
+def send_configs(device_connection, commands):
+    with span("ssh.configure", f"{len(commands)} lines"):
+        return device_connection.send_configs(commands)
+
+def parse_output(response):
+    return cli_parser.parse(response.channel_input, response.result)
+
+def parse_version_info(response):
+    res = parse_output(response)['version']
+    return {key: res.get(key) for key in ["hostname", "chassis", "chassis_sn", "platform", "image_id", "version"]}
+
+def parse_switchport(response, interface_name):
+    return parse_switchport_information(parse_output(response)[converter.convert_interface(interface_name=interface_name, return_long=True)])
+
+def parse_switchport_information(switchport_information):
+    # A port that is shut or unplugged reports operational mode "down", its administrative mode is what gets configured
+    mode = switchport_information.get('operational_mode')
+    if mode in (None, 'down'):
+        mode = switchport_information['switchport_mode']
+    vlans = switchport_information.get('access_vlan') if mode in ('access', 'static access') else switchport_information.get('trunk_vlans')
+    return InterfaceSwitchportConfigurationInformation(mode=mode, vlans=vlans)
+
+def parse_interfaces_switchport(response):
+    """Switchport configuration of every switched interface, keyed by long interface name."""
+    return {interface_name: parse_switchport_information(switchport_information)
+            for interface_name, switchport_information in parse_output(response).items()
+            if switchport_information.get('switchport_enable', True) and 'switchport_mode' in switchport_information}
+
+def parse_vlan_list(response):
+    vlan_list = parse_output(response)
+    return [{'id': int(vlan_id), 'name': vlan_info.get('name', '')} for vlan_id, vlan_info in vlan_list['vlans'].items()]
+
+
+class CiscoIosXeSsh(metaclass=RegisteredDriver):
+    """Driver that extracts data from a Cisco IOS XE switch using ssh.
+
+    ``CiscoIosXeSsh(device_ip)`` returns the driver of the device kept in :data:`driver_registry`,
+    rebuilt when the inventory entry of the device changes.
 
-class CiscoIosXeSsh(metaclass=SingletonArgs):
-    """Singleton class that extract data from a Cisco IOS XE switch using ssh.
-    
     :param device_ip: The IP address of the switch to be controlled.
     :type device_ip: str
     """
@@ -31,12 +77,13 @@ class CiscoIosXeSsh(metaclass=SingletonArgs):
             credentials = get_credentials(device_ip=device_ip)
             self.__device = {
                 "host": device_ip,
+                "port": SSH_PORT,
                 "auth_username": credentials.get('username'),
                 "auth_password": credentials.get('password'),
                 "auth_strict_key": False,
             #    "transport": "ssh2",
                 "ssh_config_file": True,
-                "timeout_socket": 5
+                "timeout_socket": SSH_TIMEOUT
             }
         except:
             del self
@@ -44,12 +91,12 @@ class CiscoIosXeSsh(metaclass=SingletonArgs):
             
 
     def get_version_info(self):
-        with IOSXEDriver(**self.__device) as device_connection:
-            platform_information = device_connection.send_command("sh version")
+        with ssh_session_pool.connection(self.__device) as device_connection:
+            platform_information = send_command(device_connection, "sh version")
             logging.debug(f"[SHOW Hardware] scrapli {platform_information.result}")
             try:
-                res = platform_information.genie_parse_output()['version']
-                res_filtered = {key: res.get(key) for key in ["hostname", "chassis", "chassis_sn", "platform", "image_id", "version"]}
+                res_filtered = parse_version_info(platform_information)
+                switchport_path_cache.observe_version(self.__device["host"], res_filtered["version"])
                 return res_filtered
             except Exception as e:
                 logging.error("[PARSING ERROR]", e)
@@ -57,40 +104,52 @@ class CiscoIosXeSsh(metaclass=SingletonArgs):
 
 
     def get_interface_configuration_information(self, interface_name):
-        with IOSXEDriver(**self.__device) as device_connection:
-            interface_name = interface_name.replace('=', '')
-            switchport_information = device_connection.send_command(f"show interfaces {interface_name} switchport")
-            switchport_information = switchport_information.genie_parse_output()[converter.convert_interface(interface_name=interface_name, return_long=True)]
-            mode = switchport_information.get('operational_mode', switchport_information['switchport_mode'])
-            vlans = switchport_information.get('access_vlan') if mode == 'access' else switchport_information.get('trunk_vlans')
-            vlans = "1-4094" if vlans == "all" else vlans
-            return InterfaceSwitchportConfigurationInformation(mode=mode, vlans=unroll_vlans(vlans))
+        with ssh_session_pool.connection(self.__device) as device_connection:
+            return self.__interface_configuration_information(device_connection, interface_name)
+
+    def __interface_configuration_information(self, device_connection, interface_name):
+        interface_name = interface_name.replace('=', '')
+        switchport_information = send_command(device_connection, f"show interfaces {interface_name} switchport")
+        return parse_switchport(switchport_information, interface_name)
         
 
+    def get_interfaces_configuration_information(self):
+        with ssh_session_pool.connection(self.__device) as device_connection:
+            return parse_interfaces_switchport(send_command(device_connection, "show interfaces switchport"))
+
+    def __switchports(self, device_connection, operations):
+        """Switchport configuration of the interfaces of ``operations``, reading a single interface when they all target the same one."""
+        interface_names = {converter.convert_interface(interface_name=operation["interface_name"], return_long=True)
+                           for operation in operations}
+        if len(interface_names) == 1:
+            interface_name = interface_names.pop()
+            return {interface_name: self.__interface_configuration_information(device_connection, interface_name)}
+        return parse_interfaces_switchport(send_command(device_connection, "show interfaces switchport"))
+
+    def apply_vlan_operations(self, operations):
+        """Tag and untag vlans on many interfaces within a single ssh session and configuration push.
+
+        :param operations: Operations with keys interface_name, action (tag or untag), vlan_ids and append.
+        :type operations: List[Dict]
+        :return: One result per operation, in the same order.
+        :rtype: List[Dict]
+        """
+        with ssh_session_pool.connection(self.__device) as device_connection:
+            results, changed = plan_vlan_operations(self.__switchports(device_connection, operations), operations)
+            commands = []
+            for interface_name, interface_info in changed.items():
+                commands += [f"interface {interface_name}",
+                             f"switchport trunk allowed vlan {interface_info.vlans or 'none'}" if interface_info.mode == "trunk" else f"switchport access vlan {interface_info.vlans}"]
+            if commands:
+                send_configs(device_connection, commands)
+            return results
+
     def get_vlan_list(self):
-        with IOSXEDriver(**self.__device) as device_connection:
-            vlan_list = (device_connection.send_command("sh vlan")).genie_parse_output()
-            return [{'id': int(vlan_id), 'name': vlan_info.get('name', '')} for vlan_id, vlan_info in vlan_list['vlans'].items()]
+        with ssh_session_pool.connection(self.__device) as device_connection:
+            return parse_vlan_list(send_command(device_connection, "sh vlan"))
     
 
 
     def interface_mode(self, switchport_mode, interface_name):
-        with IOSXEDriver(**self.__device) as device_connection:
-            device_connection.send_configs([f"interface {interface_name}", f"switchport mode {switchport_mode}"])
-
-    def tag_interface(self, interface_name, vlan_id, append):
-        with IOSXEDriver(**self.__device) as device_connection:
-            interface_info = self.get_interface_configuration_information(interface_name)
-            vlans = vlan_id + "," + interface_info.vlans if append else vlan_id
-            add_vlan_command = f"switchport trunk allowed vlan {adjust_vlan_set(vlans)}" if interface_info.mode == "trunk" else f"switchport access vlan {vlans}"
-            device_connection.send_configs([f"interface {interface_name}", add_vlan_command])
-            
-            return {"mode": interface_info.mode, "vlans": adjust_vlan_set(vlans) if interface_info.mode == "trunk" else vlan_id}, 200
-        
-    def untag_interface(self, interface_name, vlan_id):
-        with IOSXEDriver(**self.__device) as device_connection:
-            interface_info = self.get_interface_configuration_information(interface_name)
-            remove_vlan_command = f"no switchport trunk allowed vlan {vlan_id}" if interface_info.mode == "trunk" else f"no switchport access vlan {vlan_id}"
-            device_connection.send_configs([f"interface {interface_name}", remove_vlan_command])
-            
-            return 200
+        with ssh_session_pool.connection(self.__device) as device_connection:
+            send_configs(device_connection, [f"interface {interface_name}", f"switchport mode {switchport_mode}"])
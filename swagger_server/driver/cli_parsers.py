@@ -0,0 +1,170 @@
+import logging
+import re
+import threading
+
+from CiscoInterfaceNameConverter import converter
+
+from swagger_server.driver.parser_pool import parser_pool
+from swagger_server.utils.tracing import span
+
+SHOW_VERSION = "show version"
+SHOW_VLAN = "show vlan"
+SHOW_INTERFACES_SWITCHPORT = "show interfaces switchport"
+
+SHOW_VERSION_COMMAND = re.compile(r'^sh(ow)?\s+ver(sion)?\s*$')
+SHOW_VLAN_COMMAND = re.compile(r'^sh(ow)?\s+vlan\s*$')
+SHOW_INTERFACES_SWITCHPORT_COMMAND = re.compile(r'^sh(ow)?\s+int(erfaces?)?(\s+\S+)?\s+switchport\s*$')
+
+HOSTNAME = re.compile(r'^(?P<hostname>\S+) uptime is ', re.M)
+SOFTWARE = re.compile(r'^Cisco IOS Software.*?, (?P<platform>[^,]+?) Software \((?P<image_id>[^)]+)\), Version (?P<version>[^\s,]+)', re.M)
+CHASSIS = re.compile(r'^[Cc]isco (?P<chassis>\S+) \([^)]*\) processor', re.M)
+CHASSIS_SN = re.compile(r'^Processor board ID (?P<chassis_sn>\S+)', re.M)
+
+VLAN_LINE = re.compile(r'^(?P<vlan_id>\d+)\s+(?P<name>\S+)\s+(?P<state>active|suspended|act/unsup|(act|sus)/[il]shut)(\s+(?P<interfaces>.*?))?\s*$')
+VLAN_INTERFACES_CONTINUATION = re.compile(r'^\s+(?P<interfaces>\S.*?)\s*$')
+VLAN_STATES = {"active": "active", "suspended": "suspended", "act/unsup": "unsupport"}
+
+SWITCHPORT_FIELD = re.compile(r'^(?P<key>[^:\n]+):\s*(?P<value>.*?)\s*$')
+SWITCHPORT_CONTINUATION = re.compile(r'^\s+(?P<value>[\d,-]+)\s*$')
+VLAN_WITH_NAME = re.compile(r'^(?P<vlan>\d+) \((?P<name>[^)]*)\)')
+
+
+def _long_interface_name(interface_name):
+    return converter.convert_interface(interface_name=interface_name, return_long=True)
+
+def parse_show_version(output):
+    """Fast parser of ``show version``, same shape as the genie parser for the keys used by the ssh driver."""
+    fields = {}
+    for pattern in (HOSTNAME, SOFTWARE, CHASSIS, CHASSIS_SN):
+        match = pattern.search(output)
+        if match is None:
+            return None
+        fields.update(match.groupdict())
+    return {'version': fields}
+
+def parse_show_vlan(output):
+    """Fast parser of ``show vlan``, same shape as the genie parser for vlan_id, name, state, shutdown and interfaces."""
+    vlans, vlan = {}, None
+    for line in output.splitlines():
+        if line.startswith("VLAN Type"):
+            break
+        match = VLAN_LINE.match(line)
+        if match:
+            state = match['state']
+            vlan = {
+                'vlan_id': match['vlan_id'],
+                'name': match['name'],
+                'shutdown': state.endswith('shut'),
+                'state': VLAN_STATES.get(state, 'shutdown')
+            }
+            vlans[match['vlan_id']] = vlan
+            interfaces = match['interfaces']
+        else:
+            match = VLAN_INTERFACES_CONTINUATION.match(line) if vlan is not None else None
+            interfaces = match['interfaces'] if match else None
+        if interfaces:
+            vlan.setdefault('interfaces', []).extend(
+                _long_interface_name(interface.strip()) for interface in interfaces.split(',') if interface.strip())
+    return {'vlans': vlans} if vlans else None
+
+def parse_show_interfaces_switchport(output):
+    """Fast parser of ``show interfaces [<interface>] switchport``, same shape as the genie parser
+    for the switchport mode, access vlan, native vlan and trunk/pruning vlan keys.
+    """
+    interfaces, interface, last_key = {}, None, None
+    for line in output.splitlines():
+        match = SWITCHPORT_CONTINUATION.match(line)
+        if match and last_key in ('trunk_vlans', 'pruning_vlans'):
+            interface[last_key] += match['value']
+            continue
+        match = SWITCHPORT_FIELD.match(line)
+        last_key = None
+        if not match:
+            continue
+        key, value = match['key'], match['value']
+        if key == 'Name':
+            interface = interfaces[_long_interface_name(value)] = {}
+        elif interface is None:
+            continue
+        elif key == 'Switchport':
+            interface['switchport_enable'] = value.lower() == 'enabled'
+        elif key == 'Administrative Mode':
+            interface['switchport_mode'] = value
+        elif key == 'Operational Mode':
+            interface['operational_mode'] = value
+        elif key in ('Access Mode VLAN', 'Trunking Native Mode VLAN'):
+            vlan = VLAN_WITH_NAME.match(value)
+            if vlan is None:
+                continue
+            if key == 'Access Mode VLAN':
+                interface.update(access_vlan=vlan['vlan'], access_vlan_name=vlan['name'])
+            else:
+                interface.setdefault('encapsulation', {}).update(native_vlan=vlan['vlan'], native_vlan_name=vlan['name'])
+        elif key in ('Trunking VLANs Enabled', 'Pruning VLANs Enabled'):
+            last_key = 'trunk_vlans' if key == 'Trunking VLANs Enabled' else 'pruning_vlans'
+            interface[last_key] = value.lower() if value.upper() in ('ALL', 'NONE') else value
+    if not interfaces or any(interface.get('switchport_enable') and 'switchport_mode' not in interface
+                             for interface in interfaces.values()):
+        return None
+    return interfaces
+
+
+class CliParser:
+    """Parse the output of the commands sent by the ssh driver.
+
+    Commands with a built-in parser are parsed with precompiled regular expressions,
+    genie is only used for other commands and for outputs the built-in parsers do
+    not recognize, in the processes of :data:`parser_pool`. How often each path is
+    taken is counted.
+
+    :param parsers: Built-in parsers, as (name, command pattern, parser) tuples. A
+        parser takes the raw output and returns None when it cannot handle it.
+    :type parsers: List[Tuple[str, re.Pattern, Callable]]
+    """
+
+    def __init__(self, parsers):
+        self.parsers = parsers
+        self._lock = threading.Lock()
+        self._counters = {name: {"fast": 0, "fallback": 0} for name, _, _ in parsers}
+
+    def _count(self, name, path):
+        with self._lock:
+            self._counters.setdefault(name, {"fast": 0, "fallback": 0})[path] += 1
+
+    def parse(self, command, output):
+        """Parse the ``output`` of ``command``, as genie would.
+
+        :rtype: Union[Dict, List]
+        """
+        with span("parse", command):
+            return self._parse(command, output)
+
+    def _parse(self, command, output):
+        for name, command_pattern, parser in self.parsers:
+            if command_pattern.match(command):
+                try:
+                    parsed = parser(output)
+                except Exception as e:
+                    logging.warning(f"Built-in parser of '{command}' failed: {e}")
+                    parsed = None
+                if parsed:
+                    self._count(name, "fast")
+                    return parsed
+                logging.info(f"Built-in parser cannot handle the output of '{command}', falling back on genie")
+                break
+        else:
+            name = command
+        self._count(name, "fallback")
+        with span("parse.genie", command):
+            return parser_pool.parse(command, output)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._counters.items()}
+
+
+cli_parser = CliParser(parsers=[
+    (SHOW_VERSION, SHOW_VERSION_COMMAND, parse_show_version),
+    (SHOW_VLAN, SHOW_VLAN_COMMAND, parse_show_vlan),
+    (SHOW_INTERFACES_SWITCHPORT, SHOW_INTERFACES_SWITCHPORT_COMMAND, parse_show_interfaces_switchport)
+])
@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+DRIVER_REGISTRY_MAX_DRIVERS = int(os.getenv('DRIVER_REGISTRY_MAX_DRIVERS') or 4096)
+DRIVER_REGISTRY_TTL = float(os.getenv('DRIVER_REGISTRY_TTL') or 3600)
+
+
+class DriverRegistry:
+    """Driver instances shared across requests, one per driver class and device.
+
+    At most ``max_drivers`` drivers are kept, the least recently used ones are dropped
+    first, and a driver is rebuilt once older than ``ttl`` seconds. Drivers capture the
+    device credentials when built, so the drivers of a device are dropped as soon as
+    its inventory entry changes, and a driver whose build overlapped such a change is
+    returned without being kept.
+
+    :param max_drivers: Maximum number of drivers kept.
+    :type max_drivers: int
+    :param ttl: Seconds after which a driver is rebuilt.
+    :type ttl: float
+    """
+
+    def __init__(self, max_drivers, ttl):
+        self.max_drivers = max_drivers
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (driver class, device_ip) -> (driver, created_at), least recently used first
+        self._drivers = OrderedDict()
+        self._driver_classes = set()
+        # device_ip -> number of times the drivers of the device were dropped
+        self._generations = {}
+        self._clears = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, driver_class, device_ip):
+        """Return the driver of ``device_ip``, building it with ``driver_class(device_ip)`` when needed.
+
+        :raises DeviceNotHandled: If the device is not in the inventory.
+        """
+        key = (driver_class, device_ip)
+        with self._lock:
+            entry = self._drivers.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._drivers.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation(device_ip)
+        driver = driver_class.build(device_ip)
+        with self._lock:
+            if self._generation(device_ip) != generation:
+                return driver
+            self._drivers[key] = (driver, time.monotonic())
+            self._driver_classes.add(driver_class)
+            self._drivers.move_to_end(key)
+            while len(self._drivers) > self.max_drivers:
+                self._drivers.popitem(last=False)
+        return driver
+
+    def _generation(self, device_ip):
+        return self._clears, self._generations.get(device_ip, 0)
+
+    def invalidate(self, device_ip):
+        """Drop every driver of ``device_ip``, drivers of the device being built are not kept."""
+        with self._lock:
+            self._generations[device_ip] = self._generations.get(device_ip, 0) + 1
+            for driver_class in self._driver_classes:
+                self._drivers.pop((driver_class, device_ip), None)
+
+    def clear(self):
+        with self._lock:
+            self._clears += 1
+            self._drivers.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "drivers": len(self._drivers),
+                "max_drivers": self.max_drivers,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+driver_registry = DriverRegistry(max_drivers=DRIVER_REGISTRY_MAX_DRIVERS, ttl=DRIVER_REGISTRY_TTL)
+add_credentials_listener(driver_registry.invalidate)
+
+
+class RegisteredDriver(type):
+    """Metaclass of the drivers: ``Driver(device_ip)`` returns the instance held by :data:`driver_registry`."""
+
+    def __call__(cls, device_ip):
+        return driver_registry.get(cls, device_ip)
+
+    def build(cls, device_ip):
+        logging.debug(f"Registering {cls.__name__} driver for device {device_ip}")
+        return super().__call__(device_ip)
@@ -0,0 +1,151 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+GENIE_PLATFORM = "iosxe"
+WARM_COMMANDS = ("show version", "show vlan", "show interfaces switchport")
+
+PARSER_PROCESSES = int(os.getenv('PARSER_PROCESSES') or 2)
+PARSER_TIMEOUT = float(os.getenv('PARSER_TIMEOUT') or 30)
+
+
+def _warm_worker():
+    """Import genie and the parsers of the commands sent by the ssh driver, so the first parse is fast."""
+    from genie.conf.base import Device
+    from genie.libs.parser.utils import get_parser
+    device = Device("warmup", custom={"abstraction": {"order": ["os"]}}, os=GENIE_PLATFORM)
+    for command in WARM_COMMANDS:
+        try:
+            get_parser(command, device)
+        except Exception as e:
+            logging.warning(f"Unable to load genie parser of '{command}': {e}")
+
+def _ready():
+    # Long enough for every worker to take one task instead of the first warm one taking them all
+    time.sleep(0.1)
+    return os.getpid()
+
+def _plain(parsed):
+    """Copy genie results (QDict) into plain dicts and lists, unpickling them would import genie."""
+    if isinstance(parsed, dict):
+        return {key: _plain(value) for key, value in parsed.items()}
+    if isinstance(parsed, list):
+        return [_plain(value) for value in parsed]
+    return parsed
+
+def _genie_parse(command, output):
+    from scrapli.helper import genie_parse
+    started = time.perf_counter()
+    return _plain(genie_parse(GENIE_PLATFORM, command, output)), time.perf_counter() - started
+
+
+class ParserPool:
+    """Pool of worker processes parsing command outputs with genie.
+
+    Genie parsing is CPU bound and holds the GIL, in a worker process it no longer
+    stalls the request threads. Workers import genie when they start and the pool is
+    created on first use, or ahead of time with :meth:`start`. With ``processes`` set to
+    0 outputs are parsed in the calling thread.
+
+    :param processes: Number of worker processes.
+    :type processes: int
+    :param timeout: Seconds to wait for a parse before giving up.
+    :type timeout: float
+    """
+
+    def __init__(self, processes, timeout):
+        self.processes = processes
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._queued = 0
+        self._parsed = 0
+        self._failed = 0
+        self._parse_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                logging.info(f"Starting {self.processes} parser processes")
+                self._executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_warm_worker)
+            return self._executor
+
+    def start(self):
+        """Start every worker process and wait until they are warm."""
+        if self.processes:
+            executor = self._get_executor()
+            pids = set()
+            while len(pids) < self.processes:
+                pids.update(future.result() for future in [executor.submit(_ready) for _ in range(self.processes)])
+
+    def parse(self, command, output):
+        """Parse the ``output`` of ``command`` with genie, in a worker process.
+
+        :rtype: Union[Dict, List]
+        """
+        if not self.processes:
+            parsed, parse_seconds = _genie_parse(command, output)
+            self._record(parse_seconds, parse_seconds)
+            return parsed
+        with self._lock:
+            self._queued += 1
+        started = time.perf_counter()
+        try:
+            parsed, parse_seconds = self._get_executor().submit(_genie_parse, command, output).result(self.timeout)
+        except BrokenProcessPool:
+            logging.error("A parser process died, restarting the parser pool")
+            self.shutdown()
+            with self._lock:
+                self._failed += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._queued -= 1
+        self._record(parse_seconds, time.perf_counter() - started)
+        return parsed
+
+    def _record(self, parse_seconds, wait_seconds):
+        with self._lock:
+            self._parsed += 1
+            self._parse_seconds += parse_seconds
+            self._wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Queue depth and latencies in milliseconds. Parse latency is measured in the
+        worker, wait latency includes the time spent queued and transferring data.
+        """
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "started": self._executor is not None,
+                "queue_depth": self._queued,
+                "parsed": self._parsed,
+                "failed": self._failed,
+                "mean_parse_ms": round(self._parse_seconds / self._parsed * 1000, 3) if self._parsed else None,
+                "mean_wait_ms": round(self._wait_seconds / self._parsed * 1000, 3) if self._parsed else None,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 3)
+            }
+
+
+parser_pool = ParserPool(processes=PARSER_PROCESSES, timeout=PARSER_TIMEOUT)
+atexit.register(parser_pool.shutdown)
@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+RESTCONF_PROJECTION = (os.getenv('RESTCONF_PROJECTION') or 'true').lower() == 'true'
+
+SWITCH_PREFIX = "Cisco-IOS-XE-switch:"
+# Leaves of device-hardware read by parse_hardware_data, the keys keep device-inventory entries in the same order
+HARDWARE_FIELDS = "device-inventory(hw-type;hw-dev-index;part-number;serial-number);device-system-data/software-version"
+VLAN_LIST_FIELDS = "id;name"
+# Leaves of a switchport container read by parse_switchport_parameters
+SWITCHPORT_FIELDS = (f"{SWITCH_PREFIX}mode;{SWITCH_PREFIX}access/vlan/vlan;"
+                     f"{SWITCH_PREFIX}trunk/allowed/vlan/vlans;{SWITCH_PREFIX}trunk/allowed/vlan/none")
+# Interface lists of the native model that can hold a switchport configuration
+SWITCHPORT_INTERFACE_TYPES = ("FastEthernet", "GigabitEthernet", "TwoGigabitEthernet", "FiveGigabitEthernet",
+                              "TenGigabitEthernet", "TwentyFiveGigE", "FortyGigabitEthernet", "HundredGigE",
+                              "AppGigabitEthernet", "Port-channel")
+
+
+def interfaces_switchport_fields(switchport_paths):
+    """Projection of the native interface container on the name and the switchport leaves under ``switchport_paths``."""
+    switchports = ";".join(f"{switchport_path}({SWITCHPORT_FIELDS})" for switchport_path in switchport_paths)
+    return ";".join(f"{interface_type}(name;{switchports})" for interface_type in SWITCHPORT_INTERFACE_TYPES)
+
+
+class RestconfProjection:
+    """Remember which RESTCONF projections each device rejects.
+
+    Reads send a ``fields`` query parameter naming the leaves they parse, so devices do not
+    serialize, and the service does not decode, whole subtrees. Some trains do not
+    implement the parameter, others do not know every node a projection names (such as
+    ``switchport-config`` on Catalyst 3850): a device answering 400 to a projected read is
+    read again without projection, and when that read succeeds the projection is no longer
+    sent to it. Rejections are dropped when the device reports a different software version.
+
+    :param enabled: Whether projections are sent at all.
+    :type enabled: bool
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.projected = 0
+        self.full = 0
+        self._lock = threading.Lock()
+        # device_ip -> set of rejected fields
+        self._rejected = {}
+        self._versions = {}
+
+    def fields(self, device_ip, fields):
+        """``fields`` if it can be sent to ``device_ip``, None when the full subtree must be read."""
+        with self._lock:
+            projected = self.enabled and fields not in self._rejected.get(device_ip, ())
+            if projected:
+                self.projected += 1
+            else:
+                self.full += 1
+        return fields if projected else None
+
+    def record_rejected(self, device_ip, fields, path):
+        """Stop sending ``fields`` to ``device_ip``, which rejected it on the resource ``path``."""
+        with self._lock:
+            self._rejected.setdefault(device_ip, set()).add(fields)
+        logging.warning(f"Device {device_ip} rejected the RESTCONF projection of {path}, reading the full subtree instead")
+
+    def observe_version(self, device_ip, version):
+        with self._lock:
+            known_version = self._versions.get(device_ip)
+            self._versions[device_ip] = version
+            if known_version is not None and known_version != version and device_ip in self._rejected:
+                logging.info(f"Software version of device {device_ip} changed from {known_version} to {version}, "
+                             f"forgetting rejected RESTCONF projections")
+                del self._rejected[device_ip]
+
+    def invalidate(self, device_ip):
+        with self._lock:
+            self._rejected.pop(device_ip, None)
+            self._versions.pop(device_ip, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "projected": self.projected,
+                "full": self.full,
+                "rejecting_devices": len(self._rejected)
+            }
+
+
+restconf_projection = RestconfProjection(enabled=RESTCONF_PROJECTION)
+add_credentials_listener(restconf_projection.invalidate)
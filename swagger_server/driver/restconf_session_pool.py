@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+ACCEPT_HEADER = 'application/yang-data+json'
+
+RESTCONF_POOL_MAX_DEVICES = int(os.getenv('RESTCONF_POOL_MAX_DEVICES') or 1024)
+RESTCONF_POOL_CONNECTIONS = int(os.getenv('RESTCONF_POOL_CONNECTIONS') or 4)
+RESTCONF_POOL_IDLE_TIMEOUT = float(os.getenv('RESTCONF_POOL_IDLE_TIMEOUT') or 60)
+
+
+class RestconfSessionPool:
+    """Keep-alive HTTP sessions used by the RESTCONF driver, one per device.
+
+    Sessions carry the device credentials, so authentication is configured once and
+    TCP/TLS connections are reused across calls. Sessions idle for more than
+    ``idle_timeout`` seconds are closed, and at most ``max_devices`` sessions are kept
+    (least recently used ones are closed first). Sessions are leased to callers: a session
+    evicted while a call uses it is closed once the last call gives it back.
+
+    :param max_devices: Maximum number of device sessions kept open.
+    :type max_devices: int
+    :param connections_per_device: Maximum number of keep-alive connections kept per device.
+    :type connections_per_device: int
+    :param idle_timeout: Seconds after which an unused session is closed.
+    :type idle_timeout: float
+    """
+
+    def __init__(self, max_devices, connections_per_device, idle_timeout):
+        self.max_devices = max_devices
+        self.connections_per_device = connections_per_device
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # device_ip -> [session, (username, password), last_used, leases, evicted], least recently used first
+        self._sessions = OrderedDict()
+        # Number of evicted sessions still leased, closed when their last lease ends
+        self._retired = 0
+
+    @contextmanager
+    def session(self, device_ip, username, password):
+        """Lease the session of ``device_ip``, it is not closed before the block completes."""
+        entry = self._checkout(device_ip, username, password)
+        try:
+            yield entry[0]
+        finally:
+            self._checkin(entry)
+
+    def invalidate(self, device_ip):
+        with self._lock:
+            if device_ip in self._sessions:
+                self._close(device_ip)
+
+    def clear(self):
+        with self._lock:
+            for device_ip in list(self._sessions):
+                self._close(device_ip)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "in_use": sum(1 for entry in self._sessions.values() if entry[3]),
+                "retired": self._retired,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _checkout(self, device_ip, username, password):
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._sessions.get(device_ip)
+            if entry is not None and entry[1] == (username, password):
+                self._sessions.move_to_end(device_ip)
+                entry[2] = now
+                entry[3] += 1
+                self.hits += 1
+                return entry
+            if entry is not None:
+                # Credentials changed since the session was created
+                self._close(device_ip)
+            self.misses += 1
+            entry = [self._create_session(username, password), (username, password), now, 1, False]
+            self._sessions[device_ip] = entry
+            while len(self._sessions) > self.max_devices:
+                self._close(next(iter(self._sessions)))
+            return entry
+
+    def _checkin(self, entry):
+        with self._lock:
+            entry[2] = time.monotonic()
+            entry[3] -= 1
+            if entry[3] or not entry[4]:
+                return
+            self._retired -= 1
+        self._close_session(entry[0])
+
+    def _create_session(self, username, password):
+        session = requests.Session()
+        session.auth = (username, password)
+        session.verify = False
+        session.headers.update({'Accept': ACCEPT_HEADER})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connections_per_device)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _evict_idle(self, now):
+        while self._sessions:
+            device_ip, entry = next(iter(self._sessions.items()))
+            if now - entry[2] < self.idle_timeout:
+                break
+            logging.debug(f"Closing idle restconf session for device {device_ip}")
+            self._close(device_ip)
+
+    def _close(self, device_ip):
+        """Evict the session of ``device_ip``, closed now or when its last lease ends. Must be called holding the lock."""
+        entry = self._sessions.pop(device_ip)
+        self.evictions += 1
+        if entry[3]:
+            entry[4] = True
+            self._retired += 1
+        else:
+            self._close_session(entry[0])
+
+    @staticmethod
+    def _close_session(session):
+        try:
+            session.close()
+        except Exception as e:
+            logging.debug(f"Error closing restconf session: {e}")
+
+restconf_session_pool = RestconfSessionPool(max_devices=RESTCONF_POOL_MAX_DEVICES,
+                                            connections_per_device=RESTCONF_POOL_CONNECTIONS,
+                                            idle_timeout=RESTCONF_POOL_IDLE_TIMEOUT)
+add_credentials_listener(restconf_session_pool.invalidate)
@@ -0,0 +1,231 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from swagger_server.models.exceptions import DeviceSessionUnavailable
+from swagger_server.utils.credentials_handler import add_credentials_listener
+from swagger_server.utils.tracing import span
+
+SSH_POOL_SESSIONS_PER_DEVICE = int(os.getenv('SSH_POOL_SESSIONS_PER_DEVICE') or 2)
+SSH_POOL_MAX_SESSIONS = int(os.getenv('SSH_POOL_MAX_SESSIONS') or 256)
+SSH_POOL_IDLE_TIMEOUT = float(os.getenv('SSH_POOL_IDLE_TIMEOUT') or 120)
+SSH_POOL_ACQUIRE_TIMEOUT = float(os.getenv('SSH_POOL_ACQUIRE_TIMEOUT') or 30)
+SSH_POOL_HEALTH_CHECK_AFTER = float(os.getenv('SSH_POOL_HEALTH_CHECK_AFTER') or 10)
+
+
+class SshSessionPool:
+    """Authenticated IOS XE ssh sessions kept open and reused across driver calls.
+
+    At most ``sessions_per_device`` sessions are opened towards a single device and at most
+    ``max_sessions`` overall, so the service never exhausts the VTY lines of a switch.
+    Sessions are health-checked before being reused, replaced when dead and closed once
+    idle for more than ``idle_timeout`` seconds.
+
+    :param sessions_per_device: Maximum number of sessions opened towards one device.
+    :type sessions_per_device: int
+    :param max_sessions: Maximum number of sessions opened overall.
+    :type max_sessions: int
+    :param idle_timeout: Seconds after which an unused session is closed.
+    :type idle_timeout: float
+    :param acquire_timeout: Seconds to wait for a free session before giving up.
+    :type acquire_timeout: float
+    """
+
+    def __init__(self, sessions_per_device, max_sessions, idle_timeout, acquire_timeout):
+        self.sessions_per_device = sessions_per_device
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+        self.evictions = 0
+        self._condition = threading.Condition()
+        # host -> list of [connection, credentials, last_used], most recently used last
+        self._idle = {}
+        # host -> number of open sessions (idle and in use)
+        self._open = {}
+        self._total = 0
+        self._sweeper = None
+
+    @contextmanager
+    def connection(self, device):
+        """Borrow an open session towards ``device``.
+
+        The session is given back to the pool when the block completes and closed if the
+        block raises, since its state is then unknown.
+
+        :param device: IOSXEDriver keyword arguments of the device.
+        :type device: dict
+        """
+        host = device["host"]
+        with span("ssh.acquire", host):
+            connection = self._acquire(device)
+        try:
+            yield connection
+        except Exception:
+            self._discard(host, connection)
+            raise
+        self._release(host, device, connection)
+
+    def invalidate(self, host):
+        with self._condition:
+            stale = self._idle.pop(host, [])
+            self._forget(host, len(stale))
+        for connection, _, _ in stale:
+            self._close(host, connection)
+
+    def clear(self):
+        with self._condition:
+            hosts = list(self._idle)
+        for host in hosts:
+            self.invalidate(host)
+
+    def stats(self):
+        with self._condition:
+            idle = sum(len(sessions) for sessions in self._idle.values())
+            return {
+                "open": self._total,
+                "idle": idle,
+                "in_use": self._total - idle,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reconnects": self.reconnects,
+                "evictions": self.evictions
+            }
+
+    def _acquire(self, device):
+        host = device["host"]
+        credentials = (device.get("auth_username"), device.get("auth_password"))
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            candidate = None
+            with self._condition:
+                self._start_sweeper()
+                while True:
+                    idle = self._idle.get(host)
+                    if idle:
+                        candidate = idle.pop()
+                        break
+                    if self._open.get(host, 0) < self.sessions_per_device and self._total < self.max_sessions:
+                        self._open[host] = self._open.get(host, 0) + 1
+                        self._total += 1
+                        self.misses += 1
+                        break
+                    if self._open.get(host, 0) < self.sessions_per_device and self._evict_lru_idle():
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DeviceSessionUnavailable(f"No ssh session available for device {host} within {self.acquire_timeout}s")
+                    self._condition.wait(remaining)
+
+            if candidate is None:
+                return self._open_connection(host, device)
+
+            connection, session_credentials, last_used = candidate
+            if session_credentials == credentials and self._is_healthy(connection, last_used):
+                with self._condition:
+                    self.hits += 1
+                return connection
+            logging.debug(f"Replacing stale ssh session for device {host}")
+            self._discard(host, connection)
+            with self._condition:
+                self.reconnects += 1
+
+    def _open_connection(self, host, device):
+        logging.debug(f"Opening ssh session for device {host}")
+        try:
+            # Imported on first use, scrapli takes a noticeable share of the startup time
+            from scrapli.driver.core import IOSXEDriver
+            with span("ssh.connect", host):
+                connection = IOSXEDriver(**device)
+                connection.open()
+            return connection
+        except Exception:
+            with self._condition:
+                self._forget(host, 1)
+            raise
+
+    def _release(self, host, device, connection):
+        credentials = (device.get("auth_username"), device.get("auth_password"))
+        with self._condition:
+            self._idle.setdefault(host, []).append([connection, credentials, time.monotonic()])
+            self._condition.notify_all()
+
+    def _discard(self, host, connection):
+        with self._condition:
+            self._forget(host, 1)
+        self._close(host, connection)
+
+    def _forget(self, host, count):
+        """Release ``count`` session slots of ``host``. Must be called holding the condition."""
+        if not count:
+            return
+        self._open[host] = self._open.get(host, 0) - count
+        if self._open[host] <= 0:
+            self._open.pop(host, None)
+            self._idle.pop(host, None)
+        self._total -= count
+        self._condition.notify_all()
+
+    def _evict_lru_idle(self):
+        """Close the least recently used idle session of any device to make room. Must be called holding the condition."""
+        oldest_host, oldest = None, None
+        for host, sessions in self._idle.items():
+            if sessions and (oldest is None or sessions[0][2] < oldest[2]):
+                oldest_host, oldest = host, sessions[0]
+        if oldest is None:
+            return False
+        self._idle[oldest_host].pop(0)
+        self._forget(oldest_host, 1)
+        self.evictions += 1
+        threading.Thread(target=self._close, args=(oldest_host, oldest[0]), daemon=True).start()
+        return True
+
+    def _is_healthy(self, connection, last_used):
+        try:
+            if not connection.isalive():
+                return False
+            if time.monotonic() - last_used > SSH_POOL_HEALTH_CHECK_AFTER:
+                connection.get_prompt()
+            return True
+        except Exception as e:
+            logging.debug(f"Ssh session health check failed: {e}")
+            return False
+
+    def _start_sweeper(self):
+        if self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, name="ssh-session-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep(self):
+        while True:
+            time.sleep(max(self.idle_timeout / 2, 1))
+            expired = []
+            with self._condition:
+                now = time.monotonic()
+                for host, sessions in list(self._idle.items()):
+                    while sessions and now - sessions[0][2] >= self.idle_timeout:
+                        expired.append((host, sessions.pop(0)[0]))
+                        self._forget(host, 1)
+                        self.evictions += 1
+            for host, connection in expired:
+                logging.debug(f"Closing idle ssh session for device {host}")
+                self._close(host, connection)
+
+    def _close(self, host, connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logging.debug(f"Error closing ssh session for device {host}: {e}")
+
+
+ssh_session_pool = SshSessionPool(sessions_per_device=SSH_POOL_SESSIONS_PER_DEVICE,
+                                  max_sessions=SSH_POOL_MAX_SESSIONS,
+                                  idle_timeout=SSH_POOL_IDLE_TIMEOUT,
+                                  acquire_timeout=SSH_POOL_ACQUIRE_TIMEOUT)
+atexit.register(ssh_session_pool.clear)
+add_credentials_listener(ssh_session_pool.invalidate)
@@ -0,0 +1,55 @@
+import logging
+import threading
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+SWITCHPORT_CONFIG_PATH = "switchport-config/switchport"
+SWITCHPORT_PATH = "switchport"
+SWITCHPORT_PATHS = (SWITCHPORT_CONFIG_PATH, SWITCHPORT_PATH)
+
+
+class SwitchportPathCache:
+    """Remember which YANG container holds the switchport configuration of each device.
+
+    Recent IOS XE trains expose it under ``switchport-config/switchport`` while Catalyst 3850
+    and older trains only know ``switchport``. The first path that works on a device is
+    tried first afterwards; the entry is dropped when the device reports a different
+    software version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = {}
+        self._versions = {}
+
+    def candidates(self, device_ip):
+        """Switchport paths to try on ``device_ip``, the one known to work first."""
+        path = self._paths.get(device_ip)
+        if path is None:
+            return SWITCHPORT_PATHS
+        return (path,) + tuple(p for p in SWITCHPORT_PATHS if p != path)
+
+    def known(self, device_ip):
+        """Switchport path known to work on ``device_ip``, None until one worked."""
+        return self._paths.get(device_ip)
+
+    def record(self, device_ip, path):
+        with self._lock:
+            self._paths[device_ip] = path
+
+    def observe_version(self, device_ip, version):
+        with self._lock:
+            known_version = self._versions.get(device_ip)
+            self._versions[device_ip] = version
+            if known_version is not None and known_version != version and device_ip in self._paths:
+                logging.info(f"Software version of device {device_ip} changed from {known_version} to {version}, forgetting switchport path")
+                del self._paths[device_ip]
+
+    def invalidate(self, device_ip):
+        with self._lock:
+            self._paths.pop(device_ip, None)
+            self._versions.pop(device_ip, None)
+
+
+switchport_path_cache = SwitchportPathCache()
+add_credentials_listener(switchport_path_cache.invalidate)
@@ -2,6 +2,7 @@ from connexion.apps.flask_app import FlaskJSONEncoder
 import six
 
 from swagger_server.models.base_model_ import Model
+from swagger_server.utils.vlan_set import VlanSet
 
 
 class JSONEncoder(FlaskJSONEncoder):
@@ -17,4 +18,6 @@ class JSONEncoder(FlaskJSONEncoder):
                 attr = o.attribute_map[attr]
                 dikt[attr] = value
             return dikt
+        if isinstance(o, VlanSet):
+            return o.unrolled()
         return FlaskJSONEncoder.default(self, o)
@@ -3,3 +3,14 @@ class DeviceNotHandled(Exception):
 
 class DeviceNotReachable(Exception):
     pass
+
+class DeviceSessionUnavailable(Exception):
+    pass
+
+class DeviceAlreadyHandled(Exception):
+    pass
+
+class DeviceCircuitOpen(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
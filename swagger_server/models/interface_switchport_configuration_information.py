@@ -7,6 +7,7 @@ from typing import List, Dict  # noqa: F401
 
 from swagger_server.models.base_model_ import Model
 from swagger_server import util
+from swagger_server.utils.vlan_set import VlanSet
 
 
 class InterfaceSwitchportConfigurationInformation(Model):
@@ -14,13 +15,13 @@ class InterfaceSwitchportConfigurationInformation(Model):
 
     Do not edit the class manually.
     """
-    def __init__(self, mode: str=None, vlans: str=None):  # noqa: E501
+    def __init__(self, mode: str=None, vlans: VlanSet=None):  # noqa: E501
         """InterfaceSwitchportConfigurationInformation - a model defined in Swagger
 
         :param mode: The mode of this InterfaceSwitchportConfigurationInformation.  # noqa: E501
         :type mode: str
-        :param vlans: The vlans of this InterfaceSwitchportConfigurationInformation.  # noqa: E501
-        :type vlans: str
+        :param vlans: The vlans of this InterfaceSwitchportConfigurationInformation, as a VlanSet or a vlan list string.  # noqa: E501
+        :type vlans: VlanSet
         """
         self.swagger_types = {
             'mode': str,
@@ -32,7 +33,7 @@ class InterfaceSwitchportConfigurationInformation(Model):
             'vlans': 'vlans'
         }
         self._mode = mode
-        self._vlans = vlans
+        self._vlans = VlanSet.parse(vlans) if vlans is not None else None
 
     @classmethod
     def from_dict(cls, dikt) -> 'InterfaceSwitchportConfigurationInformation':
@@ -73,24 +74,24 @@ class InterfaceSwitchportConfigurationInformation(Model):
         self._mode = mode
 
     @property
-    def vlans(self) -> str:
+    def vlans(self) -> VlanSet:
         """Gets the vlans of this InterfaceSwitchportConfigurationInformation.
 
 
         :return: The vlans of this InterfaceSwitchportConfigurationInformation.
-        :rtype: str
+        :rtype: VlanSet
         """
         return self._vlans
 
     @vlans.setter
-    def vlans(self, vlans: str):
+    def vlans(self, vlans: VlanSet):
         """Sets the vlans of this InterfaceSwitchportConfigurationInformation.
 
 
-        :param vlans: The vlans of this InterfaceSwitchportConfigurationInformation.
-        :type vlans: str
+        :param vlans: The vlans of this InterfaceSwitchportConfigurationInformation, as a VlanSet or a vlan list string.
+        :type vlans: VlanSet
         """
         if vlans is None:
             raise ValueError("Invalid value for `vlans`, must not be `None`")  # noqa: E501
 
-        self._vlans = vlans
+        self._vlans = VlanSet.parse(vlans)
@@ -0,0 +1,148 @@
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from swagger_server.models.exceptions import DeviceCircuitOpen
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+CIRCUIT_BREAKER_FAILURES = int(os.getenv('CIRCUIT_BREAKER_FAILURES') or 3)
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv('CIRCUIT_BREAKER_COOLDOWN') or 30)
+# Seconds suggested to clients rejected while the probe of a half-open circuit is running
+PROBE_RETRY_AFTER = 1
+
+
+class CircuitBreaker:
+    """Fail fast on devices that stopped answering.
+
+    The circuit of a device opens after ``failures`` consecutive operations where neither
+    RESTCONF nor ssh could reach it. Operations are then rejected at once with
+    DeviceCircuitOpen until ``cooldown`` seconds elapsed. The circuit is then half-open:
+    a single operation goes through as a probe, closing the circuit when the device
+    answers and opening it again for another cool-down otherwise.
+
+    :param failures: Consecutive unreachable operations opening the circuit, 0 disables the breaker.
+    :type failures: int
+    :param cooldown: Seconds an open circuit rejects operations before letting a probe through.
+    :type cooldown: float
+    """
+
+    def __init__(self, failures, cooldown):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        # device_ip -> {"state", "failures", "opened_at", "opened_at_wall", "probing"}, closed healthy devices omitted
+        self._entries = {}
+
+    @contextmanager
+    def guard(self, device_ip):
+        """Run an operation on ``device_ip`` unless its circuit is open.
+
+        The operation reports its outcome with ``record_reachable`` or ``record_unreachable``.
+        An operation ending without reporting, on a missing session or a cancellation,
+        leaves the circuit as it is and frees the probe slot of a half-open circuit.
+
+        :raises DeviceCircuitOpen: The circuit is open, or half-open with a probe running.
+        """
+        probe = self._admit(device_ip)
+        try:
+            yield
+        finally:
+            if probe:
+                with self._lock:
+                    entry = self._entries.get(device_ip)
+                    if entry is not None:
+                        entry["probing"] = False
+
+    def record_reachable(self, device_ip):
+        with self._lock:
+            entry = self._entries.pop(device_ip, None)
+        if entry is not None and entry["state"] != CLOSED:
+            logging.info(f"Circuit of device {device_ip} closed, the device answers again")
+
+    def record_unreachable(self, device_ip):
+        """Count an operation that reached neither RESTCONF nor ssh.
+
+        :return: Whether the circuit opened.
+        :rtype: bool
+        """
+        if not self.failures:
+            return False
+        with self._lock:
+            entry = self._entries.setdefault(device_ip, {"state": CLOSED, "failures": 0, "opened_at": None,
+                                                         "opened_at_wall": None, "probing": False})
+            entry["failures"] += 1
+            entry["probing"] = False
+            if entry["state"] == OPEN or (entry["state"] == CLOSED and entry["failures"] < self.failures):
+                return False
+            entry.update(state=OPEN, opened_at=time.monotonic(), opened_at_wall=time.time())
+        logging.warning(f"Circuit of device {device_ip} opened after {entry['failures']} unreachable operations, "
+                        f"rejecting operations for {self.cooldown}s")
+        return True
+
+    def reset(self, device_ip=None):
+        """Close the circuit of a device, or of every device."""
+        with self._lock:
+            if device_ip is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(device_ip, None)
+
+    def forget(self, device_ip):
+        self.reset(device_ip)
+
+    def counts(self):
+        """Number of devices per circuit state, devices never failing are not counted as closed."""
+        with self._lock:
+            counts = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+            for entry in self._entries.values():
+                counts[entry["state"]] += 1
+            return counts
+
+    def table(self):
+        with self._lock:
+            now = time.monotonic()
+            return [{
+                "ip": device_ip,
+                "state": entry["state"],
+                "failures": entry["failures"],
+                "opened_at": datetime.fromtimestamp(entry["opened_at_wall"], timezone.utc).isoformat()
+                if entry["opened_at_wall"] else None,
+                "retry_after": round(max(entry["opened_at"] + self.cooldown - now, 0), 1)
+                if entry["state"] == OPEN else None
+            } for device_ip, entry in self._entries.items()]
+
+    def _admit(self, device_ip):
+        """Let an operation through or raise DeviceCircuitOpen.
+
+        :return: Whether the operation is the probe of a half-open circuit.
+        :rtype: bool
+        """
+        with self._lock:
+            entry = self._entries.get(device_ip)
+            if entry is None or entry["state"] == CLOSED:
+                return False
+            if entry["state"] == OPEN:
+                remaining = entry["opened_at"] + self.cooldown - time.monotonic()
+                if remaining <= 0:
+                    entry.update(state=HALF_OPEN, probing=True)
+                    logging.info(f"Circuit of device {device_ip} half-open, probing the device")
+                    return True
+            elif not entry["probing"]:
+                entry["probing"] = True
+                return True
+            else:
+                remaining = PROBE_RETRY_AFTER
+        raise DeviceCircuitOpen(f"Device {device_ip} is unreachable, operations are rejected for "
+                                f"{math.ceil(remaining)}s", retry_after=math.ceil(remaining))
+
+
+circuit_breaker = CircuitBreaker(failures=CIRCUIT_BREAKER_FAILURES, cooldown=CIRCUIT_BREAKER_COOLDOWN)
+add_credentials_listener(circuit_breaker.forget)
@@ -1,15 +1,145 @@
+import logging
 import threading
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from swagger_server.models.exceptions import DeviceAlreadyHandled, DeviceNotHandled
+
+
+class InventorySnapshot(NamedTuple):
+    """An inventory version, ``credentials`` maps each device ip to its username and password."""
+    version: int
+    credentials: Mapping
+
+
+# Copy-on-write: readers use the current snapshot without locking, writers build a new one
+# under write_lock and swap it in with a single assignment
+write_lock = threading.Lock()
+snapshot = InventorySnapshot(0, MappingProxyType({}))
+listeners = []
+
+def add_credentials_listener(listener):
+    """Call ``listener(device_ip)`` for every device added, removed or whose credentials change."""
+    listeners.append(listener)
+
+def _device_credentials(device):
+    return {"username": device['username'], "password": device['password']}
+
+def _publish(credentials, changed):
+    """Swap in ``credentials`` as a new inventory version when some ips ``changed``.
+    The caller holds write_lock.
+    """
+    global snapshot
+    if changed:
+        snapshot = InventorySnapshot(snapshot.version + 1, MappingProxyType(credentials))
+    return snapshot.version
+
+def _notify(changed):
+    """Notify the listeners of the ``changed`` ips. Called once write_lock is released, so listeners
+    (session closes, sqlite writes, poll scheduling) do not hold back other inventory writers.
+    Listeners look the device up in the current snapshot, so notifications of concurrent writes
+    may interleave.
+    """
+    for device_ip in changed:
+        for listener in listeners:
+            try:
+                listener(device_ip)
+            except Exception as e:
+                logging.error(f"Unable to invalidate state of device {device_ip}: {e}")
+
+def _apply(upsert, remove):
+    """:return: The new inventory version with the ips added, updated and removed, and the changed ips.
+    The caller holds write_lock.
+    """
+    previous = snapshot.credentials
+    credentials = dict(previous)
+    changes = {"added": [], "updated": [], "removed": []}
+    for device in upsert:
+        entry = _device_credentials(device)
+        current = credentials.get(device['ip'])
+        if current is None:
+            changes["added"].append(device['ip'])
+        elif current != entry:
+            changes["updated"].append(device['ip'])
+        credentials[device['ip']] = entry
+    for device_ip in remove:
+        if credentials.pop(device_ip, None) is not None:
+            changes["removed"].append(device_ip)
+    changed = changes["added"] + changes["updated"] + changes["removed"]
+    version = _publish(credentials, changed)
+    return dict(changes, version=version), changed
 
-lock = threading.Lock()
-credentials = {}
-         
 def update_credentials(inventory):
-    inventory_dict = {switch['ip']: {"username": switch['username'], "password": switch['password']} for switch in inventory}
-    global credentials
-    with lock:
-        credentials = inventory_dict
+    """Replace the whole inventory.
+
+    :return: The new inventory version.
+    :rtype: int
+    """
+    return replace_inventory({switch['ip']: _device_credentials(switch) for switch in inventory})
+
+def replace_inventory(credentials):
+    """Replace the whole inventory with ``credentials``, a map of device ips to their credentials.
+
+    :return: The new inventory version.
+    :rtype: int
+    """
+    with write_lock:
+        previous = snapshot.credentials
+        changed = [ip for ip in previous.keys() | credentials.keys() if previous.get(ip) != credentials.get(ip)]
+        version = _publish(credentials, changed)
+    _notify(changed)
+    return version
+
+def apply_inventory_diff(upsert=(), remove=()):
+    """Add or update the ``upsert`` devices and remove the ``remove`` ips as a single inventory version.
+
+    :raises DeviceNotHandled: If a device to remove is not in the inventory, nothing is applied then.
+    :return: The new inventory version and the ips added, updated and removed.
+    :rtype: Dict
+    """
+    with write_lock:
+        missing = [device_ip for device_ip in remove if device_ip not in snapshot.credentials]
+        if missing:
+            raise DeviceNotHandled(f"Devices not in the inventory: {', '.join(missing)}")
+        changes, changed = _apply(upsert, remove)
+    _notify(changed)
+    return changes
+
+def add_device(device):
+    """:raises DeviceAlreadyHandled: If the device is already in the inventory."""
+    with write_lock:
+        if device['ip'] in snapshot.credentials:
+            raise DeviceAlreadyHandled(f"Device {device['ip']} is already in the inventory")
+        changes, changed = _apply([device], ())
+    _notify(changed)
+    return changes["version"]
+
+def update_device(device):
+    """:raises DeviceNotHandled: If the device is not in the inventory."""
+    with write_lock:
+        if device['ip'] not in snapshot.credentials:
+            raise DeviceNotHandled(f"Device {device['ip']} is not in the inventory")
+        changes, changed = _apply([device], ())
+    _notify(changed)
+    return changes["version"]
+
+def remove_device(device_ip):
+    """:raises DeviceNotHandled: If the device is not in the inventory."""
+    with write_lock:
+        if device_ip not in snapshot.credentials:
+            raise DeviceNotHandled(f"Device {device_ip} is not in the inventory")
+        changes, changed = _apply((), [device_ip])
+    _notify(changed)
+    return changes["version"]
+
+def get_snapshot():
+    return snapshot
+
+def get_inventory_version():
+    return snapshot.version
 
 def get_credentials(device_ip):
-    with lock:
-        return credentials.get(device_ip)
-    
\ No newline at end of file
+    return snapshot.credentials.get(device_ip)
+
+def get_device_ips():
+    return list(snapshot.credentials)
@@ -0,0 +1,154 @@
+import heapq
+import logging
+import os
+import random
+import threading
+import time
+
+from swagger_server.models.exceptions import DeviceCircuitOpen
+from swagger_server.utils.credentials_handler import add_credentials_listener, get_credentials, get_device_ips
+
+POLL_INTERVAL = float(os.getenv('POLL_INTERVAL') or 0)
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY') or 8)
+POLL_JITTER = float(os.getenv('POLL_JITTER') or 0.1)
+
+
+class FleetPoller:
+    """Read every device of the inventory in background, so reads can be served from recent snapshots.
+
+    Each device is polled every ``interval`` seconds, plus or minus ``jitter`` times the
+    interval, counted from the end of its previous poll. The first poll of a device happens
+    at a random time within the first interval, so devices added together are not polled
+    together, and the jitter keeps them apart afterwards. At most ``concurrency`` devices
+    are polled at the same time, devices due meanwhile wait for a free slot.
+
+    A poll runs the readers of the device one after the other and stops at the first one
+    failing: once a device does not answer, its remaining reads would only wait for the
+    same timeout. Devices whose circuit breaker is open are skipped until the next poll.
+
+    :param interval: Seconds between two polls of a device, 0 disables the poller.
+    :type interval: float
+    :param concurrency: Maximum number of devices polled at the same time.
+    :type concurrency: int
+    :param jitter: Share of the interval randomly added to or removed from every poll schedule.
+    :type jitter: float
+    """
+
+    def __init__(self, interval, concurrency, jitter):
+        self.interval = interval
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.polls = 0
+        self.failed_polls = 0
+        self._lock = threading.Lock()
+        # device_ip -> monotonic time of the next poll, None while the device is being polled
+        self._due = {}
+        # (due, device_ip), entries no longer matching _due are skipped
+        self._schedule = []
+        self._polling = 0
+        self._wakeup = threading.Event()
+        self._readers = None
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def start(self, readers):
+        """Poll every device of the inventory with ``readers`` until the process exits.
+
+        :param readers: Read a device and record the result, by kind of read. Called with the device ip.
+        :type readers: Dict[str, Callable[[str], object]]
+        """
+        if not self.enabled or self._readers is not None:
+            return
+        self._readers = readers
+        for device_ip in get_device_ips():
+            self.track(device_ip)
+        threading.Thread(target=self._run, name="fleet-poller", daemon=True).start()
+        logging.info(f"Polling devices every {self.interval}s, {self.concurrency} at a time")
+
+    def track(self, device_ip):
+        """Schedule the first poll of a device added to the inventory, stop polling a removed one."""
+        if self._readers is None:
+            return
+        with self._lock:
+            if get_credentials(device_ip) is None:
+                self._due.pop(device_ip, None)
+            elif device_ip not in self._due:
+                self._schedule_poll(device_ip, time.monotonic() + random.uniform(0, self.interval))
+        self._wakeup.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "interval": self.interval,
+                "concurrency": self.concurrency,
+                "devices": len(self._due),
+                "polling": self._polling,
+                "polls": self.polls,
+                "failed_polls": self.failed_polls
+            }
+
+    def _schedule_poll(self, device_ip, due):
+        """Must be called holding the lock."""
+        self._due[device_ip] = due
+        heapq.heappush(self._schedule, (due, device_ip))
+
+    def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._wakeup.wait(self._start_due_polls())
+
+    def _start_due_polls(self):
+        """Start the polls that are due while a slot is free.
+
+        :return: Seconds until the next poll is due, None when waiting for a free slot or a device.
+        :rtype: float
+        """
+        started = []
+        with self._lock:
+            now = time.monotonic()
+            while self._schedule and self._polling < self.concurrency:
+                due, device_ip = self._schedule[0]
+                if self._due.get(device_ip) != due:
+                    heapq.heappop(self._schedule)
+                    continue
+                if due > now:
+                    break
+                heapq.heappop(self._schedule)
+                self._due[device_ip] = None
+                self._polling += 1
+                started.append(device_ip)
+            timeout = self._schedule[0][0] - now if self._schedule and self._polling < self.concurrency else None
+        for device_ip in started:
+            threading.Thread(target=self._poll, args=(device_ip,), name=f"poll-{device_ip}", daemon=True).start()
+        return timeout
+
+    def _poll(self, device_ip):
+        failed = False
+        try:
+            for kind, reader in self._readers.items():
+                result = reader(device_ip)
+                if result is None or isinstance(result, tuple):
+                    logging.warning(f"Polling {kind} of device {device_ip} failed: {result}")
+                    failed = True
+                    break
+        except DeviceCircuitOpen as e:
+            logging.debug(f"Skipping poll of device {device_ip}: {e}")
+        except Exception as e:
+            logging.warning(f"Polling device {device_ip} failed: {e}")
+            failed = True
+        finally:
+            with self._lock:
+                self.polls += 1
+                self.failed_polls += failed
+                self._polling -= 1
+                if device_ip in self._due:
+                    self._schedule_poll(device_ip, time.monotonic() +
+                                        self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+            self._wakeup.set()
+
+
+fleet_poller = FleetPoller(interval=POLL_INTERVAL, concurrency=POLL_CONCURRENCY, jitter=POLL_JITTER)
+add_credentials_listener(fleet_poller.track)
@@ -0,0 +1,82 @@
+import ipaddress
+import json
+import logging
+import os
+
+from swagger_server.utils.credentials_handler import replace_inventory
+
+INVENTORY_PATH = os.getenv('INVENTORY_PATH')
+INVENTORY_MAX_REPORTED_ERRORS = int(os.getenv('INVENTORY_MAX_REPORTED_ERRORS') or 100)
+
+
+def parse_device(line):
+    """Parse and validate one NDJSON inventory record.
+
+    :raises ValueError: If the record is not a valid inventory device.
+    :return: The device ip and its credentials.
+    :rtype: Tuple[str, Dict]
+    """
+    device = json.loads(line)
+    if not isinstance(device, dict):
+        raise ValueError("record is not a JSON object")
+    for field in ("ip", "username", "password"):
+        if not isinstance(device.get(field), str):
+            raise ValueError(f"'{field}' is missing or is not a string")
+    ipaddress.IPv4Address(device["ip"])
+    return device["ip"], {"username": device["username"], "password": device["password"]}
+
+
+def ingest_ndjson(lines, allow_errors=False, max_reported_errors=INVENTORY_MAX_REPORTED_ERRORS):
+    """Replace the inventory with the devices of an NDJSON stream, one device per line.
+
+    Records are validated and collected one at a time, so memory only grows with the
+    new inventory and not with the size of the document. The new inventory is published
+    as a single version once the stream is consumed, and only when every record is valid
+    unless ``allow_errors`` is set. When a device appears twice the last record wins.
+
+    :param lines: Lines of the stream, bytes or str
+    :type lines: Iterable
+    :param allow_errors: Publish the valid records even if some are invalid
+    :type allow_errors: bool
+    :param max_reported_errors: Maximum number of line errors included in the report
+    :type max_reported_errors: int
+    :return: Whether the inventory was published, its version, the number of devices
+        and the line errors.
+    :rtype: Dict
+    """
+    credentials = {}
+    errors = []
+    error_count = 0
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            device_ip, device_credentials = parse_device(line)
+        except ValueError as e:
+            error_count += 1
+            if len(errors) < max_reported_errors:
+                errors.append({"line": line_number, "error": str(e)})
+            continue
+        credentials[device_ip] = device_credentials
+
+    published = allow_errors or not error_count
+    report = {
+        "published": published,
+        "devices": len(credentials),
+        "error_count": error_count,
+        "errors": errors
+    }
+    if published:
+        report["version"] = replace_inventory(credentials)
+    return report
+
+
+def load_inventory_file(path=INVENTORY_PATH):
+    """Import the NDJSON inventory file at ``path``, invalid records are logged and skipped."""
+    with open(path, 'rb') as stream:
+        report = ingest_ndjson(stream, allow_errors=True)
+    for error in report["errors"]:
+        logging.error(f"Invalid inventory record at {path}:{error['line']}: {error['error']}")
+    logging.info(f"Imported {report['devices']} devices from {path} "
+                 f"({report['error_count']} invalid records), inventory version {report['version']}")
+    return report
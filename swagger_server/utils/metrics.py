@@ -0,0 +1,114 @@
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from swagger_server.driver.restconf_session_pool import restconf_session_pool
+from swagger_server.driver.ssh_session_pool import ssh_session_pool
+from swagger_server.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, circuit_breaker
+
+METRICS_DEVICE_LABELS = (os.getenv('METRICS_DEVICE_LABELS') or 'false').lower() == 'true'
+# Device calls last from milliseconds (cached sessions) to tens of seconds (ssh fallbacks)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+# Device ips are only used as labels when enabled, one series per device does not scale to large fleets
+DEVICE_LABELS = ("device",) if METRICS_DEVICE_LABELS else ()
+
+request_duration = Histogram("switch_connector_request_duration_seconds",
+                             "Time spent handling HTTP requests",
+                             ("handler", "method", "status"), buckets=LATENCY_BUCKETS)
+device_call_duration = Histogram("switch_connector_device_call_duration_seconds",
+                                 "Time spent calling a device driver",
+                                 ("operation", "protocol", "outcome") + DEVICE_LABELS, buckets=LATENCY_BUCKETS)
+protocol_fallbacks = Counter("switch_connector_protocol_fallbacks_total",
+                             "Operations retried with the other management protocol after a failure",
+                             ("operation", "from_protocol", "to_protocol") + DEVICE_LABELS)
+device_timeouts = Counter("switch_connector_device_timeouts_total",
+                          "Operations answered with HTTP 504 because the device did not answer",
+                          ("operation", "protocol") + DEVICE_LABELS)
+devices_not_handled = Counter("switch_connector_device_not_handled_total",
+                              "Requests for devices missing from the inventory",
+                              DEVICE_LABELS)
+ssh_sessions_open = Gauge("switch_connector_ssh_sessions_open", "Open pooled ssh sessions")
+ssh_sessions_open.set_function(lambda: ssh_session_pool.stats()["open"])
+ssh_sessions_in_use = Gauge("switch_connector_ssh_sessions_in_use", "Pooled ssh sessions used by a request")
+ssh_sessions_in_use.set_function(lambda: ssh_session_pool.stats()["in_use"])
+restconf_sessions_open = Gauge("switch_connector_restconf_sessions_open", "Pooled keep-alive RESTCONF sessions")
+restconf_sessions_open.set_function(lambda: restconf_session_pool.stats()["sessions"])
+restconf_sessions_in_use = Gauge("switch_connector_restconf_sessions_in_use", "Pooled RESTCONF sessions used by a request")
+restconf_sessions_in_use.set_function(lambda: restconf_session_pool.stats()["in_use"])
+circuit_breakers = Gauge("switch_connector_circuit_breakers",
+                         "Devices per circuit breaker state, closed ones counted while they have failures",
+                         ("state",))
+for _state in (CLOSED, OPEN, HALF_OPEN):
+    circuit_breakers.labels(state=_state).set_function(lambda state=_state: circuit_breaker.counts()[state])
+circuit_openings = Counter("switch_connector_circuit_openings_total",
+                           "Circuits opened on devices that stopped answering",
+                           DEVICE_LABELS)
+circuit_rejections = Counter("switch_connector_circuit_rejections_total",
+                             "Operations rejected with HTTP 503 because the circuit of the device is open",
+                             ("operation",) + DEVICE_LABELS)
+
+
+def device_labels(device_ip):
+    """Label values identifying ``device_ip``, empty unless METRICS_DEVICE_LABELS is enabled."""
+    return {"device": device_ip} if METRICS_DEVICE_LABELS else {}
+
+
+@contextmanager
+def observe_device_call(operation, protocol, device_ip):
+    """Record the duration of a driver call and whether it raised."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        device_call_duration.labels(operation=operation, protocol=protocol, outcome=outcome,
+                                    **device_labels(device_ip)).observe(time.perf_counter() - started)
+
+
+def record_fallback(operation, from_protocol, to_protocol, device_ip):
+    protocol_fallbacks.labels(operation=operation, from_protocol=from_protocol, to_protocol=to_protocol,
+                              **device_labels(device_ip)).inc()
+
+
+def record_device_timeout(operation, protocol, device_ip):
+    device_timeouts.labels(operation=operation, protocol=protocol, **device_labels(device_ip)).inc()
+
+
+def record_device_not_handled(device_ip):
+    (devices_not_handled.labels(**device_labels(device_ip)) if METRICS_DEVICE_LABELS else devices_not_handled).inc()
+
+
+def record_circuit_opening(device_ip):
+    (circuit_openings.labels(**device_labels(device_ip)) if METRICS_DEVICE_LABELS else circuit_openings).inc()
+
+
+def record_circuit_rejection(operation, device_ip):
+    circuit_rejections.labels(operation=operation, **device_labels(device_ip)).inc()
+
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+def observe_request(response):
+    """Record the duration of the request, labelled by its route template to keep cardinality bounded.
+    Streamed responses are observed before their body is sent.
+    """
+    if 'request_started' in g:
+        handler = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        request_duration.labels(handler=handler, method=request.method,
+                                status=response.status_code).observe(time.perf_counter() - g.request_started)
+    return response
+
+
+def get_metrics():
+    """Serve the metrics in the Prometheus text format.
+
+    :rtype: Tuple[bytes, int, Dict]
+    """
+    return generate_latest(), 200, {"Content-Type": CONTENT_TYPE_LATEST}
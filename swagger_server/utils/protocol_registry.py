@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+RESTCONF = "RESTCONF"
+SSH = "SSH"
+
+PROTOCOL_REPROBE_INTERVAL = float(os.getenv('PROTOCOL_REPROBE_INTERVAL') or 300)
+
+
+class ProtocolRegistry:
+    """Remember which management protocol last worked for each device.
+
+    Devices default to RESTCONF. Once a device is known to answer only over ssh, requests
+    go straight to ssh and RESTCONF is re-probed in background at most once every
+    ``reprobe_interval`` seconds, so a device where RESTCONF gets enabled is picked up again.
+
+    :param reprobe_interval: Minimum number of seconds between two RESTCONF probes of a device.
+    :type reprobe_interval: float
+    """
+
+    def __init__(self, reprobe_interval):
+        self.reprobe_interval = reprobe_interval
+        self._lock = threading.Lock()
+        # device_ip -> {"protocol", "updated_at", "last_probe"}
+        self._entries = {}
+        self._probing = set()
+
+    def preferred(self, device_ip):
+        entry = self._entries.get(device_ip)
+        return entry["protocol"] if entry else RESTCONF
+
+    def record_success(self, device_ip, protocol):
+        with self._lock:
+            entry = self._entries.get(device_ip)
+            if entry is None:
+                self._entries[device_ip] = {"protocol": protocol, "updated_at": time.time(), "last_probe": time.monotonic()}
+            elif entry["protocol"] != protocol:
+                logging.info(f"Device {device_ip} now managed with {protocol} instead of {entry['protocol']}")
+                entry.update(protocol=protocol, updated_at=time.time(), last_probe=time.monotonic())
+
+    def reprobe(self, device_ip, probe):
+        """Run ``probe`` in background if RESTCONF was not tried on ``device_ip`` for a while.
+
+        :param probe: Callable performing a cheap RESTCONF request, raising on failure.
+        """
+        with self._lock:
+            entry = self._entries.get(device_ip)
+            if entry is None or entry["protocol"] == RESTCONF or device_ip in self._probing:
+                return
+            if time.monotonic() - entry["last_probe"] < self.reprobe_interval:
+                return
+            entry["last_probe"] = time.monotonic()
+            self._probing.add(device_ip)
+        threading.Thread(target=self._run_probe, args=(device_ip, probe), daemon=True).start()
+
+    def forget(self, device_ip):
+        with self._lock:
+            self._entries.pop(device_ip, None)
+
+    def table(self):
+        with self._lock:
+            return [{
+                "ip": device_ip,
+                "protocol": entry["protocol"],
+                "updated_at": datetime.fromtimestamp(entry["updated_at"], timezone.utc).isoformat()
+            } for device_ip, entry in self._entries.items()]
+
+    def _run_probe(self, device_ip, probe):
+        try:
+            logging.debug(f"Probing RESTCONF availability on device {device_ip}")
+            probe()
+            self.record_success(device_ip, RESTCONF)
+        except Exception as e:
+            logging.debug(f"RESTCONF still unavailable on device {device_ip}: {e}")
+        finally:
+            with self._lock:
+                self._probing.discard(device_ip)
+
+
+protocol_registry = ProtocolRegistry(reprobe_interval=PROTOCOL_REPROBE_INTERVAL)
+add_credentials_listener(protocol_registry.forget)
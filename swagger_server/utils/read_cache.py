@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+
+HARDWARE_INFO = "hardware_info"
+VLAN_LIST = "vlan_list"
+
+READ_CACHE_MAX_ENTRIES = int(os.getenv('READ_CACHE_MAX_ENTRIES') or 10000)
+HARDWARE_INFO_CACHE_TTL = float(os.getenv('HARDWARE_INFO_CACHE_TTL') or 3600)
+VLAN_LIST_CACHE_TTL = float(os.getenv('VLAN_LIST_CACHE_TTL') or 300)
+
+
+class ReadCache:
+    """In-process cache of device reads, with a time to live per kind of read.
+
+    Entries are keyed by kind of read and device. At most ``max_entries`` entries are
+    kept, the least recently used ones are dropped first. Only successful reads are
+    cached: ``None`` and ``(body, status)`` tuples returned by handlers are not, nor reads
+    of a device whose entries were invalidated while they were loading.
+
+    :param max_entries: Maximum number of cached reads.
+    :type max_entries: int
+    :param ttls: Seconds a read stays valid, by kind of read. Kinds without TTL are not cached.
+    :type ttls: Dict[str, float]
+    """
+
+    def __init__(self, max_entries, ttls):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self._lock = threading.Lock()
+        # (kind, device_ip) -> (value, expires_at), least recently used first
+        self._entries = OrderedDict()
+        self._hits = {kind: 0 for kind in ttls}
+        self._misses = {kind: 0 for kind in ttls}
+        # device_ip -> number of invalidations of the reads of the device
+        self._generations = {}
+        self._flushes = 0
+
+    def get_or_load(self, kind, device_ip, loader, bypass=False):
+        """Return the cached ``kind`` read of ``device_ip``, calling ``loader`` when missing or expired.
+
+        :param bypass: Ignore the cached value and refresh it.
+        """
+        key = (kind, device_ip)
+        if not bypass:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits[kind] += 1
+                    return entry[0]
+        with self._lock:
+            self._misses[kind] += 1
+            generation = self._generation(device_ip)
+        value = loader()
+        if value is not None and not isinstance(value, tuple) and kind in self.ttls:
+            with self._lock:
+                if self._generation(device_ip) != generation:
+                    return value
+                self._entries[key] = (value, time.monotonic() + self.ttls[kind])
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def _generation(self, device_ip):
+        return self._flushes, self._generations.get(device_ip, 0)
+
+    def invalidate(self, device_ip=None, kind=None):
+        """Drop cached reads, of one device and/or one kind of read, or all of them.
+
+        Reads of the devices concerned loading meanwhile are not cached once they complete.
+        """
+        with self._lock:
+            if device_ip is None:
+                self._flushes += 1
+                keys = [key for key in self._entries if kind is None or key[0] == kind]
+            else:
+                self._generations[device_ip] = self._generations.get(device_ip, 0) + 1
+                keys = [(entry_kind, device_ip) for entry_kind in ([kind] if kind else self.ttls)]
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "kinds": {kind: {
+                    "ttl": ttl,
+                    "hits": self._hits[kind],
+                    "misses": self._misses[kind]
+                } for kind, ttl in self.ttls.items()}
+            }
+
+
+read_cache = ReadCache(max_entries=READ_CACHE_MAX_ENTRIES,
+                       ttls={HARDWARE_INFO: HARDWARE_INFO_CACHE_TTL, VLAN_LIST: VLAN_LIST_CACHE_TTL})
+add_credentials_listener(read_cache.invalidate)
@@ -0,0 +1,95 @@
+import os
+import threading
+
+from swagger_server.utils.credentials_handler import add_credentials_listener
+from swagger_server.utils.tracing import span
+
+READ_COALESCING = (os.getenv('READ_COALESCING') or 'true').lower() == 'true'
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share one in-flight device call between concurrent identical reads.
+
+    The first read of a key runs the call, reads of the same key arriving while it runs
+    wait for it and get its result, or its exception. Once the call completes the key is
+    free again: later reads start a new call, so no result outlives its call here.
+    Keys start with the operation and the device ip, ``invalidate`` detaches the calls in
+    flight on a device so reads arriving after a write do not get data read before it.
+
+    :param enabled: Whether reads are coalesced, every read runs its own call otherwise.
+    :type enabled: bool
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        # key -> _Call of the read in flight
+        self._in_flight = {}
+
+    def do(self, key, loader):
+        """Return ``loader()``, sharing the call with concurrent reads of ``key``.
+
+        :param key: Identifies identical reads, e.g. (operation, device_ip, arguments)
+        :type key: Hashable
+        :param loader: Performs the device call
+        :type loader: Callable
+        """
+        if not self.enabled:
+            return loader()
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            with span("coalesced", key[0]):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = loader()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is call:
+                    del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def invalidate(self, device_ip):
+        """Let the next reads of ``device_ip`` start new calls instead of joining the ones in flight."""
+        with self._lock:
+            for key in [key for key in self._in_flight if key[1] == device_ip]:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._in_flight),
+                "calls": self.calls,
+                "coalesced": self.coalesced
+            }
+
+
+single_flight = SingleFlight(enabled=READ_COALESCING)
+add_credentials_listener(single_flight.invalidate)
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
+from swagger_server.utils.credentials_handler import add_credentials_listener, get_credentials
+from swagger_server.utils.fleet_poller import POLL_INTERVAL
+from swagger_server.utils.read_cache import HARDWARE_INFO, VLAN_LIST
+
+INTERFACES_SWITCHPORT = "interfaces_switchport"
+KINDS = (HARDWARE_INFO, VLAN_LIST, INTERFACES_SWITCHPORT)
+
+SNAPSHOT_DB_PATH = os.getenv('SNAPSHOT_DB_PATH')
+
+
+def _encode(kind, value):
+    if kind == INTERFACES_SWITCHPORT:
+        value = {interface_name: {"mode": interface.mode, "vlans": str(interface.vlans)}
+                 for interface_name, interface in value.items()}
+    return json.dumps(value)
+
+
+def _decode(kind, text):
+    value = json.loads(text)
+    if kind == INTERFACES_SWITCHPORT:
+        value = {interface_name: InterfaceSwitchportConfigurationInformation(mode=interface["mode"], vlans=interface["vlans"])
+                 for interface_name, interface in value.items()}
+    return value
+
+
+class SnapshotStore:
+    """Latest successful reads of each device (hardware info, vlan list, switchport configuration of every interface).
+
+    Every successful device read is recorded, by the background poller or by requests, and
+    read endpoints can serve it instead of calling the device. Snapshots are stamped with the
+    wall clock so their age survives a restart when they are persisted to sqlite.
+
+    A write on a device drops the snapshots it can change and bumps the generation of the
+    device: reads started before the write are not recorded once they complete.
+
+    :param enabled: Whether reads are recorded, nothing is stored or served otherwise.
+    :type enabled: bool
+    :param path: sqlite database the snapshots are persisted to and loaded from at startup, kept in memory only when None.
+    :type path: str
+    """
+
+    def __init__(self, enabled, path=None):
+        self.enabled = enabled
+        self.path = path if enabled else None
+        self._lock = threading.Lock()
+        # (kind, device_ip) -> (value, fetched_at)
+        self._entries = {}
+        # device_ip -> number of writes that dropped the snapshots of the device
+        self._generations = {}
+        self._db = None
+        if self.path:
+            self._open()
+
+    def get(self, kind, device_ip, max_age=None):
+        """Snapshot of the ``kind`` read of ``device_ip`` and its age in seconds, or None.
+
+        :param max_age: Maximum age in seconds of the snapshot, any age when None.
+        :rtype: Tuple[object, float]
+        """
+        entry = self._entries.get((kind, device_ip))
+        if entry is None:
+            return None
+        age = max(time.time() - entry[1], 0)
+        if max_age is not None and age > max_age:
+            return None
+        return entry[0], age
+
+    def generation(self, device_ip):
+        return self._generations.get(device_ip, 0)
+
+    def record(self, kind, device_ip, value, generation):
+        """Keep ``value`` as the ``kind`` snapshot of ``device_ip`` and return it.
+
+        Error responses, ``None`` and ``(body, status)`` tuples, are not recorded, nor values read
+        before the snapshots of the device were last dropped, i.e. with an older ``generation``.
+        """
+        if not self.enabled or value is None or isinstance(value, tuple):
+            return value
+        fetched_at = time.time()
+        with self._lock:
+            if self._generations.get(device_ip, 0) != generation:
+                return value
+            self._entries[(kind, device_ip)] = (value, fetched_at)
+            if self._db is not None:
+                self._execute("INSERT OR REPLACE INTO snapshots (kind, ip, fetched_at, value) VALUES (?, ?, ?, ?)",
+                              (kind, device_ip, fetched_at, _encode(kind, value)))
+        return value
+
+    def invalidate(self, device_ip, kinds=KINDS):
+        """Drop the ``kinds`` snapshots of ``device_ip``, reads of the device in flight are not recorded."""
+        with self._lock:
+            self._generations[device_ip] = self._generations.get(device_ip, 0) + 1
+            for kind in kinds:
+                self._entries.pop((kind, device_ip), None)
+            if self._db is not None:
+                self._execute(f"DELETE FROM snapshots WHERE ip = ? AND kind IN ({', '.join('?' * len(kinds))})",
+                              (device_ip, *kinds))
+
+    def forget(self, device_ip):
+        """Drop the snapshots of a device removed from the inventory, a credentials change keeps them."""
+        if get_credentials(device_ip) is None:
+            self.invalidate(device_ip)
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            kinds = {kind: {"entries": 0, "oldest_age": None} for kind in KINDS}
+            for (kind, _), (_, fetched_at) in self._entries.items():
+                kinds[kind]["entries"] += 1
+                kinds[kind]["oldest_age"] = round(max(kinds[kind]["oldest_age"] or 0, now - fetched_at), 1)
+            return {"enabled": self.enabled, "path": self.path, "kinds": kinds}
+
+    def _open(self):
+        try:
+            self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            # WAL with synchronous NORMAL does not wait for the disk on every recorded read
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS snapshots (kind TEXT NOT NULL, ip TEXT NOT NULL, "
+                             "fetched_at REAL NOT NULL, value TEXT NOT NULL, PRIMARY KEY (kind, ip))")
+            for kind, device_ip, fetched_at, text in self._db.execute("SELECT kind, ip, fetched_at, value FROM snapshots"):
+                if kind in KINDS:
+                    self._entries[(kind, device_ip)] = (_decode(kind, text), fetched_at)
+            logging.info(f"Loaded {len(self._entries)} device snapshots from {self.path}")
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logging.error(f"Unable to use snapshot database {self.path}, snapshots are kept in memory only: {e}")
+            self._db = None
+
+    def _execute(self, statement, parameters):
+        """Run a statement on the database, must be called holding the lock. Failures leave the snapshots in memory."""
+        try:
+            self._db.execute(statement, parameters)
+        except sqlite3.Error as e:
+            logging.error(f"Unable to persist device snapshots to {self.path}: {e}")
+
+
+snapshot_store = SnapshotStore(enabled=POLL_INTERVAL > 0, path=SNAPSHOT_DB_PATH)
+add_credentials_listener(snapshot_store.forget)
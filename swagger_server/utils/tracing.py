@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from flask import g, request
+
+TRACING = (os.getenv('TRACING') or 'false').lower() == 'true'
+# File path appended with one OTLP JSON document per request, or URL of an OTLP/HTTP collector
+TRACE_EXPORT = os.getenv('TRACE_EXPORT')
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS') or 200)
+TRACE_EXPORT_QUEUE = int(os.getenv('TRACE_EXPORT_QUEUE') or 1000)
+SERVICE_NAME = "switch-connector"
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_trace = ContextVar("trace", default=None)
+_no_span = nullcontext()
+
+
+class Trace:
+    """Spans of a request, timed with ``perf_counter_ns`` and stamped with the wall clock for export.
+
+    :param description: Description of the root span, named ``total``
+    :type description: str
+    :param traceparent: W3C traceparent header of the request, continued when valid
+    :type traceparent: str
+    """
+
+    def __init__(self, description, traceparent=None):
+        match = TRACEPARENT.match(traceparent or "")
+        self.trace_id = match.group(1) if match else os.urandom(16).hex()
+        self.spans = []
+        self._stack = [match.group(2) if match else None]
+        self._clock_offset = time.time_ns() - time.perf_counter_ns()
+        self.root = self._start("total", description)
+
+    def _start(self, name, description):
+        span = {"name": name, "description": description, "span_id": os.urandom(8).hex(),
+                "parent_id": self._stack[-1], "start": time.perf_counter_ns(), "end": None, "error": None}
+        if len(self.spans) < TRACE_MAX_SPANS:
+            self.spans.append(span)
+        self._stack.append(span["span_id"])
+        return span
+
+    def _end(self, span, error=None):
+        span["end"] = time.perf_counter_ns()
+        span["error"] = error
+        self._stack.pop()
+
+    @contextmanager
+    def span(self, name, description):
+        span = self._start(name, description)
+        try:
+            yield span
+        except BaseException as e:
+            self._end(span, f"{type(e).__name__}: {e}")
+            raise
+        self._end(span)
+
+    def finish(self):
+        if self.root["end"] is None:
+            self._end(self.root)
+
+    def server_timing(self):
+        """Spans in the ``Server-Timing`` header format, durations in milliseconds."""
+        metrics = []
+        for span in self.spans:
+            if span["end"] is None:
+                continue
+            metric = span["name"]
+            if span["description"]:
+                metric += ';desc="' + span["description"].replace('\\', '\\\\').replace('"', '\\"') + '"'
+            metrics.append(f"{metric};dur={(span['end'] - span['start']) / 1e6:.1f}")
+        return ", ".join(metrics)
+
+    def to_otlp(self):
+        """The trace as an OTLP/HTTP JSON ``ExportTraceServiceRequest``."""
+        spans = []
+        for span in self.spans:
+            if span["end"] is None:
+                continue
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span["span_id"],
+                "name": span["description"] if span is self.root else span["name"],
+                "kind": 2 if span is self.root else 1,
+                "startTimeUnixNano": str(span["start"] + self._clock_offset),
+                "endTimeUnixNano": str(span["end"] + self._clock_offset),
+                "attributes": [{"key": "description", "value": {"stringValue": span["description"]}}]
+                if span["description"] else [],
+                "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1}
+            }
+            if span["parent_id"]:
+                otlp_span["parentSpanId"] = span["parent_id"]
+            spans.append(otlp_span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "swagger_server"}, "spans": spans}]
+        }]}
+
+
+def span(name, description=None):
+    """Time a step of the current request, a no-op when tracing is disabled or outside of a request.
+
+    :param name: Step name, a token such as ``restconf.http``
+    :type name: str
+    :param description: Details of the step
+    :type description: str
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _no_span
+    return trace.span(name, description)
+
+
+class TraceExporter:
+    """Export finished traces from a background thread, so requests never wait on the export.
+    Traces are dropped when ``max_queued`` are already waiting.
+
+    :param destination: File path, or http(s) URL of an OTLP/HTTP collector
+    :type destination: str
+    :param max_queued: Maximum number of traces waiting for export
+    :type max_queued: int
+    """
+
+    def __init__(self, destination, max_queued):
+        self.destination = destination
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def export(self, trace):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self._send(trace.to_otlp())
+            except Exception as e:
+                logging.warning(f"Unable to export trace {trace.trace_id} to {self.destination}: {e}")
+
+    def _send(self, document):
+        if self.destination.startswith(("http://", "https://")):
+            import requests
+            requests.post(self.destination, json=document, timeout=5).raise_for_status()
+        else:
+            with open(self.destination, "a") as stream:
+                stream.write(json.dumps(document) + "\n")
+
+
+trace_exporter = TraceExporter(TRACE_EXPORT, max_queued=TRACE_EXPORT_QUEUE) if TRACE_EXPORT else None
+
+
+def start_request_trace():
+    if TRACING:
+        g.trace_token = _current_trace.set(Trace(f"{request.method} {request.path}", request.headers.get("traceparent")))
+
+
+def add_server_timing_header(response):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.finish()
+        response.headers["Server-Timing"] = trace.server_timing()
+        if trace_exporter is not None:
+            trace_exporter.export(trace)
+    return response
+
+
+def end_request_trace(exception=None):
+    if 'trace_token' in g:
+        _current_trace.reset(g.pop('trace_token'))
@@ -0,0 +1,71 @@
+from CiscoInterfaceNameConverter import converter
+from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
+from swagger_server.utils.vlan_set import VlanSet
+
+TAG = "tag"
+UNTAG = "untag"
+DEFAULT_VLAN = VlanSet.parse(1)
+
+
+def is_access_mode(mode):
+    return mode in ('access', 'static access')
+
+def apply_vlan_operation(interface_info, action, vlan_ids, append=False):
+    """Compute the switchport configuration of an interface after tagging or untagging vlans.
+
+    Untagging the vlan of an access port puts the port back in the default vlan, as
+    "no switchport access vlan" does.
+
+    :param interface_info: Current configuration of the interface.
+    :type interface_info: InterfaceSwitchportConfigurationInformation
+    :param action: TAG or UNTAG.
+    :param vlan_ids: Comma separated vlan ids or ranges.
+    :type vlan_ids: Union[VlanSet, str]
+    :param append: When tagging a trunk, keep the vlans already allowed.
+    :raises ValueError: If the operation does not apply to the interface mode.
+    :rtype: InterfaceSwitchportConfigurationInformation
+    """
+    vlan_ids = VlanSet.parse(vlan_ids)
+    if interface_info.mode == "trunk":
+        if action == TAG:
+            vlans = vlan_ids | interface_info.vlans if append else vlan_ids
+        else:
+            vlans = interface_info.vlans - vlan_ids
+        return InterfaceSwitchportConfigurationInformation(mode="trunk", vlans=vlans)
+    if is_access_mode(interface_info.mode) and action == TAG:
+        if len(vlan_ids) != 1:
+            raise ValueError(f"An interface in access mode takes a single vlan, not {vlan_ids}")
+        return InterfaceSwitchportConfigurationInformation(mode="access", vlans=vlan_ids)
+    if is_access_mode(interface_info.mode):
+        vlans = DEFAULT_VLAN if any(vlan_id in vlan_ids for vlan_id in interface_info.vlans) else interface_info.vlans
+        return InterfaceSwitchportConfigurationInformation(mode="access", vlans=vlans)
+    raise ValueError(f"Cannot {action} vlans {vlan_ids} on an interface in {interface_info.mode} mode")
+
+def plan_vlan_operations(interfaces, operations):
+    """Apply a batch of vlan operations to the current configuration of a switch, in order.
+
+    :param interfaces: Current configuration of the switch interfaces, keyed by long interface name.
+    :type interfaces: Dict[str, InterfaceSwitchportConfigurationInformation]
+    :param operations: Operations with keys interface_name, action (tag or untag), vlan_ids and append.
+    :type operations: List[Dict]
+    :return: One result per operation, and the resulting configuration of every changed interface keyed by long interface name.
+    :rtype: Tuple[List[Dict], Dict[str, InterfaceSwitchportConfigurationInformation]]
+    """
+    results, changed = [], {}
+    for operation in operations:
+        interface_name = operation["interface_name"]
+        action = operation.get("action", TAG)
+        result = {"interface_name": interface_name, "action": action}
+        long_interface = converter.convert_interface(interface_name=interface_name, return_long=True)
+        interface_info = changed.get(long_interface) or interfaces.get(long_interface)
+        if interface_info is None:
+            result.update(status="error", detail=f"Interface {interface_name} has no switchport configuration")
+        else:
+            try:
+                interface_info = apply_vlan_operation(interface_info, action, operation["vlan_ids"], operation.get("append", False))
+                changed[long_interface] = interface_info
+                result.update(status="ok", mode=interface_info.mode, vlans=str(interface_info.vlans))
+            except ValueError as e:
+                result.update(status="error", detail=str(e))
+        results.append(result)
+    return results, changed
@@ -0,0 +1,148 @@
+from bisect import bisect_right
+from heapq import merge
+
+VLAN_MIN = 1
+VLAN_MAX = 4094
+
+LIST_FORMAT = "list"
+RANGES_FORMAT = "ranges"
+STRUCTURED_FORMAT = "structured"
+
+
+def _coalesce(sorted_ranges):
+    """Merge overlapping and adjacent ranges of a list sorted by range start."""
+    ranges = []
+    for begin, end in sorted_ranges:
+        if ranges and ranges[-1][1] >= begin - 1:
+            if end > ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((begin, end))
+    return ranges
+
+
+class VlanSet:
+    """Immutable set of vlan ids, stored as a sorted list of disjoint ranges.
+
+    Set operations walk the ranges, never the single vlans, so a trunk allowing
+    "1-4094" costs one tuple instead of 4094 numbers. ``str()`` returns the canonical
+    range form used by IOS XE (e.g. "1-99,101-4094").
+
+    :param ranges: Inclusive (begin, end) vlan ranges, in any order.
+    :type ranges: Iterable[Tuple[int, int]]
+    :raises ValueError: If a range is reversed or outside 1-4094.
+    """
+
+    __slots__ = ('_ranges', '_starts')
+
+    def __init__(self, ranges=()):
+        ranges = sorted(ranges)
+        for begin, end in ranges:
+            if not VLAN_MIN <= begin <= end <= VLAN_MAX:
+                raise ValueError(f"Invalid vlan range {begin}-{end}")
+        self._set_ranges(_coalesce(ranges))
+
+    def _set_ranges(self, ranges):
+        self._ranges = tuple(ranges)
+        self._starts = [begin for begin, _ in self._ranges]
+
+    @classmethod
+    def _from_ranges(cls, ranges):
+        """Build a set from ranges already sorted, disjoint and validated."""
+        vlan_set = cls.__new__(cls)
+        vlan_set._set_ranges(ranges)
+        return vlan_set
+
+    @classmethod
+    def parse(cls, vlans):
+        """Build a set from a vlan id, a list of ids and ranges ("1,5,10-20"), "all" or "none".
+
+        :type vlans: Union[VlanSet, int, str]
+        :raises ValueError: If ``vlans`` is not a valid vlan list.
+        :rtype: VlanSet
+        """
+        if isinstance(vlans, VlanSet):
+            return vlans
+        if isinstance(vlans, int):
+            return cls(((vlans, vlans),))
+        text = str(vlans).strip().lower()
+        if text in ("", "none"):
+            return cls()
+        if text == "all":
+            return cls(((VLAN_MIN, VLAN_MAX),))
+        ranges = []
+        for item in text.split(","):
+            begin, _, end = item.strip().partition("-")
+            ranges.append((int(begin), int(end or begin)))
+        return cls(ranges)
+
+    @property
+    def ranges(self):
+        """Sorted, disjoint and non adjacent inclusive (begin, end) ranges.
+
+        :rtype: Tuple[Tuple[int, int]]
+        """
+        return self._ranges
+
+    def union(self, other):
+        return VlanSet._from_ranges(_coalesce(merge(self._ranges, VlanSet.parse(other)._ranges)))
+
+    def difference(self, other):
+        ranges, removed, index = [], VlanSet.parse(other)._ranges, 0
+        for begin, end in self._ranges:
+            while index < len(removed) and removed[index][1] < begin:
+                index += 1
+            cursor = index
+            while cursor < len(removed) and removed[cursor][0] <= end:
+                if removed[cursor][0] > begin:
+                    ranges.append((begin, removed[cursor][0] - 1))
+                begin = max(begin, removed[cursor][1] + 1)
+                cursor += 1
+            if begin <= end:
+                ranges.append((begin, end))
+        return VlanSet._from_ranges(ranges)
+
+    __or__ = union
+    __sub__ = difference
+
+    def __contains__(self, vlan_id):
+        index = bisect_right(self._starts, vlan_id) - 1
+        return index >= 0 and vlan_id <= self._ranges[index][1]
+
+    def __iter__(self):
+        for begin, end in self._ranges:
+            yield from range(begin, end + 1)
+
+    def __len__(self):
+        return sum(end - begin + 1 for begin, end in self._ranges)
+
+    def __bool__(self):
+        return bool(self._ranges)
+
+    def __eq__(self, other):
+        return isinstance(other, VlanSet) and self._ranges == other._ranges
+
+    def __hash__(self):
+        return hash(self._ranges)
+
+    def __str__(self):
+        return ",".join(str(begin) if begin == end else f"{begin}-{end}" for begin, end in self._ranges)
+
+    def __repr__(self):
+        return f"VlanSet('{self}')"
+
+    def unrolled(self):
+        """Comma separated list of every vlan id of the set (e.g. "1,2,3,7")."""
+        return ",".join(map(str, self))
+
+    def formatted(self, vlan_format=LIST_FORMAT):
+        """Render the set as an unrolled list ("1,2,3,7"), canonical ranges ("1-3,7")
+        or structured ranges ([{"start": 1, "end": 3}, {"start": 7, "end": 7}]).
+
+        :rtype: Union[str, List[Dict[str, int]]]
+        """
+        if vlan_format == RANGES_FORMAT:
+            return str(self)
+        if vlan_format == STRUCTURED_FORMAT:
+            return [{"start": begin, "end": end} for begin, end in self._ranges]
+        return self.unrolled()
@@ -0,0 +1,147 @@
+import os
+import threading
+from collections import deque
+
+from swagger_server.utils.tracing import span
+
+WRITE_QUEUE_MAX_BATCH = int(os.getenv('WRITE_QUEUE_MAX_BATCH') or 200)
+
+
+class _Job:
+    __slots__ = ("operations", "apply", "change", "wakeup", "done", "result", "error")
+
+    def __init__(self, operations=None, apply=None, change=None):
+        self.operations = operations
+        self.apply = apply
+        self.change = change
+        self.wakeup = threading.Event()
+        self.done = False
+        self.result = None
+        self.error = None
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class DeviceWriteQueue:
+    """Serialize the configuration changes of each device and merge queued vlan operations.
+
+    Changes of a device run one at a time, in submission order, so the read-modify-write
+    of a vlan operation never interleaves with another change of the same device. Vlan
+    operations submitted while a change runs are queued, then applied as one batch: the
+    switchport configuration is read once, the operations are planned in order into a
+    single vlan set per interface and pushed with a single configuration request. Every
+    submitter gets the results of its own operations, or the error of the batch.
+
+    The thread of the first queued request runs the batch, then hands the queue over to
+    the thread of the next queued request, so no request waits for work queued after it.
+
+    :param max_batch: Maximum number of vlan operations applied in one batch.
+    :type max_batch: int
+    """
+
+    def __init__(self, max_batch):
+        self.max_batch = max_batch
+        self.batches = 0
+        self.operations = 0
+        self.largest_batch = 0
+        self._lock = threading.Lock()
+        # device_ip -> deque of _Job, present while a request is running a batch on the device
+        self._queues = {}
+
+    def apply_vlan_operations(self, device_ip, operations, apply):
+        """Queue vlan operations on ``device_ip`` and return their results once applied.
+
+        :param operations: Operations with keys interface_name, action (tag or untag), vlan_ids and append.
+        :type operations: List[Dict]
+        :param apply: Applies a batch of operations on the device, returns one result per operation
+            or an error response tuple.
+        :type apply: Callable[[List[Dict]], Union[List[Dict], Tuple]]
+        :return: One result per operation, or the error response of the batch.
+        :rtype: Union[List[Dict], Tuple]
+        """
+        return self._submit(device_ip, _Job(operations=operations, apply=apply))
+
+    def run(self, device_ip, change):
+        """Run ``change`` alone once the changes queued before it on ``device_ip`` completed.
+
+        :param change: Performs a configuration change on the device.
+        :type change: Callable
+        """
+        return self._submit(device_ip, _Job(change=change))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "busy_devices": len(self._queues),
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "batches": self.batches,
+                "operations": self.operations,
+                "largest_batch": self.largest_batch
+            }
+
+    def _submit(self, device_ip, job):
+        with self._lock:
+            queue = self._queues.get(device_ip)
+            leading = queue is None
+            if leading:
+                queue = self._queues[device_ip] = deque()
+            queue.append(job)
+        if not leading:
+            with span("write.queued", device_ip):
+                job.wakeup.wait()
+            if job.done:
+                return job.outcome()
+        # The queue is ours: the job is first in it, run it together with the vlan operations queued behind it
+        with self._lock:
+            batch = self._take_batch(queue)
+        self._run_batch(batch)
+        with self._lock:
+            if queue:
+                queue[0].wakeup.set()
+            else:
+                del self._queues[device_ip]
+        return job.outcome()
+
+    def _take_batch(self, queue):
+        """Pop the next change, or the next vlan operations up to ``max_batch``. Must be called holding the lock."""
+        batch = [queue.popleft()]
+        if batch[0].change is None:
+            size = len(batch[0].operations)
+            while queue and queue[0].change is None and size + len(queue[0].operations) <= self.max_batch:
+                size += len(queue[0].operations)
+                batch.append(queue.popleft())
+        return batch
+
+    def _run_batch(self, batch):
+        try:
+            if batch[0].change is not None:
+                outcome = batch[0].change()
+            else:
+                operations = [operation for job in batch for operation in job.operations]
+                with self._lock:
+                    self.batches += 1
+                    self.operations += len(operations)
+                    self.largest_batch = max(self.largest_batch, len(operations))
+                with span("write.batch", f"{len(batch)} requests, {len(operations)} operations"):
+                    outcome = batch[0].apply(operations)
+        except BaseException as e:
+            for job in batch:
+                job.error = e
+        else:
+            start = 0
+            for job in batch:
+                if job.change is not None or isinstance(outcome, tuple):
+                    job.result = outcome
+                else:
+                    job.result = outcome[start:start + len(job.operations)]
+                    start += len(job.operations)
+        finally:
+            for job in batch:
+                job.done = True
+                job.wakeup.set()
+
+
+write_queue = DeviceWriteQueue(max_batch=WRITE_QUEUE_MAX_BATCH)
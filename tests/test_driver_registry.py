@@ -0,0 +1,38 @@
+from swagger_server.driver.driver_registry import DriverRegistry
+
+
+class StubDriver:
+    """Driver built by the registry, ``on_build`` runs while it is being built."""
+
+    on_build = None
+
+    def __init__(self, device_ip):
+        self.device_ip = device_ip
+
+    @classmethod
+    def build(cls, device_ip):
+        if cls.on_build:
+            cls.on_build(device_ip)
+        return cls(device_ip)
+
+
+def test_driver_kept_across_gets():
+    registry = DriverRegistry(max_drivers=10, ttl=60)
+    assert registry.get(StubDriver, "10.0.0.1") is registry.get(StubDriver, "10.0.0.1")
+    assert registry.stats()["hits"] == 1
+
+
+def test_driver_invalidated_during_build_not_kept(monkeypatch):
+    registry = DriverRegistry(max_drivers=10, ttl=60)
+    monkeypatch.setattr(StubDriver, "on_build", registry.invalidate)
+    stale = registry.get(StubDriver, "10.0.0.1")
+    monkeypatch.setattr(StubDriver, "on_build", None)
+    assert registry.stats()["drivers"] == 0
+    assert registry.get(StubDriver, "10.0.0.1") is not stale
+
+
+def test_other_device_invalidated_during_build_kept(monkeypatch):
+    registry = DriverRegistry(max_drivers=10, ttl=60)
+    monkeypatch.setattr(StubDriver, "on_build", lambda device_ip: registry.invalidate("10.0.0.2"))
+    driver = registry.get(StubDriver, "10.0.0.1")
+    assert registry.get(StubDriver, "10.0.0.1") is driver
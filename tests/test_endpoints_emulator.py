@@ -0,0 +1,161 @@
+"""Every endpoint of the service against the switch emulator of ``benchmarks/``.
+
+The emulator and the service run in their own processes, as in ``benchmarks/bench_endpoints.py``,
+once with every device answering RESTCONF and once with RESTCONF failing, so requests fall back on ssh.
+The emulator acknowledges configuration changes without applying them, so every test reads the
+captured configuration of ``benchmarks/outputs/``.
+"""
+import json
+import os
+import signal
+import sys
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+pytest.importorskip("asyncssh")
+pytest.importorskip("cryptography")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks"))
+
+from bench_endpoints import WORKLOADS, free_port, start_emulator, start_service  # noqa: E402
+from switch_emulator import device_ips  # noqa: E402
+
+PROTOCOLS = {"restconf": "RESTCONF", "ssh-fallback": "SSH"}
+TRUNK_INTERFACE = "Gi1%2F0%2F1"
+ACCESS_INTERFACE = "Gi1%2F0%2F2"
+DOWN_INTERFACE = "Gi1%2F0%2F3"
+
+
+@pytest.fixture(scope="module", params=PROTOCOLS)
+def service(request):
+    args = SimpleNamespace(devices=1, latency=0, jitter=0, error_rate=0, fields_rejecting=0, stack_members=2,
+                           restconf_port=free_port(), ssh_port=free_port())
+    emulator = start_emulator(args, WORKLOADS[request.param])
+    service_process = None
+    try:
+        port = free_port()
+        service_process = start_service(args, port)
+        base_url = f"http://127.0.0.1:{port}"
+        ip = device_ips(1)[0]
+        requests.post(f"{base_url}/inventory", timeout=30,
+                      json=[{"ip": ip, "username": "test", "password": "test"}]).raise_for_status()
+        yield SimpleNamespace(base_url=base_url, ip=ip, protocol=PROTOCOLS[request.param])
+    finally:
+        for process in (service_process, emulator):
+            if process is not None:
+                process.send_signal(signal.SIGINT)
+                process.wait()
+
+
+def call(service, method, path, **kwargs):
+    return requests.request(method, service.base_url + path, timeout=60, **kwargs)
+
+
+def test_inventory(service):
+    response = call(service, "GET", "/inventory")
+    assert response.status_code == 200
+    assert response.json()["devices"] == 1
+
+
+def test_hardware_info(service):
+    response = call(service, "GET", "/switch/hardware/info", params={"ip": service.ip},
+                    headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    assert response.json()["management_protocol"] == service.protocol
+    assert response.json()["chassis"] == "C9300-48P"
+    assert response.json()["version"] == "17.6.4"
+
+
+def test_hardware_info_of_unknown_device(service):
+    response = call(service, "GET", "/switch/hardware/info", params={"ip": "127.0.0.250"})
+    assert response.status_code == 404
+
+
+def test_bulk_hardware_info(service):
+    response = call(service, "POST", "/switch/hardware/info/bulk", json={"ips": [service.ip, "127.0.0.250"]})
+    assert response.status_code == 200
+    lines = {line["ip"]: line for line in map(json.loads, response.text.splitlines())}
+    assert lines[service.ip]["status"] == "ok"
+    assert lines[service.ip]["management_protocol"] == service.protocol
+    assert lines[service.ip]["hardware"]["chassis_sn"] == "FCW2233L0AB"
+    assert lines["127.0.0.250"]["status"] == "not_handled"
+
+
+def test_interfaces_switchport(service):
+    response = call(service, "GET", "/switch/interfaces/switchport-conf",
+                    params={"ip": service.ip, "vlan_format": "ranges"})
+    assert response.status_code == 200
+    interfaces = response.json()
+    assert interfaces["GigabitEthernet1/0/1"] == {"mode": "trunk", "vlans": "1,12,200,300,600-610"}
+    assert interfaces["GigabitEthernet1/0/2"]["vlans"] == "12"
+    assert interfaces["GigabitEthernet1/0/3"] == {"mode": "trunk", "vlans": "1-4094"}
+    assert "TenGigabitEthernet1/1/1" not in interfaces
+
+
+def test_interface_switchport(service):
+    response = call(service, "GET", f"/switch/interfaces/{TRUNK_INTERFACE}/switchport-conf",
+                    params={"ip": service.ip})
+    assert response.status_code == 200
+    assert response.json() == {"mode": "trunk", "vlans": "1,12,200,300,600,601,602,603,604,605,606,607,608,609,610"}
+
+
+def test_vlan_list(service):
+    response = call(service, "GET", "/switch/vlan", params={"ip": service.ip}, headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    assert {"id": 12, "name": "MGMT"} in response.json()
+    assert {"id": 200, "name": "USERS"} in response.json()
+
+
+def test_switchport_mode(service):
+    response = call(service, "PATCH", f"/switch/interfaces/{ACCESS_INTERFACE}/switchport-mode",
+                    params={"ip": service.ip, "mode": "access"})
+    # The ssh driver acknowledges the change without a body
+    if service.protocol == "SSH":
+        assert response.status_code == 204
+    else:
+        assert response.status_code == 200
+        assert "changed successfully to access" in response.json()["result"]
+
+
+def test_tag_interface(service):
+    response = call(service, "POST", f"/switch/interfaces/{TRUNK_INTERFACE}/vlan-tag",
+                    json={"ip": service.ip, "vlan_ids": "700", "append": True})
+    assert response.status_code == 200
+    assert response.json() == {"mode": "trunk", "vlans": "1,12,200,300,600-610,700"}
+
+
+def test_tag_down_interface(service):
+    # Gi1/0/3 is an unplugged trunk, tagged on its administrative mode
+    response = call(service, "POST", f"/switch/interfaces/{DOWN_INTERFACE}/vlan-tag",
+                    json={"ip": service.ip, "vlan_ids": "700", "append": True})
+    assert response.status_code == 200
+    assert response.json() == {"mode": "trunk", "vlans": "1-4094"}
+
+
+def test_tag_interfaces(service):
+    response = call(service, "POST", "/switch/interfaces/vlan-tag", json={"ip": service.ip, "operations": [
+        {"interface_name": "Gi1/0/1", "action": "tag", "vlan_ids": "700", "append": True},
+        {"interface_name": "Gi1/0/1", "action": "untag", "vlan_ids": "12"},
+        {"interface_name": "Gi1/0/3", "action": "untag", "vlan_ids": "1-99"}]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["ok", "ok", "ok"]
+    assert results[0]["vlans"] == "1,12,200,300,600-610,700"
+    assert results[1]["vlans"] == "1,200,300,600-610,700"
+    assert results[2]["vlans"] == "100-4094"
+
+
+def test_untag_interface(service):
+    response = call(service, "DELETE", f"/switch/interfaces/{TRUNK_INTERFACE}/vlan-tag",
+                    params={"ip": service.ip, "vlan_id": "600"})
+    assert response.status_code == 200
+    assert response.json() == {"result": f"Vlan 600 removed from interface Gi1/0/1 on device {service.ip}"}
+
+
+def test_untag_access_interface(service):
+    response = call(service, "DELETE", f"/switch/interfaces/{ACCESS_INTERFACE}/vlan-tag",
+                    params={"ip": service.ip, "vlan_id": "12"})
+    assert response.status_code == 200
+    assert response.json() == {"result": f"Vlan 12 removed from interface Gi1/0/2 on device {service.ip}"}
@@ -0,0 +1,50 @@
+from swagger_server.utils.read_cache import HARDWARE_INFO, VLAN_LIST, ReadCache
+
+
+def read_cache():
+    return ReadCache(max_entries=10, ttls={HARDWARE_INFO: 60, VLAN_LIST: 60})
+
+
+def test_read_cached():
+    cache = read_cache()
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", lambda: ["vlan"]) == ["vlan"]
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", lambda: ["other"]) == ["vlan"]
+
+
+def test_error_responses_not_cached():
+    cache = read_cache()
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", lambda: (None, 504)) == (None, 504)
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", lambda: ["vlan"]) == ["vlan"]
+
+
+def test_read_invalidated_while_loading_not_cached():
+    cache = read_cache()
+
+    def loader():
+        cache.invalidate("10.0.0.1", VLAN_LIST)
+        return ["before write"]
+
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", loader) == ["before write"]
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", lambda: ["after write"]) == ["after write"]
+
+
+def test_read_flushed_while_loading_not_cached():
+    cache = read_cache()
+
+    def loader():
+        cache.invalidate()
+        return ["before flush"]
+
+    cache.get_or_load(HARDWARE_INFO, "10.0.0.1", loader)
+    assert cache.stats()["entries"] == 0
+
+
+def test_other_device_invalidated_while_loading_cached():
+    cache = read_cache()
+
+    def loader():
+        cache.invalidate("10.0.0.2")
+        return ["vlan"]
+
+    cache.get_or_load(VLAN_LIST, "10.0.0.1", loader)
+    assert cache.get_or_load(VLAN_LIST, "10.0.0.1", lambda: ["other"]) == ["vlan"]
@@ -0,0 +1,59 @@
+import pytest
+
+from swagger_server.driver.cisco_ios_xe_restconf import CiscoIosXeREST, parse_interfaces_switchport
+from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
+from swagger_server.utils.vlan_operations import TAG
+
+
+def interfaces_response():
+    return {"Cisco-IOS-XE-native:interface": {"GigabitEthernet": [
+        {"name": "1/0/1", "switchport-config": {"switchport": {"Cisco-IOS-XE-switch:mode": {"trunk": {}}}}},
+        {"name": "1/0/4", "switchport-config": {"switchport": {}}},
+    ]}}
+
+
+class StubReads:
+    """Driver reads answered from ``interfaces_response``, without a device."""
+
+    def __init__(self, single_interface):
+        self.single_interface = single_interface
+        self.single_reads = []
+
+    def get_interfaces_configuration_information(self):
+        return parse_interfaces_switchport(interfaces_response())
+
+    def get_interface_configuration_information(self, interface_name):
+        self.single_reads.append(interface_name)
+        return self.single_interface(interface_name)
+
+
+def switchports(stub, operations):
+    driver = CiscoIosXeREST.__new__(CiscoIosXeREST)
+    driver.get_interfaces_configuration_information = stub.get_interfaces_configuration_information
+    driver.get_interface_configuration_information = stub.get_interface_configuration_information
+    return driver._CiscoIosXeREST__switchports(operations)
+
+
+def operations(*interface_names):
+    return [{"interface_name": name, "action": TAG, "vlan_ids": "10", "append": True} for name in interface_names]
+
+
+def test_interfaces_without_mode_left_out_of_the_list():
+    assert list(parse_interfaces_switchport(interfaces_response())) == ["GigabitEthernet1/0/1"]
+
+
+def test_batch_reads_missing_interface_on_its_own():
+    stub = StubReads(lambda name: InterfaceSwitchportConfigurationInformation(mode="access", vlans="1"))
+    result = switchports(stub, operations("Gi1/0/1", "Gi1/0/4"))
+    assert stub.single_reads == ["GigabitEthernet1/0/4"]
+    assert result["GigabitEthernet1/0/1"].mode == "trunk"
+    assert result["GigabitEthernet1/0/4"].mode == "access"
+
+
+def test_batch_raises_when_missing_interface_read_fails():
+    # Same failure as the single-interface path, the controller then falls back on ssh
+    def single_interface(interface_name):
+        raise KeyError("Cisco-IOS-XE-switch:mode")
+
+    with pytest.raises(KeyError):
+        switchports(StubReads(single_interface), operations("Gi1/0/1", "Gi1/0/4"))
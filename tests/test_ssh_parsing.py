@@ -0,0 +1,44 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from swagger_server.driver.cisco_ios_xe_ssh import parse_interfaces_switchport, parse_switchport
+from swagger_server.utils.vlan_operations import TAG, UNTAG, plan_vlan_operations
+
+OUTPUTS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "outputs")
+
+
+@pytest.fixture(scope="module")
+def show_interfaces_switchport():
+    with open(os.path.join(OUTPUTS_PATH, "show_interfaces_switchport.txt")) as stream:
+        return SimpleNamespace(channel_input="show interfaces switchport", result=stream.read())
+
+
+def test_interfaces_switchport(show_interfaces_switchport):
+    interfaces = parse_interfaces_switchport(show_interfaces_switchport)
+    assert interfaces["GigabitEthernet1/0/1"].mode == "trunk"
+    assert str(interfaces["GigabitEthernet1/0/1"].vlans) == "1,12,200,300,600-610"
+    assert interfaces["GigabitEthernet1/0/2"].mode == "static access"
+    assert str(interfaces["GigabitEthernet1/0/2"].vlans) == "12"
+    assert "TenGigabitEthernet1/1/1" not in interfaces
+
+
+def test_down_port_reports_administrative_mode(show_interfaces_switchport):
+    # Gi1/0/3 is an unplugged trunk: operational mode down, administrative mode trunk
+    interface_info = parse_interfaces_switchport(show_interfaces_switchport)["GigabitEthernet1/0/3"]
+    assert interface_info.mode == "trunk"
+    assert str(interface_info.vlans) == "1-4094"
+    assert parse_switchport(show_interfaces_switchport, "Gi1/0/3").mode == "trunk"
+
+
+def test_down_port_can_be_provisioned(show_interfaces_switchport):
+    interfaces = parse_interfaces_switchport(show_interfaces_switchport)
+    results, changed = plan_vlan_operations(interfaces, [
+        {"interface_name": "Gi1/0/3", "action": TAG, "vlan_ids": "30"},
+        {"interface_name": "Gi1/0/3", "action": TAG, "vlan_ids": "40", "append": True},
+        {"interface_name": "Gi1/0/2", "action": UNTAG, "vlan_ids": "12"},
+    ])
+    assert [result["status"] for result in results] == ["ok", "ok", "ok"]
+    assert str(changed["GigabitEthernet1/0/3"].vlans) == "30,40"
+    assert str(changed["GigabitEthernet1/0/2"].vlans) == "1"
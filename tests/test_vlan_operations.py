@@ -0,0 +1,78 @@
+import pytest
+
+from swagger_server.models.interface_switchport_configuration_information import InterfaceSwitchportConfigurationInformation
+from swagger_server.utils.vlan_operations import TAG, UNTAG, apply_vlan_operation, plan_vlan_operations
+
+
+def interface(mode, vlans):
+    return InterfaceSwitchportConfigurationInformation(mode=mode, vlans=vlans)
+
+
+@pytest.mark.parametrize("vlans, action, vlan_ids, append, expected", [
+    ("10-20", TAG, "30", True, "10-20,30"),
+    ("10-20", TAG, "21", True, "10-21"),
+    ("10-20", TAG, "30", False, "30"),
+    ("all", TAG, "5", True, "1-4094"),
+    ("10-20", UNTAG, "15", False, "10-14,16-20"),
+    ("10-20", UNTAG, "30", False, "10-20"),
+    ("10", UNTAG, "10", False, ""),
+    ("all", UNTAG, "1", False, "2-4094"),
+])
+def test_trunk(vlans, action, vlan_ids, append, expected):
+    result = apply_vlan_operation(interface("trunk", vlans), action, vlan_ids, append)
+    assert result.mode == "trunk"
+    assert str(result.vlans) == expected
+
+
+@pytest.mark.parametrize("mode", ["access", "static access"])
+def test_access_tag(mode):
+    result = apply_vlan_operation(interface(mode, "12"), TAG, "30")
+    assert result.mode == "access"
+    assert str(result.vlans) == "30"
+
+
+def test_access_tag_rejects_many_vlans():
+    with pytest.raises(ValueError):
+        apply_vlan_operation(interface("access", "12"), TAG, "30-31")
+
+
+@pytest.mark.parametrize("mode", ["down", "dynamic auto"])
+def test_other_modes_rejected(mode):
+    with pytest.raises(ValueError):
+        apply_vlan_operation(interface(mode, "1"), TAG, "30")
+
+
+def test_plan_applies_operations_in_order():
+    interfaces = {"GigabitEthernet1/0/1": interface("trunk", "10"),
+                  "GigabitEthernet1/0/2": interface("access", "12")}
+    results, changed = plan_vlan_operations(interfaces, [
+        {"interface_name": "Gi1/0/1", "action": TAG, "vlan_ids": "20", "append": True},
+        {"interface_name": "GigabitEthernet1/0/1", "action": UNTAG, "vlan_ids": "10"},
+        {"interface_name": "Gi1/0/2", "action": TAG, "vlan_ids": "30"},
+        {"interface_name": "Gi1/0/9", "action": TAG, "vlan_ids": "30"},
+        {"interface_name": "Gi1/0/2", "action": TAG, "vlan_ids": "0"},
+    ])
+    assert [result["status"] for result in results] == ["ok", "ok", "ok", "error", "error"]
+    assert results[0]["vlans"] == "10,20"
+    assert results[1]["vlans"] == "20"
+    assert set(changed) == {"GigabitEthernet1/0/1", "GigabitEthernet1/0/2"}
+    assert str(changed["GigabitEthernet1/0/1"].vlans) == "20"
+    assert str(changed["GigabitEthernet1/0/2"].vlans) == "30"
+
+
+def test_plan_without_valid_operation_changes_nothing():
+    results, changed = plan_vlan_operations({"GigabitEthernet1/0/1": interface("down", "1")},
+                                            [{"interface_name": "Gi1/0/1", "action": TAG, "vlan_ids": "30"}])
+    assert results[0]["status"] == "error"
+    assert changed == {}
+
+
+@pytest.mark.parametrize("vlans, vlan_ids, expected", [
+    ("12", "12", "1"),
+    ("12", "10-20", "1"),
+    ("12", "30", "12"),
+])
+def test_access_untag_resets_default_vlan(vlans, vlan_ids, expected):
+    result = apply_vlan_operation(interface("static access", vlans), UNTAG, vlan_ids)
+    assert result.mode == "access"
+    assert str(result.vlans) == expected
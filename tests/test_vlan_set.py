@@ -0,0 +1,87 @@
+import pytest
+
+from swagger_server.utils.vlan_set import RANGES_FORMAT, STRUCTURED_FORMAT, VlanSet
+
+
+@pytest.mark.parametrize("text, ranges", [
+    ("1", ((1, 1),)),
+    ("4094", ((4094, 4094),)),
+    ("1-4094", ((1, 4094),)),
+    ("all", ((1, 4094),)),
+    ("ALL", ((1, 4094),)),
+    ("none", ()),
+    ("", ()),
+    (" 10 , 5 ", ((5, 5), (10, 10))),
+    ("20-30,10-25", ((10, 30),)),
+    ("1-5,6-10", ((1, 10),)),
+    ("1,2,3,7", ((1, 3), (7, 7))),
+    ("100-200,150", ((100, 200),)),
+])
+def test_parse(text, ranges):
+    assert VlanSet.parse(text).ranges == ranges
+
+
+def test_parse_int_and_set():
+    vlans = VlanSet.parse(12)
+    assert vlans.ranges == ((12, 12),)
+    assert VlanSet.parse(vlans) is vlans
+
+
+@pytest.mark.parametrize("text", ["0", "4095", "20-10", "0-5", "4000-4095", "abc", "1-2-3", "1,,2", "-5"])
+def test_parse_rejects_invalid_ranges(text):
+    with pytest.raises(ValueError):
+        VlanSet.parse(text)
+
+
+@pytest.mark.parametrize("left, right, expected", [
+    ("1-10", "11-20", "1-20"),
+    ("1-10", "12-20", "1-10,12-20"),
+    ("1-10", "5-15", "1-15"),
+    ("5-15", "1-10", "1-15"),
+    ("1-100", "10-20", "1-100"),
+    ("1,3,5", "2,4", "1-5"),
+    ("", "7", "7"),
+    ("7", "none", "7"),
+    ("1-4093", "4094", "1-4094"),
+    ("10-20,40-50", "15-45", "10-50"),
+])
+def test_union(left, right, expected):
+    assert str(VlanSet.parse(left) | VlanSet.parse(right)) == expected
+    assert str(VlanSet.parse(right) | VlanSet.parse(left)) == expected
+
+
+@pytest.mark.parametrize("left, right, expected", [
+    ("1-10", "11-20", "1-10"),
+    ("1-10", "10", "1-9"),
+    ("1-10", "1", "2-10"),
+    ("1-10", "5", "1-4,6-10"),
+    ("1-10", "3-4,7-8", "1-2,5-6,9-10"),
+    ("1-10", "1-10", ""),
+    ("1-10", "1-20", ""),
+    ("5-15", "1-10", "11-15"),
+    ("1-10,20-30", "5-25", "1-4,26-30"),
+    ("1-10,20-30,40-50", "10-20,30-40", "1-9,21-29,41-50"),
+    ("all", "1", "2-4094"),
+    ("all", "4094", "1-4093"),
+    ("all", "none", "1-4094"),
+    ("", "1-10", ""),
+    ("1,3,5", "2,4", "1,3,5"),
+])
+def test_difference(left, right, expected):
+    assert str(VlanSet.parse(left) - VlanSet.parse(right)) == expected
+
+
+def test_membership_and_size():
+    vlans = VlanSet.parse("1-3,10,4000-4094")
+    assert 1 in vlans and 3 in vlans and 10 in vlans and 4094 in vlans
+    assert 0 not in vlans and 4 not in vlans and 9 not in vlans and 11 not in vlans
+    assert len(vlans) == 3 + 1 + 95
+    assert not VlanSet.parse("none")
+    assert VlanSet.parse("1-3") == VlanSet.parse("1,2,3")
+
+
+def test_formats():
+    vlans = VlanSet.parse("7,1-3")
+    assert vlans.formatted() == "1,2,3,7"
+    assert vlans.formatted(RANGES_FORMAT) == "1-3,7"
+    assert vlans.formatted(STRUCTURED_FORMAT) == [{"start": 1, "end": 3}, {"start": 7, "end": 7}]